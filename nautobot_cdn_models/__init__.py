@@ -26,7 +26,13 @@ class NautobotcdnModelsConfig(PluginConfig):
     default_settings = {
         "default_statuses": {
             "CdnSite": ["Active", "Maintenance", "Planned", "Staged"],
-        }
+        },
+        # Number of processes used to parse the redirect map context files of a Git repository, 1 to parse serially
+        "redirectmap_context_parse_workers": 4,
+        # Number of days change feed entries are kept for
+        "change_feed_retention_days": 7,
+        # Number of seconds a change feed entry must have been recorded for before it is served, see get_changes()
+        "change_feed_settle_seconds": 5,
     }
     caching_config = {}
     def ready(self):
@@ -36,12 +42,17 @@ class NautobotcdnModelsConfig(PluginConfig):
         from .signals import (  # pylint: disable=import-outside-toplevel
             post_migrate_create_statuses,
             create_cdnsite_to_device_relationship,
-            create_cdnsite_to_vm_relationship
+            create_cdnsite_to_vm_relationship,
+            post_migrate_rebuild_redirectmap_context_dependencies,
+            post_migrate_rebuild_tree_closures,
         )
 
         post_migrate.connect(post_migrate_create_statuses, sender=self)
         post_migrate.connect(create_cdnsite_to_device_relationship, sender=self)
         post_migrate.connect(create_cdnsite_to_vm_relationship, sender=self)
+        # The dependency index relies on the closure tables, so these must be rebuilt first
+        post_migrate.connect(post_migrate_rebuild_tree_closures, sender=self)
+        post_migrate.connect(post_migrate_rebuild_redirectmap_context_dependencies, sender=self)
 
 
 config = NautobotcdnModelsConfig  # pylint:disable=invalid-name
\ No newline at end of file
@@ -22,6 +22,7 @@ from nautobot.extras.api.serializers import NautobotModelSerializer, ConfigConte
 from nautobot.extras.utils import FeatureQuery
 
 from .. import models
+from ..rendering import get_rendered_redirectmap_context
 
 from . import nested_serializers
 
@@ -40,14 +41,32 @@ class SiteRoleSerializer(NautobotModelSerializer, TreeModelSerializerMixin):
         view_name="plugins-api:nautobot_cdn_models-api:siterole-detail"
     )
     cdnsite_count = serializers.IntegerField(read_only=True)
+    subtree_bandwidth_mbps = serializers.IntegerField(read_only=True)
+    subtree_diskless_cdnsite_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = models.SiteRole
         fields = "__all__"
-        list_display_fields = ["name", "cdnsite_count", "description", "actions"]
+        list_display_fields = ["name", "cdnsite_count", "subtree_bandwidth_mbps", "description", "actions"]
 
 
-class CdnSiteSerializer(NautobotModelSerializer):
+class SparseFieldsetSerializerMixin:
+    """
+    Only render the fields listed in the comma-separated `fields` query parameter of a read request, if given.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if request is None or request.method not in ("GET", "HEAD"):
+            return
+        requested_fields = {name.strip() for name in request.query_params.get("fields", "").split(",") if name.strip()}
+        if requested_fields:
+            for field_name in set(self.fields) - requested_fields:
+                self.fields.pop(field_name)
+
+
+class CdnSiteSerializer(SparseFieldsetSerializerMixin, NautobotModelSerializer):
     url = serializers.HyperlinkedIdentityField(
         view_name="plugins-api:nautobot_cdn_models-api:cdnsite-detail"
     )
@@ -60,8 +79,10 @@ class CdnSiteSerializer(NautobotModelSerializer):
     virtualmachine_count = serializers.IntegerField(read_only=True)
     # neighbor1 = nested_serializers.NestedCdnSiteSerializer()
     # neighbor2 = nested_serializers.NestedCdnSiteSerializer(required=False, allow_null=True)
-    local_context_schema = ConfigContextSchemaSerializer(required=False, allow_null=True)
-    
+    local_context_schema = ConfigContextSchemaSerializer(
+        source="local_redirectmap_context_schema", required=False, allow_null=True
+    )
+
     class Meta:
         model = models.CdnSite
         fields = "__all__"
@@ -90,11 +111,83 @@ class CdnSiteWithRedirectMapContextSerializer(CdnSiteSerializer):
     redirect_map_context = serializers.SerializerMethodField()
 
     class Meta(CdnSiteSerializer.Meta):
-        fields = [CdnSiteSerializer.Meta.fields] + ["redirect_map_context"]
+        # Declared fields such as redirect_map_context are included by "__all__"
+        fields = "__all__"
 
     @extend_schema_field(serializers.DictField)
     def get_redirect_map_context(self, obj):
-        return obj.get_redirect_map_context()
+        # Callers serializing many sites can render their contexts in bulk and pass them in the serializer context
+        rendered_contexts = self.context.get("rendered_redirectmap_contexts")
+        if rendered_contexts is not None and obj.pk in rendered_contexts:
+            return rendered_contexts[obj.pk].data
+        # Querysets annotated with annotate_config_context_data() are rendered without further queries
+        if hasattr(obj, "config_context_data"):
+            return obj.get_redirectmap_context()
+        return get_rendered_redirectmap_context(obj).data
+
+class RenderedRedirectMapContextSerializer(serializers.ModelSerializer):
+    cdnsite = nested_serializers.NestedCdnSiteSerializer(read_only=True)
+
+    class Meta:
+        model = models.RenderedRedirectMapContext
+        fields = ["cdnsite", "data", "data_hash", "last_rendered"]
+        read_only_fields = fields
+
+class CdnSiteCapacitySerializer(serializers.ModelSerializer):
+    url = serializers.HyperlinkedIdentityField(view_name="plugins-api:nautobot_cdn_models-api:cdnsite-detail")
+    available_bandwidth_mbps = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = models.CdnSite
+        fields = [
+            "id",
+            "url",
+            "name",
+            "bandwidthLimitMbps",
+            "neighbor1",
+            "neighbor2",
+            "failover_site",
+            "available_bandwidth_mbps",
+        ]
+        read_only_fields = fields
+
+class AssociatedCdnSiteSerializer(RenderedRedirectMapContextSerializer):
+    object_type = serializers.CharField(read_only=True)
+    object_id = serializers.UUIDField(read_only=True)
+
+    class Meta(RenderedRedirectMapContextSerializer.Meta):
+        fields = ["object_type", "object_id", "cdnsite", "data", "data_hash", "last_rendered"]
+        read_only_fields = fields
+
+class CdnSiteAssociationSerializer(serializers.Serializer):
+    cdnsite = serializers.CharField(help_text="Name or ID of the CdnSite")
+    device = serializers.CharField(required=False, help_text="Name or ID of the Device")
+    virtual_machine = serializers.CharField(required=False, help_text="Name or ID of the VirtualMachine")
+
+    def validate(self, attrs):
+        if ("device" in attrs) == ("virtual_machine" in attrs):
+            raise serializers.ValidationError("Exactly one of `device` and `virtual_machine` is required.")
+        return attrs
+
+class CdnSiteAssociationBulkSerializer(serializers.Serializer):
+    associations = CdnSiteAssociationSerializer(many=True, allow_empty=False)
+    replace = serializers.BooleanField(
+        default=False,
+        help_text="Also remove the devices and VMs associated with the listed CdnSites that aren't listed",
+    )
+
+class CdnSiteAssociationResultSerializer(serializers.Serializer):
+    created = serializers.IntegerField(read_only=True)
+    deleted = serializers.IntegerField(read_only=True)
+    unchanged = serializers.IntegerField(read_only=True)
+
+class ChangeFeedEntrySerializer(serializers.ModelSerializer):
+    object_type = ContentTypeField(read_only=True)
+
+    class Meta:
+        model = models.ChangeFeedEntry
+        fields = ["id", "time", "action", "object_type", "object_id", "object_repr", "affected_cdnsites"]
+        read_only_fields = fields
 
 class RedirectMapContextSerializer(ValidatedModelSerializer, NotesSerializerMixin):
     url = serializers.HyperlinkedIdentityField(view_name="plugins-api:nautobot_cdn_models-api:redirectmapcontext-detail")
@@ -105,7 +198,7 @@ class RedirectMapContextSerializer(ValidatedModelSerializer, NotesSerializerMixi
         default=None,
     )
     owner = serializers.SerializerMethodField(read_only=True)
-    schema = ConfigContextSchemaSerializer(required=False, allow_null=True)
+    schema = ConfigContextSchemaSerializer(source="config_context_schema", required=False, allow_null=True)
     locations = SerializedPKRelatedField(
         queryset=Location.objects.all(),
         serializer=LocationSerializer,
@@ -124,7 +217,8 @@ class RedirectMapContextSerializer(ValidatedModelSerializer, NotesSerializerMixi
         required=False,
         many=True,
     )
-    tags = serializers.SlugRelatedField(queryset=Tag.objects.all(), slug_field="slug", required=False, many=True)
+    # Tags are read and written by name: Nautobot 2.x tags have no slug, which this field used to be keyed on
+    tags = serializers.SlugRelatedField(queryset=Tag.objects.all(), slug_field="name", required=False, many=True)
 
 
     # Conditional enablement of dynamic groups filtering
@@ -7,5 +7,6 @@ router.register("hypercachememoryprofile", views.HyperCacheMemoryProfileViewSet)
 router.register("siterole", views.SiteRoleViewSet)
 router.register("cdnsite", views.CdnSiteViewSet)
 router.register("cdn-redirect-map-contexts", views.RedirectMapContextViewSet)
+router.register("changes", views.ChangeFeedViewSet)
 
 urlpatterns = router.urls
\ No newline at end of file
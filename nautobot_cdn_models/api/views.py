@@ -1,40 +1,199 @@
+import copy
+import hashlib
+import uuid
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import PermissionDenied
+from django.db.models import Count, Max, Prefetch
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from nautobot.dcim.models import Device, Location
 from nautobot.extras import filters
+from nautobot.extras.choices import ObjectChangeActionChoices
+from nautobot.extras.models import (
+    ConfigContextSchema,
+    GitRepository,
+    ObjectChange,
+    RelationshipAssociation,
+    Status,
+    Tag,
+)
+from nautobot.virtualization.models import VirtualMachine
 from . import serializers
 
 from nautobot.extras.api.views import NautobotModelViewSet
 from nautobot.core.api.filter_backends import NautobotFilterBackend
 from nautobot.core.api.views import (
     ModelViewSet,
+    ReadOnlyModelViewSet,
 )
 from nautobot.extras.api.views import NautobotModelViewSet
 
 from .. import models, filters
+from ..associations import (
+    CDNSITE_DEVICES_RELATIONSHIP,
+    CDNSITE_VMS_RELATIONSHIP,
+    get_associated_cdnsites,
+    resolve_identifiers,
+    sync_cdnsite_associations,
+)
+from ..capacity import annotate_cdnsite_capacity, annotate_site_role_capacity, annotate_site_role_cdnsite_count
+from ..changefeed import get_changes, get_latest_render_change
+from ..rendering import get_rendered_redirectmap_context, get_rendered_redirectmap_contexts
 from . import serializers
 
 
-class HyperCacheMemoryProfileViewSet(NautobotModelViewSet):
-    queryset = models.HyperCacheMemoryProfile.objects.all()
-    serializer_class = serializers.HyperCacheMemoryProfileSerializer
-    filter_class = filters.HyperCacheMemoryProfileFilterSet
+class ViewQueryParamsFilterBackend(NautobotFilterBackend):
+    """
+    Recognizes that the query parameters listed in the view's `view_query_params` (such as the `fields` of a sparse
+    fieldset) are not filterset parameters but rather view parameters.
+    """
 
-class SiteRoleViewSet(NautobotModelViewSet):
-    queryset = models.SiteRole.objects.all()
-    serializer_class = serializers.SiteRoleSerializer
-    filterset_class = filters.SiteRoleFilterSet
+    def get_filterset_kwargs(self, request, queryset, view):
+        kwargs = super().get_filterset_kwargs(request, queryset, view)
+        kwargs["data"] = kwargs["data"].copy()
+        for param in getattr(view, "view_query_params", ()):
+            kwargs["data"].pop(param, None)
+        return kwargs
 
-class CdnSiteViewSet(NautobotModelViewSet):
-    queryset = models.CdnSite.objects.all()
-    serializer_class = serializers.CdnSiteSerializer
-    filter_class = filters.CdnSiteFilterSet
 
-#
-# Config contexts
-#
+class ConditionalGetMixin:
+    """
+    Honor `If-None-Match` and `If-Modified-Since` on list and detail GETs, answering 304 Not Modified when possible.
+
+    Versions are computed with cheap queries before anything is serialized: the object's `last_updated` for details,
+    and for lists the number of (filtered) objects, their latest `last_updated` and the time of the latest deletion
+    recorded in the change log. The ETag also covers the request path (including filters and pagination) and the
+    `Accept` header.
+
+    Representations also change without the objects themselves being updated: when their assignments change (which
+    the change feed records) or when the objects nested in them change. So both versions also include the latest
+    change feed entry of the model, and the version of the whole table of each of the `related_version_models`.
+    """
+
+    # Models of the objects nested in the representation, see get_related_version()
+    related_version_models = ()
+
+    def get_etag(self, request, *versions):
+        key = "|".join(
+            str(version) for version in (request.get_full_path(), request.META.get("HTTP_ACCEPT", ""), *versions)
+        )
+        return f'"{hashlib.sha1(key.encode()).hexdigest()}"'  # nosec: not used for security
+
+    def get_not_modified_response(self, request, etag, last_modified):
+        """
+        Return a 304 (or 412) response if the client already has the current version, otherwise None.
+        """
+        response = get_conditional_response(
+            request, etag=etag, last_modified=int(last_modified.timestamp()) if last_modified else None
+        )
+        if response is not None:
+            self.set_conditional_headers(response, etag, last_modified)
+        return response
 
+    def set_conditional_headers(self, response, etag, last_modified):
+        response["ETag"] = etag
+        if last_modified:
+            response["Last-Modified"] = http_date(last_modified.timestamp())
+        return response
 
-class RedirectMapContextFilterBackend(NautobotFilterBackend):
+    @staticmethod
+    def _combine_versions(*versions):
+        """Combine `(version, last_modified)` tuples into one."""
+        timestamps = [last_modified for _, last_modified in versions if last_modified]
+        return ":".join(str(version) for version, _ in versions), max(timestamps) if timestamps else None
+
+    def get_related_version(self):
+        """
+        Return the `(version, last_modified)` of what the representations depend on besides the objects themselves:
+        the latest change feed entry of the model, and the count, latest `last_updated` and latest deletion of every
+        model of `related_version_models`.
+
+        The latest deletions of all models are read with a single query.
+        """
+        model = self.queryset.model
+        feed = models.ChangeFeedEntry.objects.filter(object_type=ContentType.objects.get_for_model(model)).aggregate(
+            cursor=Max("pk"), time=Max("time")
+        )
+        versions = [(feed["cursor"], feed["time"])]
+
+        content_types = ContentType.objects.get_for_models(*self.related_version_models)
+        last_deleted = dict(
+            ObjectChange.objects.filter(
+                changed_object_type__in=content_types.values(), action=ObjectChangeActionChoices.ACTION_DELETE
+            )
+            .order_by()
+            .values("changed_object_type")
+            .annotate(time=Max("time"))
+            .values_list("changed_object_type", "time")
+        )
+        for related_model in self.related_version_models:
+            aggregates = related_model.objects.aggregate(count=Count("pk"), last_updated=Max("last_updated"))
+            deleted = last_deleted.get(content_types[related_model].pk)
+            versions.append((f"{aggregates['count']}:{aggregates['last_updated']}", aggregates["last_updated"]))
+            versions.append((deleted, deleted))
+        return self._combine_versions(*versions)
+
+    def get_list_version(self, queryset):
+        """
+        Return the `(version, last_modified)` of the given list queryset.
+        """
+        # Only the primary keys of the queryset are selected, so its annotations (if any) aren't computed
+        aggregates = queryset.model.objects.filter(pk__in=queryset.values("pk")).aggregate(
+            count=Count("pk"), last_updated=Max("last_updated")
+        )
+        last_deleted = (
+            ObjectChange.objects.filter(
+                changed_object_type=ContentType.objects.get_for_model(queryset.model),
+                action=ObjectChangeActionChoices.ACTION_DELETE,
+            )
+            .order_by()
+            .aggregate(time=Max("time"))["time"]
+        )
+        return self._combine_versions(
+            (f"{aggregates['count']}:{aggregates['last_updated']}", aggregates["last_updated"]),
+            (last_deleted, last_deleted),
+            self.get_related_version(),
+        )
+
+    def list(self, request, *args, **kwargs):
+        version, last_modified = self.get_list_version(self.filter_queryset(self.get_queryset()))
+        etag = self.get_etag(request, version)
+        response = self.get_not_modified_response(request, etag, last_modified)
+        if response is None:
+            response = self.set_conditional_headers(super().list(request, *args, **kwargs), etag, last_modified)
+        return response
+
+    def get_object_version(self, instance):
+        """
+        Return the `(version, last_modified)` of the given object.
+        """
+        return self._combine_versions(
+            (f"{instance.pk}:{instance.last_updated}", instance.last_updated), self.get_related_version()
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        version, last_modified = self.get_object_version(instance)
+        etag = self.get_etag(request, version)
+        response = self.get_not_modified_response(request, etag, last_modified)
+        if response is None:
+            serializer = self.get_serializer(instance)
+            response = self.set_conditional_headers(Response(serializer.data), etag, last_modified)
+        return response
+
+
+class RedirectMapContextFilterBackend(ViewQueryParamsFilterBackend):
     """
-    Used by views that work with config context models (device and virtual machine).
+    Used by views that work with redirect map context models (CdnSite).
 
     Recognizes that "exclude" is not a filterset parameter but rather a view parameter (see ConfigContextQuerySetMixin)
     """
@@ -50,34 +209,395 @@ class RedirectMapContextFilterBackend(NautobotFilterBackend):
 
 class RedirectMapContextQuerySetMixin:
     """
-    Used by views that work with config context models (device and virtual machine).
-    Provides a get_queryset() method which deals with adding the config context
-    data annotation or not.
+    Used by views that work with redirect map context models (CdnSite).
+
+    When the rendered redirect map context is requested with `include=redirect_map_context`, provides a queryset
+    annotated with the applicable context data (see `RedirectMapContextModelQuerySet.annotate_config_context_data()`)
+    so that a whole page is rendered without further queries, along with the serializer that renders it.
     """
 
     filter_backends = [RedirectMapContextFilterBackend]
+    redirect_map_context_serializer_class = serializers.CdnSiteWithRedirectMapContextSerializer
+
+    def include_redirect_map_context(self):
+        request = getattr(self, "request", None)
+        if self.brief or request is None:
+            return False
+        included = {
+            name.strip() for value in request.query_params.getlist("include") for name in value.split(",")
+        }
+        return "redirect_map_context" in included
 
     def get_queryset(self):
         """
         Build the proper queryset based on the request context
 
-        If the `brief` query param equates to True or the `exclude` query param
-        includes `config_context` as a value, return the base queryset.
-
-        Else, return the queryset annotated with config context data
+        If the `include` query param includes `redirect_map_context`, return the queryset annotated with redirect map
+        context data, else return the base queryset.
         """
         queryset = super().get_queryset()
-        request = self.get_serializer_context()["request"]
-        if self.brief or (request is not None and "redirect_map_context" in request.query_params.get("exclude", [])):
-            return queryset
-        return queryset.annotate_config_context_data()
+        if self.include_redirect_map_context():
+            return queryset.annotate_config_context_data()
+        return queryset
+
+    def get_serializer_class(self):
+        if self.include_redirect_map_context():
+            return self.redirect_map_context_serializer_class
+        return super().get_serializer_class()
+
+    # Rendered contexts change without the sites themselves being updated, the change feed records when they do
+
+    def get_list_version(self, queryset):
+        version, last_modified = super().get_list_version(queryset)
+        return self._add_rendered_version(version, last_modified)
 
+    def get_object_version(self, instance):
+        version, last_modified = super().get_object_version(instance)
+        return self._add_rendered_version(version, last_modified)
 
-class RedirectMapContextViewSet(ModelViewSet):
-    queryset = models.RedirectMapContext.objects.prefetch_related(
-        "regions",
-        "cdnsites",
+    def _add_rendered_version(self, version, last_modified):
+        if not self.include_redirect_map_context():
+            return version, last_modified
+        render_cursor, render_time = get_latest_render_change()
+        timestamps = [timestamp for timestamp in (last_modified, render_time) if timestamp]
+        return f"{version}:{render_cursor}", max(timestamps) if timestamps else None
+
+
+class HyperCacheMemoryProfileViewSet(ConditionalGetMixin, NautobotModelViewSet):
+    queryset = models.HyperCacheMemoryProfile.objects.all()
+    serializer_class = serializers.HyperCacheMemoryProfileSerializer
+    filter_class = filters.HyperCacheMemoryProfileFilterSet
+    related_version_models = (Tag,)
+
+class SiteRoleViewSet(ConditionalGetMixin, NautobotModelViewSet):
+    queryset = annotate_site_role_capacity(annotate_site_role_cdnsite_count(models.SiteRole.objects.all()))
+    serializer_class = serializers.SiteRoleSerializer
+    filterset_class = filters.SiteRoleFilterSet
+    # The parent is nested, and the subtree aggregates change along with any CdnSite or with the rest of the tree
+    related_version_models = (models.SiteRole, models.CdnSite)
+
+
+# Supported `output` formats of the CdnSite export, and their content type
+EXPORT_CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+}
+
+
+def _iter_batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class CdnSiteViewSet(RedirectMapContextQuerySetMixin, ConditionalGetMixin, NautobotModelViewSet):
+    # Everything CdnSiteSerializer touches, including its nested Location, role and memory profile
+    queryset = models.CdnSite.objects.select_related(
+        "status",
+        "cdn_site_role",
+        "location__location_type",
+        "location__parent",
+        "location__status",
+        "location__tenant",
+        "cacheMemoryProfileId",
+        "neighbor1",
+        "neighbor2",
+        "failover_site",
+        "local_redirectmap_context_schema__owner_content_type",
+        "local_redirectmap_context_data_owner_content_type",
+    ).prefetch_related(
+        "tags",
+        "location__tags",
+        "local_redirectmap_context_schema__owner",
+    )
+    serializer_class = serializers.CdnSiteSerializer
+    filter_class = filters.CdnSiteFilterSet
+    related_version_models = (
+        Status,
+        models.SiteRole,
+        Location,
+        models.HyperCacheMemoryProfile,
+        Tag,
+        ConfigContextSchema,
+    )
+    # Sparse fieldset (see SparseFieldsetSerializerMixin) and export format
+    view_query_params = ("fields", "output")
+    # Number of sites rendered and serialized together by the export
+    export_batch_size = 500
+
+    @extend_schema(responses={200: serializers.RenderedRedirectMapContextSerializer})
+    @action(detail=True, url_path="redirect-map-context")
+    def redirect_map_context(self, request, pk):
+        """
+        Return the materialized, rendered redirect map context of a CdnSite along with its hash.
+        """
+        cdnsite = self.get_object()
+        rendered = get_rendered_redirectmap_context(cdnsite)
+        # The payload only changes with the rendered data or the nested CdnSite
+        etag = self.get_etag(request, cdnsite.pk, cdnsite.last_updated, rendered.data_hash)
+        last_modified = max(filter(None, (cdnsite.last_updated, rendered.last_rendered)))
+        response = self.get_not_modified_response(request, etag, last_modified)
+        if response is None:
+            serializer = serializers.RenderedRedirectMapContextSerializer(rendered, context={"request": request})
+            response = self.set_conditional_headers(Response(serializer.data), etag, last_modified)
+        return response
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="output",
+                type=OpenApiTypes.STR,
+                enum=list(EXPORT_CONTENT_TYPES),
+                description="Output format: newline-delimited JSON (default) or a JSON array",
+            )
+        ],
+        responses={200: serializers.CdnSiteWithRedirectMapContextSerializer(many=True)},
+    )
+    @action(detail=False, url_path="export", pagination_class=None)
+    def export(self, request):
+        """
+        Stream every (filtered) CdnSite along with its rendered redirect map context.
+
+        Sites are read with a server-side cursor and serialized in batches, and each site is written out as soon as it
+        is serialized, so memory use doesn't depend on the number of sites.
+        """
+        output = request.query_params.get("output", "ndjson")
+        if output not in EXPORT_CONTENT_TYPES:
+            return Response(
+                {"output": [f"Must be one of: {', '.join(EXPORT_CONTENT_TYPES)}"]}, status=status.HTTP_400_BAD_REQUEST
+            )
+        queryset = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(
+            self._iter_export(queryset, request, output), content_type=EXPORT_CONTENT_TYPES[output]
+        )
+
+    @extend_schema(responses={200: serializers.CdnSiteCapacitySerializer(many=True)})
+    @action(detail=False, url_path="capacity")
+    def capacity(self, request):
+        """
+        List the (filtered) CdnSites along with the bandwidth available to each of them, including their neighbors
+        and failover site. The totals are computed in the database.
+        """
+        queryset = annotate_cdnsite_capacity(
+            self.filter_queryset(models.CdnSite.objects.restrict(request.user, "view"))
+        )
+        page = self.paginate_queryset(queryset)
+        serializer = serializers.CdnSiteCapacitySerializer(
+            page if page is not None else queryset, many=True, context={"request": request}
+        )
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
+    @extend_schema(
+        request=serializers.CdnSiteAssociationBulkSerializer,
+        responses={200: serializers.CdnSiteAssociationResultSerializer},
+    )
+    @action(detail=False, methods=["post"], url_path="associations")
+    def associations(self, request):
+        """
+        Associate devices and VMs with CdnSites in bulk, through the `cdnsite_devices` and `cdnsite_vms`
+        Relationships.
+
+        All names are resolved with one query per model and the associations are applied in a single transaction:
+        either every pair is applied, or none is.
+        """
+        serializer = serializers.CdnSiteAssociationBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        pairs = serializer.validated_data["associations"]
+        replace = serializer.validated_data["replace"]
+
+        required_permissions = ["extras.add_relationshipassociation"]
+        if replace:
+            required_permissions.append("extras.delete_relationshipassociation")
+        if not request.user.has_perms(required_permissions):
+            return Response(
+                {"detail": "You do not have permission to create or delete relationship associations."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        resolved = {}
+        errors = {}
+        for field_name, queryset in (
+            ("cdnsite", models.CdnSite.objects.restrict(request.user, "change")),
+            ("device", Device.objects.restrict(request.user, "view")),
+            ("virtual_machine", VirtualMachine.objects.restrict(request.user, "view")),
+        ):
+            resolved[field_name], errors[field_name] = resolve_identifiers(
+                queryset, (pair[field_name] for pair in pairs if field_name in pair)
+            )
+
+        associations = []
+        pair_errors = {}
+        for index, pair in enumerate(pairs):
+            source_field = "device" if "device" in pair else "virtual_machine"
+            messages = [
+                errors[field_name][pair[field_name]]
+                for field_name in ("cdnsite", source_field)
+                if pair[field_name] in errors[field_name]
+            ]
+            if messages:
+                pair_errors[index] = messages
+                continue
+            relationship = CDNSITE_DEVICES_RELATIONSHIP if source_field == "device" else CDNSITE_VMS_RELATIONSHIP
+            associations.append(
+                (relationship, resolved[source_field][pair[source_field]], resolved["cdnsite"][pair["cdnsite"]])
+            )
+        if pair_errors:
+            return Response({"associations": pair_errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            result = sync_cdnsite_associations(associations, replace=replace, user=request.user)
+        except PermissionDenied as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_403_FORBIDDEN)
+        return Response(serializers.CdnSiteAssociationResultSerializer(result).data)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="device_id", type=OpenApiTypes.UUID, many=True, description="ID of a Device to look up"
+            ),
+            OpenApiParameter(
+                name="virtual_machine_id",
+                type=OpenApiTypes.UUID,
+                many=True,
+                description="ID of a VirtualMachine to look up",
+            ),
+        ],
+        responses={200: serializers.AssociatedCdnSiteSerializer(many=True)},
+    )
+    @action(detail=False, url_path="lookup", pagination_class=None)
+    def lookup(self, request):
+        """
+        Return the CdnSites the given devices and VMs are associated with, along with their rendered redirect map
+        context, one entry per association.
+
+        IDs are given as repeated or comma-separated `device_id` and `virtual_machine_id` parameters, and are all
+        looked up with a fixed number of queries.
+        """
+        source_ids = {}
+        for param, relationship in (
+            ("device_id", CDNSITE_DEVICES_RELATIONSHIP),
+            ("virtual_machine_id", CDNSITE_VMS_RELATIONSHIP),
+        ):
+            values = [value.strip() for item in request.query_params.getlist(param) for value in item.split(",")]
+            try:
+                source_ids[relationship] = {uuid.UUID(value) for value in values if value}
+            except ValueError:
+                return Response({param: ["Must be a list of UUIDs."]}, status=status.HTTP_400_BAD_REQUEST)
+        if not any(source_ids.values()):
+            return Response(
+                {"detail": "At least one `device_id` or `virtual_machine_id` is required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        object_types = {
+            CDNSITE_DEVICES_RELATIONSHIP: "dcim.device",
+            CDNSITE_VMS_RELATIONSHIP: "virtualization.virtualmachine",
+        }
+        results = []
+        for relationship, source_id, rendered in get_associated_cdnsites(
+            source_ids,
+            queryset=RelationshipAssociation.objects.restrict(request.user, "view"),
+            cdnsites=models.CdnSite.objects.restrict(request.user, "view"),
+        ):
+            # Several devices may share a site and its rendered context, so each entry gets its own copy
+            result = copy.copy(rendered)
+            result.object_type = object_types[relationship]
+            result.object_id = source_id
+            results.append(result)
+        serializer = serializers.AssociatedCdnSiteSerializer(results, many=True, context={"request": request})
+        return Response(serializer.data)
+
+    def _iter_export(self, queryset, request, output):
+        encoder = JSONEncoder()
+        separator = "\n" if output == "ndjson" else ",\n"
+        if output == "json":
+            yield "["
+        first = True
+        pk_iterator = queryset.values_list("pk", flat=True).iterator(chunk_size=self.export_batch_size)
+        for pks in _iter_batches(pk_iterator, self.export_batch_size):
+            batch = self.get_queryset().filter(pk__in=pks)
+            cdnsites = {cdnsite.pk: cdnsite for cdnsite in batch}
+            serializer = serializers.CdnSiteWithRedirectMapContextSerializer(
+                [cdnsites[pk] for pk in pks if pk in cdnsites],
+                many=True,
+                context={"request": request, "rendered_redirectmap_contexts": get_rendered_redirectmap_contexts(batch)},
+            )
+            for item in serializer.data:
+                yield ("" if first else separator) + encoder.encode(item)
+                first = False
+        yield "]\n" if output == "json" else "\n"
+
+#
+# Config contexts
+#
+
+
+class RedirectMapContextViewSet(ConditionalGetMixin, ModelViewSet):
+    # Everything RedirectMapContextSerializer touches, so that a page is served with a fixed number of queries.
+    # The owner generic foreign keys are prefetched with one query per owner content type.
+    queryset = models.RedirectMapContext.objects.select_related(
+        "owner_content_type",
+        "config_context_schema__owner_content_type",
+    ).prefetch_related(
+        Prefetch(
+            "locations",
+            queryset=Location.objects.select_related("location_type", "parent", "status", "tenant").prefetch_related(
+                "tags"
+            ),
+        ),
+        Prefetch("cdnsites", queryset=models.CdnSite.objects.prefetch_related("tags")),
         "cdn_site_roles",
+        "tags",
+        "owner",
+        "config_context_schema__owner",
     )
     serializer_class = serializers.RedirectMapContextSerializer
-    filterset_class = filters.RedirectMapContextFilterSet
\ No newline at end of file
+    filterset_class = filters.RedirectMapContextFilterSet
+    related_version_models = (Location, models.CdnSite, models.SiteRole, Tag, ConfigContextSchema, GitRepository)
+
+
+class ChangeFeedViewSet(ReadOnlyModelViewSet):
+    """
+    Changes to CdnSites, SiteRoles, HyperCacheMemoryProfiles, RedirectMapContexts and rendered redirect map contexts.
+
+    `?since=<cursor>` lists the changes recorded after the given cursor, in order, along with the cursor to use for
+    the next request. `complete` is false when changes after the cursor were already pruned, in which case the client
+    has to resynchronize fully.
+    """
+
+    queryset = models.ChangeFeedEntry.objects.select_related("object_type")
+    serializer_class = serializers.ChangeFeedEntrySerializer
+    # Default and maximum number of changes returned per request
+    default_limit = 1000
+    max_limit = 10000
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name="since", type=OpenApiTypes.INT, description="Cursor of the last change received"),
+            OpenApiParameter(name="limit", type=OpenApiTypes.INT, description="Maximum number of changes to return"),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        try:
+            since = int(request.query_params.get("since", 0))
+            limit = max(1, min(int(request.query_params.get("limit", self.default_limit)), self.max_limit))
+        except ValueError:
+            return Response({"detail": "`since` and `limit` must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+
+        entries, complete = get_changes(self.get_queryset(), since, limit)
+        serializer = self.get_serializer(entries, many=True)
+        return Response(
+            {
+                "cursor": entries[-1].pk if entries else since,
+                "complete": complete,
+                "has_more": len(entries) >= limit,
+                "results": serializer.data,
+            }
+        )
@@ -0,0 +1,224 @@
+"""Devices and VMs associated with CdnSites through the `cdnsite_devices` and `cdnsite_vms` Relationships."""
+from collections import defaultdict
+import uuid
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.db.models import Count, Q
+
+from nautobot.extras.choices import ObjectChangeActionChoices
+from nautobot.extras.models import Relationship, RelationshipAssociation
+
+from .models import CdnSite
+from .rendering import get_rendered_redirectmap_contexts
+from .utils import log_object_changes
+
+# Keys of the Relationships created by signals.py, see create_cdnsite_to_device_relationship()
+CDNSITE_DEVICES_RELATIONSHIP = "cdnsite_devices"
+CDNSITE_VMS_RELATIONSHIP = "cdnsite_vms"
+CDNSITE_RELATIONSHIPS = (CDNSITE_DEVICES_RELATIONSHIP, CDNSITE_VMS_RELATIONSHIP)
+
+
+def get_cdnsite_associations(cdnsite_ids, queryset=None):
+    """
+    Return the RelationshipAssociations of devices and VMs to the given CdnSite IDs.
+
+    The relationships and content types are selected along with the associations, and the associated devices and VMs
+    are prefetched with one query per type rather than looked up one at a time.
+    """
+    if queryset is None:
+        queryset = RelationshipAssociation.objects.all()
+    return (
+        queryset.filter(
+            relationship__key__in=CDNSITE_RELATIONSHIPS,
+            destination_type=ContentType.objects.get_for_model(CdnSite),
+            destination_id__in=cdnsite_ids,
+        )
+        .select_related("relationship", "source_type", "destination_type")
+        .prefetch_related("source")
+    )
+
+
+def get_cdnsite_association_counts(associations):
+    """
+    Return the number of devices and VMs among the given CdnSite associations, counted with a single query.
+    """
+    return associations.order_by().aggregate(
+        device_count=Count("pk", filter=Q(relationship__key=CDNSITE_DEVICES_RELATIONSHIP)),
+        virtualmachine_count=Count("pk", filter=Q(relationship__key=CDNSITE_VMS_RELATIONSHIP)),
+    )
+
+
+def get_associated_cdnsites(source_ids, queryset=None, cdnsites=None):
+    """
+    Look up the CdnSites that devices and VMs are associated with, along with their rendered redirect map contexts.
+
+    `source_ids` maps relationship keys (`cdnsite_devices` or `cdnsite_vms`) to device or VM IDs. Returns a list of
+    `(relationship_key, source_id, rendered_redirectmap_context)` tuples, one per association, where the
+    RenderedRedirectMapContext comes with its CdnSite. The associations, the CdnSites and the stored contexts are
+    each read with one query, however many IDs are given; missing contexts are rendered in bulk.
+    """
+    if queryset is None:
+        queryset = RelationshipAssociation.objects.all()
+    if cdnsites is None:
+        cdnsites = CdnSite.objects.all()
+
+    query = Q()
+    for key, ids in source_ids.items():
+        if ids:
+            query |= Q(relationship__key=key, source_id__in=ids)
+    if not query:
+        return []
+    associations = list(
+        queryset.filter(query, destination_type=ContentType.objects.get_for_model(CdnSite)).values_list(
+            "relationship__key", "source_id", "destination_id"
+        )
+    )
+
+    cdnsites = cdnsites.filter(pk__in={cdnsite_id for _, _, cdnsite_id in associations})
+    cdnsites_by_id = {cdnsite.pk: cdnsite for cdnsite in cdnsites}
+    rendered = get_rendered_redirectmap_contexts(cdnsites)
+    results = []
+    for key, source_id, cdnsite_id in associations:
+        # Sites hidden from the user aren't listed
+        if cdnsite_id not in cdnsites_by_id or cdnsite_id not in rendered:
+            continue
+        rendered[cdnsite_id].cdnsite = cdnsites_by_id[cdnsite_id]
+        results.append((key, source_id, rendered[cdnsite_id]))
+    return results
+
+
+def resolve_identifiers(queryset, identifiers):
+    """
+    Resolve names or IDs to the primary keys of objects of `queryset`, with a single query.
+
+    Returns a dict mapping each resolved identifier to a primary key, and a dict mapping each identifier that couldn't
+    be resolved (unknown, or a name shared by several objects) to an error message.
+    """
+    ids = {}
+    names = set()
+    for identifier in set(identifiers):
+        try:
+            ids[identifier] = uuid.UUID(identifier)
+        except ValueError:
+            names.add(identifier)
+
+    found_ids = set()
+    matches_by_name = defaultdict(list)
+    for pk, name in queryset.filter(Q(pk__in=ids.values()) | Q(name__in=names)).values_list("pk", "name").iterator():
+        found_ids.add(pk)
+        if name in names:
+            matches_by_name[name].append(pk)
+
+    resolved = {}
+    errors = {}
+    verbose_name = queryset.model._meta.verbose_name
+    for identifier, pk in ids.items():
+        if pk in found_ids:
+            resolved[identifier] = pk
+        else:
+            errors[identifier] = f"No {verbose_name} with ID {identifier} exists."
+    for name in names:
+        if len(matches_by_name[name]) == 1:
+            resolved[name] = matches_by_name[name][0]
+        elif matches_by_name[name]:
+            errors[name] = f"Several {verbose_name} objects are named {name!r}, use its ID instead."
+        else:
+            errors[name] = f"No {verbose_name} named {name!r} exists."
+    return resolved, errors
+
+
+def _check_permission(user, action, pks, batch_size):
+    """
+    Raise PermissionDenied unless every existing RelationshipAssociation among `pks` is within the constraints of the
+    user's `action` object permissions.
+    """
+    for start in range(0, len(pks), batch_size):
+        batch = pks[start : start + batch_size]
+        permitted = RelationshipAssociation.objects.restrict(user, action).filter(pk__in=batch).count()
+        if permitted != RelationshipAssociation.objects.filter(pk__in=batch).count():
+            raise PermissionDenied(f"You do not have permission to {action} some of these relationship associations.")
+
+
+def sync_cdnsite_associations(associations, replace=False, user=None, batch_size=1000):
+    """
+    Bring the device and VM associations of CdnSites in line with `associations`, an iterable of
+    `(relationship_key, source_id, cdnsite_id)` tuples.
+
+    Missing associations are created. If `replace` is True, the other associations of the CdnSites listed are
+    deleted. Existing associations are read with one query and the changes are applied in a single transaction: new
+    associations are bulk inserted and logged in the change log, stale ones are deleted in batches with regular
+    deletes, which fire the usual signals.
+
+    If a `user` is given, the associations to delete and the created ones are checked against the constraints of their
+    object permissions, like Nautobot's bulk views do: PermissionDenied is raised, and nothing is applied, if any of
+    them is outside of those constraints.
+
+    Returns the number of associations created, deleted and left unchanged.
+    """
+    associations = set(associations)
+    relationships = {
+        key: (pk, source_type_id)
+        for key, pk, source_type_id in Relationship.objects.filter(key__in=CDNSITE_RELATIONSHIPS).values_list(
+            "key", "pk", "source_type_id"
+        )
+    }
+    cdnsite_type = ContentType.objects.get_for_model(CdnSite)
+
+    existing = {}
+    for pk, key, source_id, cdnsite_id in (
+        RelationshipAssociation.objects.filter(
+            relationship__key__in=CDNSITE_RELATIONSHIPS,
+            destination_type=cdnsite_type,
+            destination_id__in={cdnsite_id for _, _, cdnsite_id in associations},
+        )
+        .values_list("pk", "relationship__key", "source_id", "destination_id")
+        .iterator()
+    ):
+        existing[(key, source_id, cdnsite_id)] = pk
+
+    new_associations = [
+        RelationshipAssociation(
+            relationship_id=relationships[key][0],
+            source_type_id=relationships[key][1],
+            source_id=source_id,
+            destination_type=cdnsite_type,
+            destination_id=cdnsite_id,
+        )
+        for key, source_id, cdnsite_id in associations
+        if (key, source_id, cdnsite_id) not in existing
+    ]
+    stale_pks = [pk for association, pk in existing.items() if association not in associations] if replace else []
+
+    with transaction.atomic():
+        if user is not None:
+            _check_permission(user, "delete", stale_pks, batch_size)
+        deleted = 0
+        for start in range(0, len(stale_pks), batch_size):
+            # A regular delete, so that the change log, webhooks and other receivers see each association go
+            _, deleted_by_model = RelationshipAssociation.objects.filter(
+                pk__in=stale_pks[start : start + batch_size]
+            ).delete()
+            deleted += deleted_by_model.get(RelationshipAssociation._meta.label, 0)
+
+        # Associations inserted concurrently by another request are skipped, so only the rows that were actually
+        # inserted here are checked, logged and counted
+        RelationshipAssociation.objects.bulk_create(new_associations, batch_size=batch_size, ignore_conflicts=True)
+        inserted_pks = set()
+        for start in range(0, len(new_associations), batch_size):
+            inserted_pks.update(
+                RelationshipAssociation.objects.filter(
+                    pk__in=[association.pk for association in new_associations[start : start + batch_size]]
+                ).values_list("pk", flat=True)
+            )
+        created_associations = [association for association in new_associations if association.pk in inserted_pks]
+        if user is not None:
+            _check_permission(user, "add", [association.pk for association in created_associations], batch_size)
+        log_object_changes(created_associations, ObjectChangeActionChoices.ACTION_CREATE)
+
+    return {
+        "created": len(created_associations),
+        "deleted": deleted,
+        "unchanged": len(associations) - len(created_associations),
+    }
@@ -0,0 +1,65 @@
+"""Counts, bandwidth and capacity aggregates of CdnSites and SiteRole subtrees, computed in the database."""
+from django.db.models import Func, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import CdnSite
+
+
+def _aggregate(queryset, function, field_name):
+    """
+    Return a scalar subquery applying the SQL aggregate `function` to `field_name` over every row of `queryset`, 0 if
+    there are none.
+
+    Like `count_related()`, the aggregate is applied with a plain `Func` so that the subquery isn't grouped.
+    """
+    subquery = Subquery(
+        queryset.order_by().annotate(value=Func(field_name, function=function)).values("value"),
+        output_field=IntegerField(),
+    )
+    return Coalesce(subquery, Value(0), output_field=IntegerField())
+
+
+def _get_subtree_cdnsites():
+    """
+    Return the CdnSites assigned to the SiteRole `OuterRef("pk")` or any of its descendants, expanded with the
+    SiteRoleClosure table.
+    """
+    return CdnSite.objects.filter(cdn_site_role__ancestor_closures__ancestor=OuterRef("pk"))
+
+
+def annotate_site_role_cdnsite_count(queryset):
+    """
+    Annotate each SiteRole of the given queryset with `cdnsite_count`: the number of CdnSites of its whole subtree,
+    matching the sites listed by the `cdn_site_role` filter of CdnSites.
+    """
+    return queryset.annotate(cdnsite_count=_aggregate(_get_subtree_cdnsites(), "COUNT", "pk"))
+
+
+def annotate_site_role_capacity(queryset):
+    """
+    Annotate each SiteRole of the given queryset with aggregates over the CdnSites of its whole subtree.
+
+    - `subtree_bandwidth_mbps`: the total `bandwidthLimitMbps` of the sites
+    - `subtree_diskless_cdnsite_count`: the number of sites with `enableDisklessMode`
+
+    Subtrees are expanded with the SiteRoleClosure table, so the whole queryset is aggregated in a single query.
+    """
+    subtree_cdnsites = _get_subtree_cdnsites()
+    return queryset.annotate(
+        subtree_bandwidth_mbps=_aggregate(subtree_cdnsites, "SUM", "bandwidthLimitMbps"),
+        subtree_diskless_cdnsite_count=_aggregate(subtree_cdnsites.filter(enableDisklessMode=True), "COUNT", "pk"),
+    )
+
+
+def annotate_cdnsite_capacity(queryset):
+    """
+    Annotate each CdnSite of the given queryset with `available_bandwidth_mbps`: the total `bandwidthLimitMbps` of
+    the site, its neighbors and its failover site, each site counted once.
+    """
+    capacity_cdnsites = CdnSite.objects.filter(
+        Q(pk=OuterRef("pk"))
+        | Q(pk=OuterRef("neighbor1_id"))
+        | Q(pk=OuterRef("neighbor2_id"))
+        | Q(pk=OuterRef("failover_site_id"))
+    )
+    return queryset.annotate(available_bandwidth_mbps=_aggregate(capacity_cdnsites, "SUM", "bandwidthLimitMbps"))
@@ -0,0 +1,120 @@
+"""Recording, pruning and reading of the change feed."""
+from datetime import timedelta
+import logging
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from .choices import ChangeFeedActionChoices
+from .models import CdnSite, ChangeFeedEntry
+
+logger = logging.getLogger(__name__)
+
+PLUGIN_SETTINGS = settings.PLUGINS_CONFIG["nautobot_cdn_models"]
+
+# Cache key used to prune the change feed at most once per CHANGE_FEED_PRUNE_INTERVAL seconds
+CHANGE_FEED_PRUNE_KEY = "nautobot_cdn_models:change_feed_pruned"
+CHANGE_FEED_PRUNE_INTERVAL = 3600
+
+
+def record_changes(instances, action):
+    """
+    Append an entry for each of the given instances to the change feed, once the current transaction (if any) commits.
+
+    Cursors are allocated when entries are inserted: inserting them on commit, rather than within the transaction
+    making the changes, keeps a long transaction from committing entries below cursors clients already advanced past.
+    Entries of transactions that are rolled back are never recorded.
+    """
+    entries = [
+        ChangeFeedEntry(
+            action=action,
+            object_type=ContentType.objects.get_for_model(instance),
+            object_id=instance.pk,
+            object_repr=str(instance)[:200],
+        )
+        for instance in instances
+    ]
+    if entries:
+        transaction.on_commit(lambda: _insert_entries(entries))
+
+
+def _insert_entries(entries):
+    ChangeFeedEntry.objects.bulk_create(entries, batch_size=1000)
+    prune_change_feed()
+
+
+def record_rendered_changes(cdnsite_ids=None):
+    """
+    Append an entry to the change feed for the CdnSites (or every CdnSite if None) whose rendered context is affected.
+
+    This is called once the changes affecting the rendered contexts are committed, see
+    `rendering.invalidate_rendered_redirectmap_contexts()`, so the entry is recorded right away.
+    """
+    ChangeFeedEntry.objects.create(
+        action=ChangeFeedActionChoices.ACTION_RENDER,
+        object_type=ContentType.objects.get_for_model(CdnSite),
+        affected_cdnsites=sorted(str(cdnsite_id) for cdnsite_id in cdnsite_ids) if cdnsite_ids is not None else None,
+    )
+    prune_change_feed()
+
+
+def get_latest_render_change():
+    """
+    Return the cursor and time of the latest change to rendered redirect map contexts, or `(None, None)`.
+    """
+    entry = (
+        ChangeFeedEntry.objects.filter(action=ChangeFeedActionChoices.ACTION_RENDER)
+        .order_by("-pk")
+        .values_list("pk", "time")
+        .first()
+    )
+    return entry or (None, None)
+
+
+def prune_change_feed(force=False):
+    """
+    Delete change feed entries older than the `change_feed_retention_days` setting.
+
+    The latest entry is always kept, so that `get_changes()` can tell that nothing after it was pruned even if nothing
+    was recorded for longer than that.
+
+    Unless `force` is set, this does nothing if the feed was already pruned within the last hour, in any process.
+    """
+    if not force and not cache.add(CHANGE_FEED_PRUNE_KEY, True, CHANGE_FEED_PRUNE_INTERVAL):
+        return
+    latest_pk = ChangeFeedEntry.objects.order_by("-pk").values_list("pk", flat=True).first()
+    if latest_pk is None:
+        return
+    retention_days = PLUGIN_SETTINGS.get("change_feed_retention_days", 7)
+    deleted, _ = ChangeFeedEntry.objects.filter(
+        pk__lt=latest_pk, time__lt=timezone.now() - timedelta(days=retention_days)
+    ).delete()
+    logger.debug("Pruned %d change feed entries", deleted)
+
+
+def get_changes(queryset, since, limit):
+    """
+    Return the entries of the given change feed queryset recorded after the `since` cursor, up to `limit` of them.
+
+    Entries are inserted once the transactions making the changes commit, so cursors follow the commit order, except
+    for entries inserted concurrently that may commit in a different order than their cursors were allocated. Only
+    entries recorded at least `change_feed_settle_seconds` ago are served, which leaves ample time for those to commit.
+
+    Returns the list of entries, and whether the feed still holds every entry recorded after `since`. When it doesn't
+    (because they were pruned), the client missed changes and has to resynchronize fully.
+    """
+    settled = timezone.now() - timedelta(seconds=PLUGIN_SETTINGS.get("change_feed_settle_seconds", 5))
+    entries = list(queryset.filter(pk__gt=since, time__lte=settled).order_by("pk")[:limit])
+    # Pruning deletes the oldest entries, so nothing after the cursor is missing if the oldest entry retained (among all
+    # entries, whatever the queryset filters) is the one right after it, or the cursor's own entry or an older one.
+    # Gaps in the sequence of cursors can only make this report missing entries that never existed, which is safe.
+    if not since:
+        complete = True
+    else:
+        oldest_pk = ChangeFeedEntry.objects.aggregate(oldest_pk=Min("pk"))["oldest_pk"]
+        complete = oldest_pk is not None and oldest_pk <= since + 1
+    return entries, complete
@@ -0,0 +1,15 @@
+from nautobot.core.choices import ChoiceSet
+
+
+class ChangeFeedActionChoices(ChoiceSet):
+    ACTION_CREATE = "create"
+    ACTION_UPDATE = "update"
+    ACTION_DELETE = "delete"
+    ACTION_RENDER = "render"
+
+    CHOICES = (
+        (ACTION_CREATE, "Created"),
+        (ACTION_UPDATE, "Updated"),
+        (ACTION_DELETE, "Deleted"),
+        (ACTION_RENDER, "Rendered contexts affected"),
+    )
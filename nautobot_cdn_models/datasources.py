@@ -1,18 +1,30 @@
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import copy
+from functools import reduce
+import hashlib
+import json
 import logging
+import multiprocessing
+import operator
 import os
 import re
 from urllib.parse import quote
 
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
-from django.core.exceptions import MultipleObjectsReturned, ObjectDoesNotExist
+from django.core.exceptions import FieldDoesNotExist, ValidationError
 from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
 import yaml
 
 from nautobot.core.utils.git import GitRepo
 from nautobot.dcim.models import Location
 from nautobot.extras.choices import (
     LogLevelChoices,
+    ObjectChangeActionChoices,
     SecretsGroupAccessTypeChoices,
     SecretsGroupSecretTypeChoices,
 )
@@ -25,10 +37,23 @@ from nautobot.extras.models import (
 )
 from nautobot.extras.registry import DatasourceContent, register_datasource_contents
 
-from .models import CdnSite, SiteRole, RedirectMapContext
+from .changefeed import record_changes
+from .choices import ChangeFeedActionChoices
+from .dependencies import update_redirectmap_context_dependencies_in_bulk
+from .models import (
+    CdnSite,
+    GitRedirectMapContextFile,
+    GitRedirectMapContextSync,
+    RedirectMapContext,
+    SiteRole,
+)
+from .rendering import invalidate_rendered_redirectmap_contexts
+from .utils import log_object_changes
 
 logger = logging.getLogger(__name__)
 
+PLUGIN_SETTINGS = settings.PLUGINS_CONFIG["nautobot_cdn_models"]
+
     
 def refresh_git_redirectmap_config_contexts(repository_record, job_result, delete=False):
     logger.debug("refresh_git_redirectmap_config_contexts called")
@@ -39,125 +64,180 @@ def refresh_git_redirectmap_config_contexts(repository_record, job_result, delet
         update_git_redirectmap_config_contexts(repository_record, job_result)
     else:
         delete_git_redirectmap_config_contexts(repository_record, job_result)
+        # Forget the previous sync, so that the contents are fully imported again if they are provided again later
+        GitRedirectMapContextSync.objects.filter(repository=repository_record).delete()
 
 
-def update_git_redirectmap_config_contexts(repository_record, job_result):
-    """Refresh any config contexts provided by this Git repository."""
-    config_context_path = os.path.join(repository_record.filesystem_path, "redirectmap_contexts")
-    if not os.path.isdir(config_context_path):
-        return
+# Directories under `redirectmap_contexts/` whose files imply a filter on the context they contain
+REDIRECTMAP_CONTEXT_FILTER_TYPES = (
+    "locations",
+    "cdn_site_roles",
+    "cdnsites",
+    "tags",
+    "dynamic_groups",
+)
+
+# Directories under `redirectmap_contexts/` whose files contain the local context of the object they are named after
+REDIRECTMAP_CONTEXT_LOCAL_TYPES = ("cdnsites",)
 
-    managed_redirectmap_config_contexts = set()
-    managed_local_redirectmap_config_contexts = defaultdict(set)
 
-    # First, handle the "flat file" case - data files in the root config_context_path,
-    # whose metadata is expressed purely within the contents of the file:
+def get_redirectmap_context_files(config_context_path):
+    """
+    Return a dict mapping the path (relative to `config_context_path`) of every redirect map context file to the list
+    of `(kind, type)` imports to apply to it, `kind` being one of "flat", "filter" or "local".
+    """
+    files = defaultdict(list)
+
+    # "Flat files" in the root config_context_path, whose metadata is expressed purely within the contents of the file
     for file_name in os.listdir(config_context_path):
-        if not os.path.isfile(os.path.join(config_context_path, file_name)):
-            continue
-        msg = f"Loading redirect map context from `{file_name}`"
-        logger.info(msg)
-        job_result.log(msg, grouping="redirect map contexts")
-        try:
-            with open(os.path.join(config_context_path, file_name), "r") as fd:
-                # The data file can be either JSON or YAML; since YAML is a superset of JSON, we can load it regardless
-                context_data = yaml.safe_load(fd)
-
-            # A file can contain one config context dict or a list thereof
-            if isinstance(context_data, dict):
-                context_name = import_redirectmap_context(context_data, repository_record, job_result)
-                managed_redirectmap_config_contexts.add(context_name)
-            elif isinstance(context_data, list):
-                for context_data_entry in context_data:
-                    context_name = import_redirectmap_context(context_data_entry, repository_record, job_result)
-                    managed_redirectmap_config_contexts.add(context_name)
-            else:
-                raise RuntimeError("data must be a dict or list of dicts")
+        if os.path.isfile(os.path.join(config_context_path, file_name)):
+            files[file_name].append(("flat", None))
 
-        except Exception as exc:
-            msg = f"Error in loading redirect map context data from `{file_name}`: {exc}"
-            logger.error(msg)
-            job_result.log(msg, level_choice=LogLevelChoices.LOG_ERROR, grouping="redirect mpa contexts")
-
-    # Next, handle the "filter/name" directory structure case - files in <filter_type>/<name>.(json|yaml)
-    for filter_type in (
-        "locations",
-        "cdn_site_roles",
-        "cdnsites",
-        "tags",
-        "dynamic_groups",
-    ):
-        if os.path.isdir(os.path.join(repository_record.filesystem_path, filter_type)):
-            msg = (
-                f'Found "{filter_type}" directory in the repository root. If this is meant to contain redirect map contexts, '
-                "it should be moved into a `redirectmap_contexts/` subdirectory."
-            )
-            logger.warning(msg)
-            job_result.log(msg, level_choice=LogLevelChoices.LOG_WARNING, grouping="redirect map contexts")
+    # Files in <filter_type>/<name>.(json|yaml) and cdnsite-specific "local" context in (cdnsite)/<name>.(json|yaml)
+    for kind, types in (("filter", REDIRECTMAP_CONTEXT_FILTER_TYPES), ("local", REDIRECTMAP_CONTEXT_LOCAL_TYPES)):
+        for type_ in types:
+            dir_path = os.path.join(config_context_path, type_)
+            if not os.path.isdir(dir_path):
+                continue
+            for file_name in os.listdir(dir_path):
+                files[f"{type_}/{file_name}"].append((kind, type_))
 
-        dir_path = os.path.join(config_context_path, filter_type)
-        if not os.path.isdir(dir_path):
-            continue
+    return files
 
-        for file_name in os.listdir(dir_path):
-            name = os.path.splitext(file_name)[0]
-            msg = f'Loading config context, filter `{filter_type} = [name: "{name}"]`, from `{filter_type}/{file_name}`'
-            logger.info(msg)
-            job_result.log(msg, grouping="redirect map contexts")
-            try:
-                with open(os.path.join(dir_path, file_name), "r") as fd:
-                    # Data file can be either JSON or YAML; since YAML is a superset of JSON, we can load it regardless
-                    context_data = yaml.safe_load(fd)
 
-                # Unlike the above case, these files always contain just a single config context record
+def get_changed_redirectmap_context_files(repository_record, previous_commit, current_commit):
+    """
+    Return the set of paths (relative to `redirectmap_contexts/`) added, modified or removed between two commits.
 
-                # Add the implied filter to the context metadata
-                if filter_type == "device_types":
-                    context_data.setdefault("_metadata", {}).setdefault(filter_type, []).append({"model": name})
-                else:
-                    context_data.setdefault("_metadata", {}).setdefault(filter_type, []).append({"name": name})
-
-                context_name = import_redirectmap_context(context_data, repository_record, job_result)
-                managed_redirectmap_config_contexts.add(context_name)
-            except Exception as exc:
-                msg = f"Error in loading config context data from `{file_name}`: {exc}"
-                logger.error(msg)
-                job_result.log(msg, level_choice=LogLevelChoices.LOG_ERROR, grouping="redirect map contexts")
-
-    # Finally, handle cdnsite-specific "local" context in (cdnsite)/<name>.(json|yaml)
-    for local_type in ("cdnsites", "cdn_site_roles"):
-        if os.path.isdir(os.path.join(repository_record.filesystem_path, local_type)):
+    Returns None if the difference cannot be determined, for example on the first sync or if the previous commit is no
+    longer part of the (possibly shallow) local history, in which case a full sync is needed.
+    """
+    if not previous_commit or not current_commit:
+        return None
+    if previous_commit == current_commit:
+        return set()
+
+    try:
+        repo = GitRepo(repository_record.filesystem_path, repository_record.remote_url).repo
+        diffs = repo.commit(previous_commit).diff(repo.commit(current_commit), paths="redirectmap_contexts")
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.warning("Unable to diff %s..%s, falling back to a full sync: %s", previous_commit, current_commit, exc)
+        return None
+
+    changed_paths = set()
+    for diff in diffs:
+        for path in (diff.a_path, diff.b_path):
+            if path:
+                changed_paths.add(os.path.relpath(path, "redirectmap_contexts"))
+    return changed_paths
+
+
+def get_blob_hash(file_path):
+    """
+    Return the Git blob hash (SHA-1 of a `blob <size>` header, a NUL byte and the content) of the given file.
+    """
+    with open(file_path, "rb") as fd:
+        content = fd.read()
+    blob_hash = hashlib.sha1(f"blob {len(content)}\0".encode())  # nosec: not used for security
+    blob_hash.update(content)
+    return blob_hash.hexdigest()
+
+
+def update_git_redirectmap_config_contexts(repository_record, job_result):
+    """
+    Refresh any config contexts provided by this Git repository.
+
+    If the commit of the previous sync is known, only the files added or modified since that commit (or that failed to
+    import last time) are imported again, and only the contexts of removed files are deleted. Otherwise every file is
+    considered. Either way, files whose Git blob hash matches the one recorded when they were last imported are
+    skipped without being parsed, so resyncing unchanged content doesn't write to the database.
+    """
+    config_context_path = os.path.join(repository_record.filesystem_path, "redirectmap_contexts")
+    if not os.path.isdir(config_context_path):
+        return
+
+    for type_ in dict.fromkeys(REDIRECTMAP_CONTEXT_FILTER_TYPES + REDIRECTMAP_CONTEXT_LOCAL_TYPES):
+        if os.path.isdir(os.path.join(repository_record.filesystem_path, type_)):
             msg = (
-                f'Found "{local_type}" directory in the repository root. If this is meant to contain config contexts, '
+                f'Found "{type_}" directory in the repository root. If this is meant to contain redirect map contexts, '
                 "it should be moved into a `redirectmap_contexts/` subdirectory."
             )
             logger.warning(msg)
             job_result.log(msg, level_choice=LogLevelChoices.LOG_WARNING, grouping="redirect map contexts")
 
-        dir_path = os.path.join(config_context_path, local_type)
-        if not os.path.isdir(dir_path):
-            continue
+    sync_state, _ = GitRedirectMapContextSync.objects.get_or_create(repository=repository_record)
+    file_records = {file_record.path: file_record for file_record in sync_state.files.all()}
+    files = get_redirectmap_context_files(config_context_path)
 
-        for file_name in os.listdir(dir_path):
-            cdnsite_name = os.path.splitext(file_name)[0]
-            msg = f"Loading local config context for `{cdnsite_name}` from `{local_type}/{file_name}`"
-            logger.info(msg)
-            job_result.log(msg, grouping="local config contexts")
-            try:
-                with open(os.path.join(dir_path, file_name), "r") as fd:
-                    context_data = yaml.safe_load(fd)
-
-                import_local_redirectmap_context(
-                    local_type,
-                    cdnsite_name,
-                    context_data,
-                    repository_record,
-                )
-                managed_local_redirectmap_config_contexts[local_type].add(cdnsite_name)
-            except Exception as exc:
-                msg = f"Error in loading local config context from `{local_type}/{file_name}`: {exc}"
-                logger.error(msg)
-                job_result.log(msg, level_choice=LogLevelChoices.LOG_ERROR, grouping="local config contexts")
+    changed_paths = get_changed_redirectmap_context_files(
+        repository_record, sync_state.commit_hash, repository_record.current_head
+    )
+    if changed_paths is None:
+        paths_to_load = set(files)
+    else:
+        paths_to_load = {path for path in files if path in changed_paths or path not in file_records}
+
+    # Files whose content is the same as when they were last imported don't need to be parsed or imported again
+    blob_hashes = {path: get_blob_hash(os.path.join(config_context_path, path)) for path in paths_to_load}
+    paths_to_load = {
+        path
+        for path in paths_to_load
+        if path not in file_records or file_records[path].blob_hash != blob_hashes[path]
+    }
+    if changed_paths is None:
+        msg = f"Full sync: {len(paths_to_load)} of {len(files)} files to load"
+    else:
+        msg = f"Incremental sync from {sync_state.commit_hash}: {len(paths_to_load)} of {len(files)} files to load"
+    logger.info(msg)
+    job_result.log(msg, grouping="redirect map contexts")
+
+    # Files that were removed, or that are about to be reloaded, no longer provide what they provided before
+    stale_paths = set(file_records) - (set(files) - paths_to_load)
+    if stale_paths:
+        sync_state.files.filter(path__in=stale_paths).delete()
+    for path in stale_paths:
+        del file_records[path]
+
+    # Parse every file first, so that their contents can be imported in bulk
+    contexts_to_import, local_contexts_to_import, failed_paths = load_redirectmap_context_files(
+        config_context_path, {path: files[path] for path in paths_to_load}, job_result
+    )
+    context_names, failed_context_paths = import_redirectmap_contexts(
+        contexts_to_import, repository_record, job_result
+    )
+    local_types, failed_local_paths = import_local_redirectmap_contexts(
+        local_contexts_to_import, repository_record, job_result
+    )
+    failed_paths |= failed_context_paths | failed_local_paths
+
+    managed_redirectmap_config_contexts = set()
+    managed_local_redirectmap_config_contexts = defaultdict(set)
+    for path in sorted(paths_to_load):
+        managed_redirectmap_config_contexts.update(context_names[path])
+        if path in local_types:
+            managed_local_redirectmap_config_contexts[local_types[path]].add(
+                os.path.splitext(os.path.basename(path))[0]
+            )
+        if path not in failed_paths:
+            # Files that failed to import are not recorded, so that they are retried on the next sync
+            file_records[path] = GitRedirectMapContextFile(
+                sync=sync_state,
+                path=path,
+                context_names=sorted(context_names[path]),
+                local_type=local_types.get(path, ""),
+                blob_hash=blob_hashes[path],
+            )
+    GitRedirectMapContextFile.objects.bulk_create(
+        [file_record for file_record in file_records.values() if file_record._state.adding], batch_size=1000
+    )
+
+    # Everything provided by unchanged files is still managed by this repository
+    for path, file_record in file_records.items():
+        managed_redirectmap_config_contexts.update(file_record.context_names)
+        if file_record.local_type:
+            managed_local_redirectmap_config_contexts[file_record.local_type].add(
+                os.path.splitext(os.path.basename(path))[0]
+            )
 
     # Delete any prior contexts that are owned by this repository but were not created/updated above
     delete_git_redirectmap_config_contexts(
@@ -167,30 +247,258 @@ def update_git_redirectmap_config_contexts(repository_record, job_result):
         preserve_local=managed_local_redirectmap_config_contexts,
     )
 
+    if sync_state.commit_hash != (repository_record.current_head or ""):
+        sync_state.commit_hash = repository_record.current_head or ""
+        sync_state.save()
+
+
+# Prefer the LibYAML bindings, which are much faster than the pure-Python loader, when PyYAML was built with them
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
-def import_redirectmap_context(context_data, repository_record, job_result):
+
+def parse_redirectmap_context_file(file_path):
     """
-    Parse a given dictionary of data to create/update a RedirectMapContext record.
+    Parse a single redirect map context file.
 
-    The dictionary is expected to have a key "_metadata" which defines properties on the ConfigContext record itself
-    (name, weight, description, etc.), while all other keys in the dictionary will go into the record's "data" field.
+    Returns a `(data, error)` tuple rather than raising, so that it can be used as-is in a worker process.
+    """
+    try:
+        with open(file_path, "r") as fd:
+            content = fd.read()
+        if file_path.endswith(".json"):
+            try:
+                return json.loads(content), None
+            except ValueError:
+                # Not strictly JSON, give YAML (a superset of JSON) a chance below
+                pass
+        # The data file can be either JSON or YAML; since YAML is a superset of JSON, we can load it regardless
+        return yaml.load(content, Loader=YAML_LOADER), None  # nosec: YAML_LOADER is a safe loader
+    except Exception as exc:  # pylint: disable=broad-except
+        return None, str(exc)
 
-    Note that we don't use extras.api.serializers.ConfigContextSerializer, despite superficial similarities;
-    the reason is that the serializer only allows us to identify related objects (Locations, Role, etc.)
-    by their database primary keys, whereas here we need to be able to look them up by other values such as name.
+
+def parse_redirectmap_context_files(config_context_path, paths):
     """
-    git_repository_content_type = ContentType.objects.get_for_model(GitRepository)
+    Parse the given redirect map context files, relative to `config_context_path`.
 
-    context_record = None
-    # TODO: check context_data against a schema of some sort?
+    The files are parsed by a pool of `redirectmap_context_parse_workers` processes, unless that setting is 1 or less
+    or there are too few files to make it worthwhile, in which case they're parsed serially.
+
+    Git repositories are synced by Celery jobs, and the processes of a prefork Celery worker are daemons, which
+    `multiprocessing` doesn't allow to have children. In such processes, the pool is provided by `billiard` (Celery's
+    fork of `multiprocessing`), which does. If that isn't available either, the files are parsed serially and a
+    warning is logged.
+
+    Returns a dict mapping each path to its `(data, error)` tuple.
+    """
+    file_paths = [os.path.join(config_context_path, path) for path in paths]
+    workers = min(PLUGIN_SETTINGS.get("redirectmap_context_parse_workers", 1), len(file_paths))
+    if workers <= 1:
+        return dict(zip(paths, map(parse_redirectmap_context_file, file_paths)))
+
+    chunksize = max(1, len(file_paths) // (workers * 4))
+    try:
+        if not multiprocessing.current_process().daemon:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(parse_redirectmap_context_file, file_paths, chunksize=chunksize))
+        else:
+            try:
+                import billiard  # pylint: disable=import-outside-toplevel
+            except ImportError:
+                logger.warning(
+                    "The redirectmap_context_parse_workers setting has no effect in a daemon process (such as a "
+                    "prefork Celery worker) without billiard installed, parsing redirect map context files serially"
+                )
+                return dict(zip(paths, map(parse_redirectmap_context_file, file_paths)))
+            pool = billiard.Pool(processes=workers)
+            try:
+                results = pool.map(parse_redirectmap_context_file, file_paths, chunksize)
+            finally:
+                pool.terminate()
+                pool.join()
+    except (OSError, BrokenProcessPool, AssertionError) as exc:
+        logger.warning("Unable to parse redirect map context files in parallel, parsing them serially: %s", exc)
+        return dict(zip(paths, map(parse_redirectmap_context_file, file_paths)))
+    return dict(zip(paths, results))
+
+
+def load_redirectmap_context_files(config_context_path, files, job_result):
+    """
+    Parse the given redirect map context files and sort their contents into the imports to apply.
+
+    `files` maps paths to their `(kind, type)` imports, as returned by `get_redirectmap_context_files()`. The files
+    are parsed up front, in parallel, by `parse_redirectmap_context_files()`.
+
+    Returns the list of `(path, context_data)` RedirectMapContexts to import, the list of
+    `(path, local_type, name, context_data)` local contexts to import and the set of paths that could not be loaded.
+    """
+    contexts = []
+    local_contexts = []
+    failed_paths = set()
+
+    for path, imports in sorted(files.items()):
+        name = os.path.splitext(os.path.basename(path))[0]
+        for kind, type_ in imports:
+            if kind == "flat":
+                msg = f"Loading redirect map context from `{path}`"
+            elif kind == "filter":
+                msg = f'Loading config context, filter `{type_} = [name: "{name}"]`, from `{path}`'
+            else:
+                msg = f"Loading local config context for `{name}` from `{path}`"
+            logger.info(msg)
+            job_result.log(msg, grouping=_get_import_grouping(kind))
+
+    parsed_files = parse_redirectmap_context_files(config_context_path, sorted(files))
+    for path, imports in sorted(files.items()):
+        name = os.path.splitext(os.path.basename(path))[0]
+        context_data, error = parsed_files[path]
+        if error is not None:
+            _log_import_error(path, imports[0][0], error, job_result)
+            failed_paths.add(path)
+            continue
+
+        for kind, type_ in imports:
+            if kind == "flat":
+                # A file can contain one config context dict or a list thereof
+                if isinstance(context_data, dict):
+                    contexts.append((path, context_data))
+                elif isinstance(context_data, list):
+                    contexts.extend((path, context_data_entry) for context_data_entry in context_data)
+                else:
+                    _log_import_error(path, kind, "data must be a dict or list of dicts", job_result)
+                    failed_paths.add(path)
+
+            elif kind == "filter":
+                # Unlike the above case, these files always contain just a single config context record
+                if not isinstance(context_data, dict):
+                    _log_import_error(path, kind, "data must be a dict", job_result)
+                    failed_paths.add(path)
+                    continue
+
+                # Add the implied filter to the context metadata, without altering the data of a local import of the
+                # same file
+                filter_context_data = copy.deepcopy(context_data)
+                filter_context_data.setdefault("_metadata", {}).setdefault(type_, []).append({"name": name})
+                contexts.append((path, filter_context_data))
+
+            else:
+                local_contexts.append((path, type_, name, context_data))
+
+    return contexts, local_contexts, failed_paths
+
+
+def _get_import_grouping(kind):
+    return "local config contexts" if kind == "local" else "redirect map contexts"
+
+
+def _log_import_error(path, kind, exc, job_result):
+    if kind == "local":
+        msg = f"Error in loading local config context from `{path}`: {exc}"
+    else:
+        msg = f"Error in loading redirect map context data from `{path}`: {exc}"
+    logger.error(msg)
+    job_result.log(msg, level_choice=LogLevelChoices.LOG_ERROR, grouping=_get_import_grouping(kind))
+
+
+# RedirectMapContext assignments that can be declared in the `_metadata` of a context, and the model they refer to
+REDIRECTMAP_CONTEXT_RELATIONS = (
+    ("locations", Location),
+    ("cdn_site_roles", SiteRole),
+    ("cdnsites", CdnSite),
+    ("tags", Tag),
+)
+
+
+def _get_lookup_key(lookup):
+    return json.dumps(lookup, sort_keys=True, default=str)
+
+
+def _get_lookup_values(model_class, lookup):
+    """
+    Return the `(field, value)` pairs of a lookup on concrete, non-relational fields of `model_class`, or None.
+    """
+    if not lookup:
+        return None
+    values = []
+    for field_name, value in lookup.items():
+        try:
+            field = model_class._meta.pk if field_name == "pk" else model_class._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            return None
+        if not field.concrete or field.is_relation:
+            return None
+        try:
+            values.append((field, field.to_python(value)))
+        except ValidationError:
+            return None
+    return values
+
+
+def resolve_related_objects(model_class, lookups):
+    """
+    Resolve the given lookups (dicts of filter keyword arguments, such as `{"name": "foo"}`) to `model_class` instances.
+
+    Lookups on the model's own concrete fields are resolved together with a single query and matched in memory. Any
+    other lookup, or one that doesn't match exactly one of the fetched instances, is resolved with its own query.
+
+    Returns a dict mapping the key of each lookup to its instance, or to the RuntimeError describing why it couldn't be
+    resolved.
+    """
+    pending_lookups = {}
+    simple_lookups = {}
+    for lookup in lookups:
+        key = _get_lookup_key(lookup)
+        if key in pending_lookups or key in simple_lookups:
+            continue
+        values = _get_lookup_values(model_class, lookup)
+        if values is None:
+            pending_lookups[key] = lookup
+        else:
+            simple_lookups[key] = (lookup, values)
+
+    resolved = {}
+    if simple_lookups:
+        candidates = list(
+            model_class.objects.filter(reduce(operator.or_, (Q(**lookup) for lookup, _ in simple_lookups.values())))
+        )
+        for key, (lookup, values) in simple_lookups.items():
+            matches = [
+                candidate
+                for candidate in candidates
+                if all(getattr(candidate, field.attname) == value for field, value in values)
+            ]
+            if len(matches) == 1:
+                resolved[key] = matches[0]
+            else:
+                pending_lookups[key] = lookup
+
+    for key, lookup in pending_lookups.items():
+        try:
+            resolved[key] = model_class.objects.get(**lookup)
+        except model_class.DoesNotExist:
+            resolved[key] = RuntimeError(f"No matching {model_class.__name__} found for {lookup}")
+        except model_class.MultipleObjectsReturned:
+            resolved[key] = RuntimeError(f"Multiple {model_class.__name__} found for {lookup}")
+        except Exception as exc:
+            resolved[key] = RuntimeError(f"Invalid {model_class.__name__} lookup {lookup}: {exc}")
 
-    if "_metadata" not in context_data:
+    return resolved
+
+
+def _get_redirectmap_context_metadata(context_data, job_result):
+    """
+    Validate the given context dictionary and split it into its `_metadata` (with defaults set) and its data.
+    """
+    # TODO: check context_data against a schema of some sort?
+    if not isinstance(context_data, dict):
+        raise RuntimeError("data must be a dict.")
+    if not isinstance(context_data.get("_metadata"), dict):
         raise RuntimeError("data is missing the required `_metadata` key.")
     if "name" not in context_data["_metadata"]:
         raise RuntimeError("data `_metadata` is missing the required `name` key.")
 
     # Set defaults for optional fields
-    context_metadata = context_data["_metadata"]
+    context_metadata = dict(context_data["_metadata"])
     context_metadata.setdefault("weight", 1000)
     context_metadata.setdefault("description", "")
     context_metadata.setdefault("is_active", True)
@@ -203,189 +511,396 @@ def import_redirectmap_context(context_data, repository_record, job_result):
         job_result.log(msg, level_choice=LogLevelChoices.LOG_WARNING, grouping="config context")
         context_metadata["config_context_schema"] = context_metadata.pop("schema")
 
-    # Translate relationship queries/filters to lists of related objects
-    relations = {}
-    for key, model_class in [
-        ("locations", Location),
-        ("cdn_site_roles", SiteRole),
-        ("cdnsites", CdnSite),
-        ("tags", Tag),
-    ]:
-        relations[key] = []
-        for object_data in context_metadata.get(key, ()):
-            try:
-                object_instance = model_class.objects.get(**object_data)
-            except model_class.DoesNotExist as exc:
-                raise RuntimeError(
-                    f"No matching {model_class.__name__} found for {object_data}; unable to create/update "
-                    f"context {context_metadata.get('name')}"
-                ) from exc
-            except model_class.MultipleObjectsReturned as exc:
-                raise RuntimeError(
-                    f"Multiple {model_class.__name__} found for {object_data}; unable to create/update "
-                    f"context {context_metadata.get('name')}"
-                ) from exc
-            relations[key].append(object_instance)
+    for key, _ in REDIRECTMAP_CONTEXT_RELATIONS:
+        lookups = context_metadata.get(key) or []
+        if not isinstance(lookups, list) or not all(isinstance(lookup, dict) for lookup in lookups):
+            raise RuntimeError(f"`_metadata` `{key}` must be a list of dicts.")
+        context_metadata[key] = lookups
 
-    with transaction.atomic():
-        # FIXME: Normally ObjectChange records are automatically generated every time we save an object,
-        # regardless of whether any fields were actually modified.
-        # Because a single GitRepository may manage dozens of records, this would result in a lot of noise
-        # every time a repository gets resynced.
-        # To reduce that noise until the base issue is fixed, we need to explicitly detect object changes:
-        created = False
-        modified = False
-        save_needed = False
+    data = context_data.copy()
+    del data["_metadata"]
+    return context_metadata, data
+
+
+def import_redirectmap_contexts(entries, repository_record, job_result):
+    """
+    Create/update the RedirectMapContext records described by the given `(path, context_data)` entries.
+
+    Each dictionary is expected to have a key "_metadata" which defines properties on the RedirectMapContext record
+    itself (name, weight, description, etc.), while all other keys in the dictionary will go into the record's "data"
+    field. When several entries define the same context, the last one wins.
+
+    The related objects, schemas and existing records of all entries are looked up together, then the records and
+    their assignments are written with bulk operations in a single transaction. As bulk operations bypass model
+    signals, the change log, the dependency index and the rendered contexts are updated here, for the records that
+    actually changed.
+
+    Note that we don't use extras.api.serializers.ConfigContextSerializer, despite superficial similarities;
+    the reason is that the serializer only allows us to identify related objects (Locations, Role, etc.)
+    by their database primary keys, whereas here we need to be able to look them up by other values such as name.
+
+    Returns a dict mapping each path to the set of names of the contexts it provides, and the set of paths that had
+    at least one entry fail to import.
+    """
+    git_repository_content_type = ContentType.objects.get_for_model(GitRepository)
+    context_names = defaultdict(set)
+    failed_paths = set()
+
+    def fail(path, exc):
+        failed_paths.add(path)
+        _log_import_error(path, "flat", exc, job_result)
+
+    parsed = {}
+    defining_paths = defaultdict(set)
+    for path, context_data in entries:
         try:
-            context_record = RedirectMapContext.objects.get(
-                name=context_metadata.get("name"),
-                owner_content_type=git_repository_content_type,
-                owner_object_id=repository_record.pk,
-            )
-        except RedirectMapContext.DoesNotExist:
+            context_metadata, data = _get_redirectmap_context_metadata(context_data, job_result)
+        except RuntimeError as exc:
+            fail(path, exc)
+            continue
+        parsed[context_metadata["name"]] = (path, context_metadata, data)
+        defining_paths[context_metadata["name"]].add(path)
+
+    # Translate relationship queries/filters to lists of related objects, with one query per related model
+    resolved = {}
+    for key, model_class in REDIRECTMAP_CONTEXT_RELATIONS:
+        lookups = [lookup for _, context_metadata, _ in parsed.values() for lookup in context_metadata[key]]
+        resolved[key] = resolve_related_objects(model_class, lookups) if lookups else {}
+
+    relations = {}
+    for name, (path, context_metadata, _) in list(parsed.items()):
+        relations[name] = {}
+        try:
+            for key, _ in REDIRECTMAP_CONTEXT_RELATIONS:
+                relations[name][key] = []
+                for lookup in context_metadata[key]:
+                    object_instance = resolved[key][_get_lookup_key(lookup)]
+                    if isinstance(object_instance, Exception):
+                        raise RuntimeError(f"{object_instance}; unable to create/update context {name}")
+                    relations[name][key].append(object_instance)
+        except RuntimeError as exc:
+            fail(path, exc)
+            del parsed[name]
+
+    schema_names = {
+        context_metadata["config_context_schema"]
+        for _, context_metadata, _ in parsed.values()
+        if context_metadata.get("config_context_schema")
+    }
+    schemas = {schema.name: schema for schema in ConfigContextSchema.objects.filter(name__in=schema_names)}
+
+    existing_records = {
+        context_record.name: context_record
+        for context_record in RedirectMapContext.objects.filter(name__in=list(parsed)).select_related(
+            "config_context_schema"
+        )
+    }
+
+    # Current assignments of the existing records, as {context ID: {object ID: through row ID}} per relation
+    through_fields = {}
+    current_assignments = {}
+    for key, _ in REDIRECTMAP_CONTEXT_RELATIONS:
+        field = RedirectMapContext._meta.get_field(key)
+        through = field.remote_field.through
+        context_attname = f"{field.m2m_field_name()}_id"
+        object_attname = f"{field.m2m_reverse_field_name()}_id"
+        through_fields[key] = (through, context_attname, object_attname)
+        current_assignments[key] = defaultdict(dict)
+        for row_id, context_id, object_id in through.objects.filter(
+            **{f"{context_attname}__in": [context_record.pk for context_record in existing_records.values()]}
+        ).values_list("pk", context_attname, object_attname):
+            current_assignments[key][context_id][object_id] = row_id
+
+    # FIXME: Normally ObjectChange records are automatically generated every time we save an object,
+    # regardless of whether any fields were actually modified.
+    # Because a single GitRepository may manage dozens of records, this would result in a lot of noise
+    # every time a repository gets resynced.
+    # To reduce that noise until the base issue is fixed, we need to explicitly detect object changes:
+    now = timezone.now()
+    created_records = []
+    updated_records = []
+    modified_records = []
+    unchanged_records = []
+    removed_rows = defaultdict(list)
+    added_rows = defaultdict(list)
+    for name, (path, context_metadata, data) in parsed.items():
+        context_record = existing_records.get(name)
+        created = context_record is None
+        if created:
             context_record = RedirectMapContext(
-                name=context_metadata.get("name"),
+                name=name,
                 owner_content_type=git_repository_content_type,
                 owner_object_id=repository_record.pk,
             )
-            created = True
+        elif (
+            context_record.owner_content_type_id != git_repository_content_type.pk
+            or context_record.owner_object_id != repository_record.pk
+        ):
+            fail(path, f"a redirect map context named {name} already exists and is not owned by this repository")
+            continue
 
+        save_needed = False
         for field in ("weight", "description", "is_active"):
             new_value = context_metadata[field]
             if getattr(context_record, field) != new_value:
                 setattr(context_record, field, new_value)
-                modified = True
                 save_needed = True
 
-        data = context_data.copy()
-        del data["_metadata"]
-
         if context_metadata.get("config_context_schema"):
             if getattr(context_record.config_context_schema, "name", None) != context_metadata["config_context_schema"]:
-                try:
-                    schema = ConfigContextSchema.objects.get(name=context_metadata["config_context_schema"])
-                    context_record.config_context_schema = schema
-                    modified = True
-                except ConfigContextSchema.DoesNotExist:
+                if context_metadata["config_context_schema"] in schemas:
+                    context_record.config_context_schema = schemas[context_metadata["config_context_schema"]]
+                    save_needed = True
+                else:
                     msg = f"ConfigContextSchema {context_metadata['config_context_schema']} does not exist."
                     logger.error(msg)
                     job_result.log(
                         msg, obj=context_record, level_choice=LogLevelChoices.LOG_ERROR, grouping="redirect map contexts"
                     )
         else:
-            if context_record.config_context_schema is not None:
+            if context_record.config_context_schema_id is not None:
                 context_record.config_context_schema = None
-                modified = True
+                save_needed = True
 
         if context_record.data != data:
             context_record.data = data
-            modified = True
             save_needed = True
 
+        try:
+            # Bulk writes can't be allowed to fail halfway through, so catch invalid values beforehand
+            context_record.clean_fields(exclude=["owner_content_type", "config_context_schema"])
+        except ValidationError as exc:
+            fail(path, exc)
+            continue
+
+        assignments_changed = False
+        for key, objects in relations[name].items():
+            through, context_attname, object_attname = through_fields[key]
+            current = current_assignments[key].get(context_record.pk, {})
+            object_ids = {object_instance.pk for object_instance in objects}
+            for object_id in object_ids - set(current):
+                added_rows[key].append(through(**{context_attname: context_record.pk, object_attname: object_id}))
+                assignments_changed = True
+            for object_id in set(current) - object_ids:
+                removed_rows[key].append(current[object_id])
+                assignments_changed = True
+
         if created:
-            # Save it so that it gets a PK, required before we can set the relations
-            context_record.save()
-            save_needed = False
-
-        for key, objects in relations.items():
-            field = getattr(context_record, key)
-            value = list(field.all())
-            if value != objects:
-                field.set(objects)
-                # Calling set() on a ManyToManyField doesn't require a subsequent save() call
-                modified = True
-
-        if save_needed:
-            context_record.save()
-
-    if created:
-        msg = "Successfully created redirect map context"
-        logger.info(f"{msg}")
-        job_result.log(msg, obj=context_record, level_choice=LogLevelChoices.LOG_INFO, grouping="redirect map contexts")
-    elif modified:
-        msg = "Successfully refreshed redirect map context"
-        logger.info(f"{msg}")
-        job_result.log(msg, obj=context_record, level_choice=LogLevelChoices.LOG_INFO, grouping="redirect map contexts")
-    else:
-        msg = "No change to redirect map context"
-        logger.info(f"{msg}")
-        job_result.log(msg, obj=context_record, level_choice=LogLevelChoices.LOG_INFO, grouping="redirect map contexts")
+            created_records.append(context_record)
+        elif save_needed or assignments_changed:
+            # Assignment changes bump last_updated as well, it versions the API's conditional GETs
+            context_record.last_updated = now
+            modified_records.append(context_record)
+            updated_records.append(context_record)
+        else:
+            unchanged_records.append(context_record)
+        for defining_path in defining_paths[name]:
+            context_names[defining_path].add(name)
 
-    return context_record.name if context_record else None
+    with transaction.atomic():
+        RedirectMapContext.objects.bulk_create(created_records, batch_size=1000)
+        RedirectMapContext.objects.bulk_update(
+            updated_records,
+            ["weight", "description", "is_active", "config_context_schema", "data", "last_updated"],
+            batch_size=1000,
+        )
+        for key, _ in REDIRECTMAP_CONTEXT_RELATIONS:
+            through = through_fields[key][0]
+            if removed_rows[key]:
+                through.objects.filter(pk__in=removed_rows[key]).delete()
+            through.objects.bulk_create(added_rows[key], batch_size=1000)
+
+    log_object_changes(created_records, ObjectChangeActionChoices.ACTION_CREATE)
+    record_changes(created_records, ChangeFeedActionChoices.ACTION_CREATE)
+    log_object_changes(modified_records, ObjectChangeActionChoices.ACTION_UPDATE)
+    record_changes(modified_records, ChangeFeedActionChoices.ACTION_UPDATE)
+
+    invalidate_rendered_redirectmap_contexts(
+        update_redirectmap_context_dependencies_in_bulk(
+            context_record.pk for context_record in created_records + modified_records
+        )
+    )
+
+    for msg, context_records in (
+        ("Successfully created redirect map context", created_records),
+        ("Successfully refreshed redirect map context", modified_records),
+        ("No change to redirect map context", unchanged_records),
+    ):
+        for context_record in context_records:
+            logger.info(f"{msg}")
+            job_result.log(
+                msg, obj=context_record, level_choice=LogLevelChoices.LOG_INFO, grouping="redirect map contexts"
+            )
+
+    return context_names, failed_paths
 
 
-def import_local_redirectmap_context(local_type, cdnsite_name, context_data, repository_record):
+def import_local_redirectmap_contexts(entries, repository_record, job_result):
     """
-    Create/update the local config context data associated with a Device or VirtualMachine.
+    Create/update the local config context data described by the given `(path, local_type, name, context_data)` entries.
+
+    The records are looked up with one query and updated with a single bulk update; as that bypasses model signals, the
+    change log and the rendered contexts of the updated records are updated here.
+
+    Returns a dict mapping each successfully imported path to its local context type, and the set of failed paths.
     """
-    try:
-        if local_type == "cdnsites":
-            record = CdnSite.objects.get(name=cdnsite_name)
-    except MultipleObjectsReturned:
-        # Possible for Device as name is not guaranteed globally unique
-        # TODO: come up with a design that accounts for non-unique names, as well as un-named Devices.
-        raise RuntimeError("multiple records with the same name found; unable to determine which one to apply to!")
-    except ObjectDoesNotExist:
-        raise RuntimeError("record not found!")
-
-    if (
-        record.local_redirectmap_context_data_owner is not None
-        and record.local_redirectmap_context_data_owner != repository_record
-    ):
-        logger.error(
-            "DATA CONFLICT: Local context data is owned by another owner, %s",
-            record.local_redirectmap_context_data_owner,
-            extra={"object": record, "grouping": "local config contexts"},
-        )
-        return
+    git_repository_content_type = ContentType.objects.get_for_model(GitRepository)
+    records_by_name = defaultdict(list)
+    cdnsite_names = {name for _, local_type, name, _ in entries if local_type == "cdnsites"}
+    if cdnsite_names:
+        for record in CdnSite.objects.filter(name__in=cdnsite_names):
+            records_by_name[record.name].append(record)
+
+    local_types = {}
+    failed_paths = set()
+    updated_records = []
+    now = timezone.now()
+    for path, local_type, name, context_data in entries:
+        try:
+            records = records_by_name.get(name, []) if local_type == "cdnsites" else []
+            if not records:
+                raise RuntimeError("record not found!")
+            if len(records) > 1:
+                # TODO: come up with a design that accounts for non-unique names
+                raise RuntimeError(
+                    "multiple records with the same name found; unable to determine which one to apply to!"
+                )
+            record = records[0]
 
-    if record.local_redirectmap_context_data == context_data and record.local_redirectmap_context_data_owner == repository_record:
-        logger.info("No change to local config context", extra={"object": record, "grouping": "local config contexts"})
-        return
+            owned_by_repository = (
+                record.local_redirectmap_context_data_owner_content_type_id == git_repository_content_type.pk
+                and record.local_redirectmap_context_data_owner_object_id == repository_record.pk
+            )
+            if record.local_redirectmap_context_data_owner_content_type_id is not None and not owned_by_repository:
+                logger.error(
+                    "DATA CONFLICT: Local context data is owned by another owner, %s",
+                    record.local_redirectmap_context_data_owner,
+                    extra={"object": record, "grouping": "local config contexts"},
+                )
+            elif record.local_redirectmap_context_data == context_data and owned_by_repository:
+                logger.info(
+                    "No change to local config context", extra={"object": record, "grouping": "local config contexts"}
+                )
+            else:
+                record.local_redirectmap_context_data = context_data
+                record.local_redirectmap_context_data_owner = repository_record
+                record.clean()
+                record.last_updated = now
+                updated_records.append(record)
+                logger.info(
+                    "Successfully updated local config context",
+                    extra={"object": record, "grouping": "local config contexts"},
+                )
+        except Exception as exc:
+            failed_paths.add(path)
+            _log_import_error(path, "local", exc, job_result)
+            continue
+        local_types[path] = local_type
+
+    if updated_records:
+        with transaction.atomic():
+            CdnSite.objects.bulk_update(
+                updated_records,
+                [
+                    "local_redirectmap_context_data",
+                    "local_redirectmap_context_data_owner_content_type",
+                    "local_redirectmap_context_data_owner_object_id",
+                    "last_updated",
+                ],
+                batch_size=1000,
+            )
+        log_object_changes(updated_records, ObjectChangeActionChoices.ACTION_UPDATE)
+        record_changes(updated_records, ChangeFeedActionChoices.ACTION_UPDATE)
+        invalidate_rendered_redirectmap_contexts(record.pk for record in updated_records)
 
-    record.local_redirectmap_context_data = context_data
-    record.local_redirectmap_context_data_owner = repository_record
-    record.clean()
-    record.save()
-    logger.info(
-        "Successfully updated local config context", extra={"object": record, "grouping": "local config contexts"}
-    )
+    return local_types, failed_paths
 
 
 def delete_git_redirectmap_config_contexts(repository_record, job_result, preserve=(), preserve_local=None):
-    """Delete redirect map contexts owned by this Git repository that are not in the preserve list (if any)."""
+    """
+    Delete redirect map contexts owned by this Git repository that are not in the preserve list (if any).
+
+    The assignments of the contexts are cleared in bulk, then the contexts are deleted with a regular delete, whose
+    signals update the change log, the change feed, the dependency index and the rendered contexts and fire webhooks.
+    The local config context data of the owning records is cleared with a set-based update, which bypasses model
+    signals, so its side effects are applied here. A single job result entry summarizes each kind of removal.
+    """
     if not preserve_local:
         preserve_local = defaultdict(set)
 
     git_repository_content_type = ContentType.objects.get_for_model(GitRepository)
-    for context_record in RedirectMapContext.objects.filter(
-        owner_content_type=git_repository_content_type,
-        owner_object_id=repository_record.pk,
-    ):
-        if context_record.name not in preserve:
-            context_record.delete()
-            msg = f"Deleted redirect map context {context_record}"
-            logger.warning(msg)
-            job_result.log(msg, level_choice=LogLevelChoices.LOG_WARNING, grouping="redirect map contexts")
+    context_records = list(
+        RedirectMapContext.objects.filter(
+            owner_content_type=git_repository_content_type,
+            owner_object_id=repository_record.pk,
+        ).exclude(name__in=list(preserve))
+    )
 
+    local_records = {}
     for grouping, model in (
         ("cdnsites", CdnSite),
     ):
-        for record in model.objects.filter(
-            local_redirectmap_context_data_owner_content_type=git_repository_content_type,
-            local_redirectmap_context_data_owner_object_id=repository_record.pk,
-        ):
-            if record.name not in preserve_local[grouping]:
+        local_records[grouping] = list(
+            model.objects.filter(
+                local_redirectmap_context_data_owner_content_type=git_repository_content_type,
+                local_redirectmap_context_data_owner_object_id=repository_record.pk,
+            ).exclude(name__in=list(preserve_local[grouping]))
+        )
+
+    if not context_records and not any(local_records.values()):
+        return
+
+    context_ids = [context_record.pk for context_record in context_records]
+    affected_cdnsite_ids = set()
+
+    with transaction.atomic():
+        if context_ids:
+            # Clear the assignments in bulk rather than have them collected record by record. The dependency index is
+            # kept, so that the delete signals find the CdnSites each record applied to.
+            for field_name, _ in REDIRECTMAP_CONTEXT_RELATIONS:
+                field = RedirectMapContext._meta.get_field(field_name)
+                field.remote_field.through.objects.filter(**{f"{field.m2m_field_name()}__in": context_ids}).delete()
+            RedirectMapContext.objects.filter(pk__in=context_ids).delete()
+
+        now = timezone.now()
+        for grouping, records in local_records.items():
+            if not records:
+                continue
+            for record in records:
                 record.local_redirectmap_context_data = None
                 record.local_redirectmap_context_data_owner = None
-                record.clean()
-                record.save()
-                msg = "Deleted local config context"
-                logger.warning(msg)
-                job_result.log(
-                    msg, obj=record, level_choice=LogLevelChoices.LOG_WARNING, grouping="local redirect map contexts"
-                )
-                
+                record.last_updated = now
+            records[0]._meta.model.objects.filter(pk__in=[record.pk for record in records]).update(
+                local_redirectmap_context_data=None,
+                local_redirectmap_context_data_owner_content_type=None,
+                local_redirectmap_context_data_owner_object_id=None,
+                last_updated=now,
+            )
+            log_object_changes(records, ObjectChangeActionChoices.ACTION_UPDATE)
+            record_changes(records, ChangeFeedActionChoices.ACTION_UPDATE)
+            if grouping == "cdnsites":
+                affected_cdnsite_ids.update(record.pk for record in records)
+
+    invalidate_rendered_redirectmap_contexts(affected_cdnsite_ids)
+
+    if context_records:
+        msg = (
+            f"Deleted {len(context_records)} redirect map context(s): "
+            f"{', '.join(sorted(context_record.name for context_record in context_records))}"
+        )
+        logger.warning(msg)
+        job_result.log(msg, level_choice=LogLevelChoices.LOG_WARNING, grouping="redirect map contexts")
+
+    for grouping, records in local_records.items():
+        if records:
+            msg = (
+                f"Deleted local config context of {len(records)} {grouping}: "
+                f"{', '.join(sorted(record.name for record in records))}"
+            )
+            logger.warning(msg)
+            job_result.log(msg, level_choice=LogLevelChoices.LOG_WARNING, grouping="local redirect map contexts")
+
+
 # Register built-in callbacks for data types potentially provided by a GitRepository
 register_datasource_contents(
     [
@@ -0,0 +1,230 @@
+"""Maintenance of the RedirectMapContext <-> CdnSite dependency index."""
+from collections import defaultdict
+import logging
+
+from django.db import transaction
+
+from .models import CdnSite, LocationClosure, RedirectMapContext, RedirectMapContextDependency
+from .trees import get_site_role_tree
+
+logger = logging.getLogger(__name__)
+
+
+def get_applicable_cdnsite_ids(redirect_map_context):
+    """
+    Return the set of IDs of every CdnSite the given RedirectMapContext applies to.
+
+    This mirrors `RedirectMapContextQuerySet.get_for_object()`: a context applies to a CdnSite when every one of its
+    assignment types is either empty or matches the site. Location and site role assignments also match the CdnSites
+    of all descendant locations and site roles.
+    """
+    if not redirect_map_context.is_active:
+        return set()
+
+    cdnsites = CdnSite.objects.all()
+
+    cdnsite_ids = list(redirect_map_context.cdnsites.values_list("pk", flat=True))
+    if cdnsite_ids:
+        cdnsites = cdnsites.filter(pk__in=cdnsite_ids)
+
+    location_ids = list(redirect_map_context.locations.values_list("pk", flat=True))
+    if location_ids:
+        cdnsites = cdnsites.filter(
+            location__in=LocationClosure.objects.filter(ancestor_id__in=location_ids).values("descendant")
+        )
+
+    cdn_site_role_ids = set()
+    site_role_tree = get_site_role_tree()
+    for cdn_site_role_id in redirect_map_context.cdn_site_roles.values_list("pk", flat=True):
+        cdn_site_role_ids |= site_role_tree.descendants(cdn_site_role_id)
+    if cdn_site_role_ids:
+        cdnsites = cdnsites.filter(cdn_site_role__in=cdn_site_role_ids)
+
+    tag_ids = list(redirect_map_context.tags.values_list("pk", flat=True))
+    if tag_ids:
+        cdnsites = cdnsites.filter(tags__in=tag_ids)
+
+    return set(cdnsites.values_list("pk", flat=True).distinct())
+
+
+def get_applicable_cdnsite_ids_in_bulk(redirect_map_context_ids):
+    """
+    Return a dict mapping each of the given RedirectMapContext IDs to the set of IDs of every CdnSite it applies to.
+
+    Same matching as `get_applicable_cdnsite_ids()`, but the assignments of all the contexts, the CdnSites with their
+    tags and location ancestry, and the cached SiteRole tree are loaded once and matched in memory (as in
+    `rendering.render_redirectmap_contexts()`), so the number of queries doesn't depend on the number of contexts.
+    """
+    redirect_map_context_ids = list(redirect_map_context_ids)
+    active_ids = set(
+        RedirectMapContext.objects.filter(pk__in=redirect_map_context_ids, is_active=True).values_list("pk", flat=True)
+    )
+    applicable = {context_id: set() for context_id in redirect_map_context_ids}
+    if not active_ids:
+        return applicable
+
+    assignments = {}
+    for field_name in ("cdnsites", "locations", "cdn_site_roles", "tags"):
+        field = RedirectMapContext._meta.get_field(field_name)
+        context_attname = f"{field.m2m_field_name()}_id"
+        assignments[field_name] = defaultdict(set)
+        for context_id, object_id in (
+            field.remote_field.through.objects.filter(**{f"{context_attname}__in": active_ids})
+            .values_list(context_attname, f"{field.m2m_reverse_field_name()}_id")
+            .iterator()
+        ):
+            assignments[field_name][context_id].add(object_id)
+
+    cdnsite_tags = defaultdict(set)
+    tags_field = CdnSite._meta.get_field("tags")
+    for cdnsite_id, tag_id in tags_field.remote_field.through.objects.values_list(
+        f"{tags_field.m2m_field_name()}_id", f"{tags_field.m2m_reverse_field_name()}_id"
+    ).iterator():
+        cdnsite_tags[cdnsite_id].add(tag_id)
+
+    location_ancestors = defaultdict(set)
+    for location_id, ancestor_id in (
+        LocationClosure.objects.filter(descendant__in=CdnSite.objects.exclude(location=None).values("location_id"))
+        .values_list("descendant_id", "ancestor_id")
+        .iterator()
+    ):
+        location_ancestors[location_id].add(ancestor_id)
+
+    site_role_tree = get_site_role_tree()
+    for cdnsite_id, cdn_site_role_id, location_id in CdnSite.objects.values_list(
+        "pk", "cdn_site_role_id", "location_id"
+    ).iterator():
+        cdnsite_facts = {
+            "cdnsites": {cdnsite_id},
+            "locations": location_ancestors.get(location_id, set()),
+            "cdn_site_roles": site_role_tree.ancestors(cdn_site_role_id),
+            "tags": cdnsite_tags[cdnsite_id],
+        }
+        for context_id in active_ids:
+            if all(
+                not assignments[field_name][context_id] or not assignments[field_name][context_id].isdisjoint(facts)
+                for field_name, facts in cdnsite_facts.items()
+            ):
+                applicable[context_id].add(cdnsite_id)
+    return applicable
+
+
+def get_dependent_cdnsite_ids(redirect_map_context):
+    """
+    Return the set of IDs of the CdnSites currently indexed as depending on the given RedirectMapContext.
+    """
+    return set(
+        RedirectMapContextDependency.objects.filter(redirect_map_context=redirect_map_context).values_list(
+            "cdnsite_id", flat=True
+        )
+    )
+
+
+def update_redirectmap_context_dependencies(redirect_map_context, data_changed=True):
+    """
+    Re-index the CdnSites the given RedirectMapContext applies to.
+
+    Returns the set of IDs of the CdnSites whose rendered context is affected: every site the context applied to
+    before or after the change if its data (or weight, name...) changed, otherwise only the sites that gained or lost
+    the context.
+    """
+    old_ids = get_dependent_cdnsite_ids(redirect_map_context)
+    new_ids = get_applicable_cdnsite_ids(redirect_map_context)
+
+    with transaction.atomic():
+        RedirectMapContextDependency.objects.filter(
+            redirect_map_context=redirect_map_context,
+            cdnsite_id__in=old_ids - new_ids,
+        ).delete()
+        RedirectMapContextDependency.objects.bulk_create(
+            [
+                RedirectMapContextDependency(redirect_map_context=redirect_map_context, cdnsite_id=cdnsite_id)
+                for cdnsite_id in new_ids - old_ids
+            ],
+            ignore_conflicts=True,
+        )
+
+    if data_changed:
+        return old_ids | new_ids
+    return old_ids ^ new_ids
+
+
+def update_redirectmap_context_dependencies_in_bulk(redirect_map_context_ids, data_changed=True, batch_size=1000):
+    """
+    Re-index the CdnSites each of the given RedirectMapContext IDs applies to, like
+    `update_redirectmap_context_dependencies()` but with a fixed number of queries: the new index is computed with
+    `get_applicable_cdnsite_ids_in_bulk()` and applied as a single diff against the current one.
+
+    Returns the set of IDs of the CdnSites whose rendered context is affected.
+    """
+    new_index = get_applicable_cdnsite_ids_in_bulk(redirect_map_context_ids)
+    old_index = defaultdict(dict)
+    for pk, context_id, cdnsite_id in (
+        RedirectMapContextDependency.objects.filter(redirect_map_context__in=list(new_index))
+        .values_list("pk", "redirect_map_context_id", "cdnsite_id")
+        .iterator()
+    ):
+        old_index[context_id][cdnsite_id] = pk
+
+    stale_pks = []
+    new_dependencies = []
+    affected_cdnsite_ids = set()
+    for context_id, new_ids in new_index.items():
+        old_ids = set(old_index[context_id])
+        stale_pks.extend(old_index[context_id][cdnsite_id] for cdnsite_id in old_ids - new_ids)
+        new_dependencies.extend(
+            RedirectMapContextDependency(redirect_map_context_id=context_id, cdnsite_id=cdnsite_id)
+            for cdnsite_id in new_ids - old_ids
+        )
+        affected_cdnsite_ids |= (old_ids | new_ids) if data_changed else (old_ids ^ new_ids)
+
+    with transaction.atomic():
+        for start in range(0, len(stale_pks), batch_size):
+            RedirectMapContextDependency.objects.filter(pk__in=stale_pks[start : start + batch_size]).delete()
+        RedirectMapContextDependency.objects.bulk_create(new_dependencies, batch_size=batch_size, ignore_conflicts=True)
+
+    return affected_cdnsite_ids
+
+
+def update_cdnsite_dependencies(cdnsite):
+    """
+    Re-index the RedirectMapContexts that apply to the given CdnSite.
+
+    Returns the set of IDs of the RedirectMapContexts that started or stopped applying to the site.
+    """
+    old_ids = set(
+        RedirectMapContextDependency.objects.filter(cdnsite=cdnsite).values_list("redirect_map_context_id", flat=True)
+    )
+    new_ids = set(RedirectMapContext.objects.get_for_object(cdnsite).values_list("pk", flat=True))
+
+    with transaction.atomic():
+        RedirectMapContextDependency.objects.filter(
+            cdnsite=cdnsite,
+            redirect_map_context_id__in=old_ids - new_ids,
+        ).delete()
+        RedirectMapContextDependency.objects.bulk_create(
+            [
+                RedirectMapContextDependency(redirect_map_context_id=context_id, cdnsite=cdnsite)
+                for context_id in new_ids - old_ids
+            ],
+            ignore_conflicts=True,
+        )
+
+    return old_ids ^ new_ids
+
+
+def rebuild_redirectmap_context_dependencies():
+    """
+    Rebuild the whole dependency index from scratch.
+    """
+    dependencies = [
+        RedirectMapContextDependency(redirect_map_context_id=context_id, cdnsite_id=cdnsite_id)
+        for context_id, cdnsite_ids in get_applicable_cdnsite_ids_in_bulk(
+            RedirectMapContext.objects.filter(is_active=True).values_list("pk", flat=True)
+        ).items()
+        for cdnsite_id in cdnsite_ids
+    ]
+    with transaction.atomic():
+        RedirectMapContextDependency.objects.all().delete()
+        RedirectMapContextDependency.objects.bulk_create(dependencies, batch_size=1000)
+    logger.info("Rebuilt redirect map context dependency index with %d entries", len(dependencies))
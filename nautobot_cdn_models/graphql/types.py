@@ -1,6 +1,98 @@
+import graphene
+from graphene.types.generic import GenericScalar
 import graphene_django_optimizer as gql_optimizer
+from promise import Promise
+from promise.dataloader import DataLoader
+
+from django.db.models import Prefetch
+
+from nautobot.dcim.models import Location
+from nautobot.extras.models import Tag
 
 from .. import models, filters
+from ..rendering import get_rendered_redirectmap_contexts
+
+
+def get_redirectmap_context_prefetch(user):
+    """
+    Return the relations of RedirectMapContext loaded in bulk for GraphQL (see RedirectMapContextType), restricted to
+    the objects the given user may view.
+    """
+    return [
+        Prefetch("locations", queryset=Location.objects.restrict(user, "view")),
+        Prefetch("cdn_site_roles", queryset=models.SiteRole.objects.restrict(user, "view")),
+        Prefetch("cdnsites", queryset=models.CdnSite.objects.restrict(user, "view")),
+        Prefetch("tags", queryset=Tag.objects.restrict(user, "view")),
+        "owner",
+    ]
+
+
+class RedirectMapContextLoader(DataLoader):
+    """
+    Batch the rendered redirect map contexts of the CdnSites resolved in a GraphQL query into a single lookup.
+    """
+
+    def batch_load_fn(self, keys):  # pylint: disable=method-hidden
+        rendered = get_rendered_redirectmap_contexts(models.CdnSite.objects.filter(pk__in=keys))
+        return Promise.resolve([rendered[key].data if key in rendered else None for key in keys])
+
+
+def get_redirectmap_context_loader(info):
+    """
+    Return the RedirectMapContextLoader of the current GraphQL request, so that loads are batched across the query.
+    """
+    loader = getattr(info.context, "_redirectmap_context_loader", None)
+    if loader is None:
+        loader = RedirectMapContextLoader()
+        info.context._redirectmap_context_loader = loader
+    return loader
+
+
+class ApplicableRedirectMapContextsLoader(DataLoader):
+    """
+    Batch the lookup of the RedirectMapContexts applying to the CdnSites resolved in a GraphQL query.
+
+    The contexts come from the dependency index, and are loaded along with all of their assignments and owners, so
+    the number of queries doesn't depend on the number of sites or contexts. Only the contexts and assigned objects
+    the user may view are loaded.
+    """
+
+    def __init__(self, user, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.user = user
+
+    def batch_load_fn(self, keys):  # pylint: disable=method-hidden
+        contexts = {}
+        redirect_map_contexts = models.RedirectMapContext.objects.restrict(self.user, "view")
+        for dependency in models.RedirectMapContextDependency.objects.filter(
+            cdnsite_id__in=keys, redirect_map_context__in=redirect_map_contexts
+        ).prefetch_related(
+            Prefetch(
+                "redirect_map_context",
+                queryset=redirect_map_contexts.select_related(
+                    "owner_content_type", "config_context_schema"
+                ).prefetch_related(*get_redirectmap_context_prefetch(self.user)),
+            )
+        ):
+            contexts.setdefault(dependency.cdnsite_id, []).append(dependency.redirect_map_context)
+        return Promise.resolve(
+            [
+                sorted(contexts.get(key, []), key=lambda context: (context.weight, context.name))
+                for key in keys
+            ]
+        )
+
+
+def get_applicable_redirectmap_contexts_loader(info):
+    """
+    Return the ApplicableRedirectMapContextsLoader of the current GraphQL request.
+    """
+    loader = getattr(info.context, "_applicable_redirectmap_contexts_loader", None)
+    if loader is None:
+        loader = ApplicableRedirectMapContextsLoader(info.context.user)
+        info.context._applicable_redirectmap_contexts_loader = loader
+    return loader
+
 
 class HyperCacheMemoryProfileType(gql_optimizer.OptimizedDjangoObjectType):
     class Meta:
@@ -12,12 +104,77 @@ class SiteRoleType(gql_optimizer.OptimizedDjangoObjectType):
         model = models.SiteRole
         filterset_set = filters.SiteRoleFilterSet
 
+class RedirectMapContextType(gql_optimizer.OptimizedDjangoObjectType):
+    owner = GenericScalar()
+
+    class Meta:
+        model = models.RedirectMapContext
+        filterset_class = filters.RedirectMapContextFilterSet
+
+    @gql_optimizer.resolver_hints(prefetch_related=["locations"])
+    def resolve_locations(self, info):
+        return self.locations.all()
+
+    @gql_optimizer.resolver_hints(prefetch_related=["cdn_site_roles"])
+    def resolve_cdn_site_roles(self, info):
+        return self.cdn_site_roles.all()
+
+    @gql_optimizer.resolver_hints(prefetch_related=["cdnsites"])
+    def resolve_cdnsites(self, info):
+        return self.cdnsites.all()
+
+    @gql_optimizer.resolver_hints(prefetch_related=["tags"])
+    def resolve_tags(self, info):
+        return self.tags.all()
+
+    @gql_optimizer.resolver_hints(select_related=["owner_content_type"], prefetch_related=["owner"])
+    def resolve_owner(self, info):
+        if self.owner is None:
+            return None
+        return {
+            "id": str(self.owner.pk),
+            "object_type": f"{self.owner_content_type.app_label}.{self.owner_content_type.model}",
+            "display": str(self.owner),
+        }
+
+
 class CdnSiteType(gql_optimizer.OptimizedDjangoObjectType):
+    redirect_map_context = GenericScalar()
+    redirect_map_contexts = graphene.List(RedirectMapContextType)
+
     class Meta:
         model = models.CdnSite
         filterset_set = filters.CdnSiteFilterSet
         exclude = ["_name"]
 
+    @gql_optimizer.resolver_hints(only=["id"])
+    def resolve_redirect_map_context(self, info):
+        return get_redirectmap_context_loader(info).load(self.pk)
+
+    @gql_optimizer.resolver_hints(only=["id"])
+    def resolve_redirect_map_contexts(self, info):
+        return get_applicable_redirectmap_contexts_loader(info).load(self.pk)
+
+    @gql_optimizer.resolver_hints(select_related=["location"])
+    def resolve_location(self, info):
+        return self.location
+
+    @gql_optimizer.resolver_hints(select_related=["neighbor1"])
+    def resolve_neighbor1(self, info):
+        return self.neighbor1
+
+    @gql_optimizer.resolver_hints(select_related=["neighbor2"])
+    def resolve_neighbor2(self, info):
+        return self.neighbor2
+
+    @gql_optimizer.resolver_hints(select_related=["failover_site"])
+    def resolve_failover_site(self, info):
+        return self.failover_site
+
+    @gql_optimizer.resolver_hints(select_related=["cacheMemoryProfileId"])
+    def resolve_cacheMemoryProfileId(self, info):  # pylint: disable=invalid-name
+        return self.cacheMemoryProfileId
+
 
 
-graphql_types = [HyperCacheMemoryProfileType, SiteRoleType, CdnSiteType]
\ No newline at end of file
+graphql_types = [HyperCacheMemoryProfileType, SiteRoleType, RedirectMapContextType, CdnSiteType]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.22 on 2026-10-18 09:00
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nautobot_cdn_models', '0003_cdnsite_failover_site'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RenderedRedirectMapContext',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('data_hash', models.CharField(max_length=64)),
+                ('last_rendered', models.DateTimeField(auto_now=True)),
+                ('cdnsite', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='rendered_redirectmap_context', to='nautobot_cdn_models.cdnsite')),
+            ],
+            options={
+                'ordering': ['cdnsite'],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 3.2.22 on 2026-10-18 09:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nautobot_cdn_models', '0004_renderedredirectmapcontext'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RedirectMapContextDependency',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('cdnsite', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='redirectmap_context_dependencies', to='nautobot_cdn_models.cdnsite')),
+                ('redirect_map_context', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cdnsite_dependencies', to='nautobot_cdn_models.redirectmapcontext')),
+            ],
+            options={
+                'verbose_name_plural': 'redirect map context dependencies',
+                'unique_together': {('redirect_map_context', 'cdnsite')},
+            },
+        ),
+    ]
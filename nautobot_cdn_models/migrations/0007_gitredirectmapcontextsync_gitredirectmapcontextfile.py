@@ -0,0 +1,38 @@
+# Generated by Django 3.2.22 on 2026-10-18 10:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('extras', '0098_rename_data_jobresult_result'),
+        ('nautobot_cdn_models', '0006_locationclosure_siteroleclosure'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GitRedirectMapContextSync',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('commit_hash', models.CharField(blank=True, max_length=48)),
+                ('repository', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='extras.gitrepository')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='GitRedirectMapContextFile',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('path', models.CharField(max_length=255)),
+                ('context_names', models.JSONField(blank=True, default=list)),
+                ('local_type', models.CharField(blank=True, max_length=50)),
+                ('sync', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='files', to='nautobot_cdn_models.gitredirectmapcontextsync')),
+            ],
+            options={
+                'ordering': ['sync', 'path'],
+                'unique_together': {('sync', 'path')},
+            },
+        ),
+    ]
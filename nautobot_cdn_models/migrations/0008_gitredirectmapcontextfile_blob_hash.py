@@ -0,0 +1,18 @@
+# Generated by Django 3.2.22 on 2026-10-18 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nautobot_cdn_models', '0007_gitredirectmapcontextsync_gitredirectmapcontextfile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gitredirectmapcontextfile',
+            name='blob_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.2.22 on 2026-10-18 11:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('nautobot_cdn_models', '0008_gitredirectmapcontextfile_blob_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeFeedEntry',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('time', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('action', models.CharField(choices=[('create', 'Created'), ('update', 'Updated'), ('delete', 'Deleted'), ('render', 'Rendered contexts affected')], max_length=50)),
+                ('object_id', models.UUIDField(blank=True, null=True)),
+                ('object_repr', models.CharField(blank=True, max_length=200)),
+                ('affected_cdnsites', models.JSONField(blank=True, null=True)),
+                ('object_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype')),
+            ],
+            options={
+                'verbose_name_plural': 'change feed entries',
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -1,9 +1,24 @@
 from .sites import SiteRole, CdnSite, HyperCacheMemoryProfile
-from .redirectmap import RedirectMapContext, RedirectMapContextModel
+from .redirectmap import (
+    RedirectMapContext,
+    RedirectMapContextDependency,
+    RedirectMapContextModel,
+    RenderedRedirectMapContext,
+)
+from .trees import LocationClosure, SiteRoleClosure
+from .git import GitRedirectMapContextFile, GitRedirectMapContextSync
+from .changefeed import ChangeFeedEntry
 __all__ = (
+    "ChangeFeedEntry",
+    "GitRedirectMapContextFile",
+    "GitRedirectMapContextSync",
     "HyperCacheMemoryProfile",
+    "LocationClosure",
     "SiteRole",
+    "SiteRoleClosure",
     "CdnSite",
     "RedirectMapContext",
+    "RedirectMapContextDependency",
     "RedirectMapContextModel",
+    "RenderedRedirectMapContext",
 )
\ No newline at end of file
@@ -0,0 +1,40 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+
+from nautobot.core.models import BaseManager
+from nautobot.core.models.querysets import RestrictedQuerySet
+
+from ..choices import ChangeFeedActionChoices
+
+__all__ = ("ChangeFeedEntry",)
+
+
+class ChangeFeedEntry(models.Model):
+    """
+    A change to a CdnSite, SiteRole, HyperCacheMemoryProfile or RedirectMapContext, or to rendered redirect map
+    contexts, in the order it was recorded.
+
+    The auto-incremented primary key serves as the cursor of the change feed.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    time = models.DateTimeField(auto_now_add=True, db_index=True)
+    action = models.CharField(max_length=50, choices=ChangeFeedActionChoices)
+    object_type = models.ForeignKey(
+        to=ContentType,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    object_id = models.UUIDField(null=True, blank=True)
+    object_repr = models.CharField(max_length=200, blank=True)
+    # For "render" entries, the IDs of the CdnSites whose rendered context was affected, or null for all of them
+    affected_cdnsites = models.JSONField(null=True, blank=True)
+
+    objects = BaseManager.from_queryset(RestrictedQuerySet)()
+
+    class Meta:
+        ordering = ["id"]
+        verbose_name_plural = "change feed entries"
+
+    def __str__(self):
+        return f"{self.pk}: {self.action} {self.object_repr}"
@@ -0,0 +1,47 @@
+from django.db import models
+
+from nautobot.core.models import BaseModel
+
+__all__ = (
+    "GitRedirectMapContextFile",
+    "GitRedirectMapContextSync",
+)
+
+
+class GitRedirectMapContextSync(BaseModel):
+    """
+    The state of the redirect map contexts imported from a GitRepository as of its last sync.
+    """
+
+    repository = models.OneToOneField(
+        to="extras.GitRepository",
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    commit_hash = models.CharField(max_length=48, blank=True)
+
+    def __str__(self):
+        return f"{self.repository} @ {self.commit_hash or 'unsynced'}"
+
+
+class GitRedirectMapContextFile(BaseModel):
+    """
+    A file under `redirectmap_contexts/` that was successfully imported by the last sync, and what it provided.
+    """
+
+    sync = models.ForeignKey(
+        to="GitRedirectMapContextSync",
+        on_delete=models.CASCADE,
+        related_name="files",
+    )
+    path = models.CharField(max_length=255)
+    context_names = models.JSONField(default=list, blank=True)
+    local_type = models.CharField(max_length=50, blank=True)
+    blob_hash = models.CharField(max_length=64, blank=True)
+
+    class Meta:
+        ordering = ["sync", "path"]
+        unique_together = [["sync", "path"]]
+
+    def __str__(self):
+        return self.path
@@ -1,5 +1,3 @@
-from collections import OrderedDict
-
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.core.serializers.json import DjangoJSONEncoder
@@ -10,7 +8,6 @@ from django.urls import reverse
 
 from nautobot.core.models import BaseManager, BaseModel
 from nautobot.core.models.fields import ForeignKeyWithAutoRelatedName
-from nautobot.core.utils.data import deepmerge
 
 from nautobot.extras.constants import HTTP_CONTENT_TYPE_JSON
 from nautobot.extras.models import ChangeLoggedModel
@@ -19,6 +16,7 @@ from nautobot.extras.models.mixins import NotesMixin
 from nautobot.extras.utils import extras_features, FeatureQuery
 
 from ..querysets import RedirectMapContextQuerySet
+from ..utils import merge_redirectmap_contexts
 
 
 @extras_features("graphql")
@@ -163,40 +161,17 @@ class RedirectMapContextModel(models.Model, ConfigContextSchemaValidationMixin):
             # Annotation not available, so fall back to manually querying for the config context
             config_context_data = RedirectMapContext.objects.get_for_object(self).values_list("data", flat=True)
         else:
-            config_context_data = self.config_context_data or []
-            # Device and VirtualMachine's Location has its own RedirectMapContext and its parent Locations' RedirectMapContext, if any, should
-            # also be applied. However, since moving from mptt to django-tree-queries https://github.com/nautobot/nautobot/issues/510,
-            # we lost the ability to query the ancestors for a particular tree node for subquery https://github.com/matthiask/django-tree-queries/issues/54.
-            # So instead of constructing the location related query in RedirectMapContextModelQueryset._get_redirectmap_context_filters(), which is complicated across databases
-            # We append the missing parent location query here as a patch.
-            location_redirectmap_context_queryset = RedirectMapContext.objects.none()
-            if self._meta.model_name == "device":
-                location_redirectmap_context_queryset = RedirectMapContext.objects.filter(
-                    locations__in=self.location.ancestors(include_self=True)
-                ).distinct()
-            else:
-                if self.cluster and self.cluster.location:
-                    location_redirectmap_context_queryset = RedirectMapContext.objects.filter(
-                        locations__in=self.cluster.location.ancestors(include_self=True)
-                    ).distinct()
-
-            # Annotation has keys "weight" and "name" (used for ordering) and "data" (the actual config context data)
-            for cc in location_redirectmap_context_queryset:
-                config_context_data.append({"data": cc.data, "name": cc.name, "weight": cc.weight})
+            # Annotation has keys "weight" and "name" (used for ordering) and "data" (the actual config context data).
+            # Location ancestors are matched through the LocationClosure table within the annotation itself, so a
+            # context assigned to several ancestors of the same location may be aggregated more than once.
+            config_context_data = {cc["name"]: cc for cc in self.config_context_data or []}.values()
             config_context_data = [
                 c["data"] for c in sorted(config_context_data, key=lambda k: (k["weight"], k["name"]))
             ]
 
-        # Compile all config data, overwriting lower-weight values with higher-weight values where a collision occurs
-        data = OrderedDict()
-        for context in config_context_data:
-            data = deepmerge(data, context)
-
-        # If the object has local config context data defined, merge it last
-        if self.local_redirectmap_context_data:
-            data = deepmerge(data, self.local_redirectmap_context_data)
-
-        return data
+        # Compile all config data, overwriting lower-weight values with higher-weight values where a collision occurs,
+        # then merge the local config context data (if any) last
+        return merge_redirectmap_contexts(config_context_data, self.local_redirectmap_context_data)
 
     def clean(self):
         super().clean()
@@ -213,4 +188,58 @@ class RedirectMapContextModel(models.Model, ConfigContextSchemaValidationMixin):
             )
 
         # Validate data against schema
-        self._validate_with_schema("local_redirectmap_context_data", "local_redirectmap_context_schema")
\ No newline at end of file
+        self._validate_with_schema("local_redirectmap_context_data", "local_redirectmap_context_schema")
+
+
+class RenderedRedirectMapContext(BaseModel):
+    """
+    The materialized redirect map context of a single CdnSite.
+
+    This is the result of merging every applicable RedirectMapContext and the site's local context data. Records are
+    deleted once a change to one of their inputs is committed, and are re-rendered on the next read; records rendered
+    concurrently from outdated inputs are discarded (see `rendering.invalidate_rendered_redirectmap_contexts()`).
+    `data_hash` allows consumers to cheaply detect whether the rendered data has changed.
+    """
+
+    cdnsite = models.OneToOneField(
+        to="CdnSite",
+        on_delete=models.CASCADE,
+        related_name="rendered_redirectmap_context",
+    )
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    data_hash = models.CharField(max_length=64)
+    last_rendered = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["cdnsite"]
+
+    def __str__(self):
+        return f"{self.cdnsite} ({self.data_hash[:12]})"
+
+
+class RedirectMapContextDependency(BaseModel):
+    """
+    Index of which active RedirectMapContexts apply to which CdnSites.
+
+    This is maintained whenever a RedirectMapContext, its assignments or the relevant attributes of a CdnSite change,
+    so that the CdnSites affected by a change can be determined without evaluating every CdnSite.
+    """
+
+    redirect_map_context = models.ForeignKey(
+        to="RedirectMapContext",
+        on_delete=models.CASCADE,
+        related_name="cdnsite_dependencies",
+    )
+    cdnsite = models.ForeignKey(
+        to="CdnSite",
+        on_delete=models.CASCADE,
+        related_name="redirectmap_context_dependencies",
+    )
+
+    class Meta:
+        unique_together = [["redirect_map_context", "cdnsite"]]
+        verbose_name_plural = "redirect map context dependencies"
+
+    def __str__(self):
+        return f"{self.redirect_map_context} -> {self.cdnsite}"
+
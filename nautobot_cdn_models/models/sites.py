@@ -1,3 +1,5 @@
+import copy
+
 from django.db import models
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
@@ -9,6 +11,7 @@ from nautobot.extras.utils import extras_features
 from nautobot.extras.models import StatusField, Tag
 
 from ..querysets import RedirectMapContextModelQuerySet
+from ..topology import validate_cdnsite_topology
 from .redirectmap import RedirectMapContextModel
 
 __all__ = (
@@ -201,6 +204,13 @@ class CdnSite(PrimaryModel, RedirectMapContextModel):
         "siteId",
     ]
 
+    # Fields that feed into the rendered redirect map context, see has_redirectmap_context_changes()
+    redirectmap_context_fields = [
+        "cdn_site_role_id",
+        "location_id",
+        "local_redirectmap_context_data",
+    ]
+
     class Meta:
         ordering = ["cdn_site_role", "name"]
         unique_together = (
@@ -209,6 +219,31 @@ class CdnSite(PrimaryModel, RedirectMapContextModel):
     
     def __str__(self):
         return self.name or super().__str__()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.snapshot_redirectmap_context_fields()
+        return instance
+
+    def snapshot_redirectmap_context_fields(self):
+        """
+        Remember the current values of the fields feeding into the rendered redirect map context.
+
+        The values are deep-copied, so that changes made in place to the local context data dict are detected too.
+        """
+        self._loaded_redirectmap_context_fields = {
+            field: copy.deepcopy(self.__dict__.get(field)) for field in self.redirectmap_context_fields
+        }
+
+    def has_redirectmap_context_changes(self):
+        """
+        Return True if a field feeding into the rendered redirect map context changed since this instance was loaded.
+        """
+        loaded = getattr(self, "_loaded_redirectmap_context_fields", None)
+        if loaded is None:
+            return True
+        return any(self.__dict__.get(field) != value for field, value in loaded.items())
     
     def get_absolute_url(self):
         return reverse("plugins:nautobot_cdn_models:cdnsite", args=[self.pk])
@@ -223,6 +258,8 @@ class CdnSite(PrimaryModel, RedirectMapContextModel):
     def clean(self):
         super().clean()
 
+        validate_cdnsite_topology(self)
+
     
     def to_csv(self):
         return (
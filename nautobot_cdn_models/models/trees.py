@@ -0,0 +1,46 @@
+from django.db import models
+
+from nautobot.core.models import BaseModel
+
+__all__ = (
+    "LocationClosure",
+    "SiteRoleClosure",
+)
+
+
+class TreeClosureModel(BaseModel):
+    """
+    Abstract closure table of a TreeModel: one row for every (ancestor, descendant) pair, including each node paired
+    with itself at depth 0.
+
+    Unlike the recursive CTEs of django-tree-queries, a closure table can be used inside subqueries, which allows
+    ancestor and descendant lookups to be part of a larger query.
+    """
+
+    depth = models.PositiveIntegerField()
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f"{self.ancestor} > {self.descendant} ({self.depth})"
+
+
+class LocationClosure(TreeClosureModel):
+    """Closure table of `dcim.Location`."""
+
+    ancestor = models.ForeignKey(to="dcim.Location", on_delete=models.CASCADE, related_name="+")
+    descendant = models.ForeignKey(to="dcim.Location", on_delete=models.CASCADE, related_name="+")
+
+    class Meta:
+        unique_together = [["ancestor", "descendant"]]
+
+
+class SiteRoleClosure(TreeClosureModel):
+    """Closure table of `SiteRole`."""
+
+    ancestor = models.ForeignKey(to="SiteRole", on_delete=models.CASCADE, related_name="descendant_closures")
+    descendant = models.ForeignKey(to="SiteRole", on_delete=models.CASCADE, related_name="ancestor_closures")
+
+    class Meta:
+        unique_together = [["ancestor", "descendant"]]
@@ -25,20 +25,24 @@ class RedirectMapContextQuerySet(RestrictedQuerySet):
         """
         Return all applicable ConfigContexts for a given object. Only active ConfigContexts will be included.
         """
-        # `site_role` for CdnSite
-        cdn_site_role = getattr(obj, "cdn_site_role", None) or obj.cdn_site_role
+        from .trees import get_site_role_tree
+
+        # `site_role` for CdnSite, matching against the assigned role as well as any parent roles
+        cdn_site_roles = get_site_role_tree().ancestors(getattr(obj, "cdn_site_role_id", None))
 
         # Match against the directly assigned location as well as any parent locations
-        location = getattr(obj, "location", None)
-        if location:
-            locations = location.ancestors(include_self=True)
+        from .models.trees import LocationClosure
+
+        location_id = getattr(obj, "location_id", None)
+        if location_id:
+            locations = LocationClosure.objects.filter(descendant_id=location_id).values("ancestor")
         else:
             locations = []
 
         query = [
             Q(cdnsites=obj.id) | Q(cdnsites=None),
             Q(locations__in=locations) | Q(locations=None),
-            Q(cdn_site_roles=cdn_site_role) | Q(cdn_site_roles=None),
+            Q(cdn_site_roles__in=cdn_site_roles) | Q(cdn_site_roles=None),
             Q(tags__name__in=obj.tags.all().values_list('name', flat=True)) | Q(tags=None)
         ]
 
@@ -91,28 +95,40 @@ class RedirectMapContextModelQuerySet(RestrictedQuerySet):
             )
         ).distinct()
 
+    def render_redirectmap_contexts(self):
+        """
+        Render the redirect map context of every object in the queryset with a constant number of queries.
+
+        Returns a dict mapping object IDs to their rendered context data.
+        """
+        from .rendering import render_redirectmap_contexts
+
+        return render_redirectmap_contexts(self)
+
     def _get_config_context_filters(self):
         """
         This method is constructing the set of Q objects for the specific object types.
-        Note that locations filters are not included in the method because the filter needs the
-        ability to query the ancestors for a particular tree node for subquery and we lost it since
-        moving from mptt to django-tree-queries https://github.com/matthiask/django-tree-queries/issues/54.
+        Since moving from mptt to django-tree-queries we lost the ability to query the ancestors for a particular
+        tree node for subquery https://github.com/matthiask/django-tree-queries/issues/54, so the location and
+        site role ancestors are looked up through the LocationClosure and SiteRoleClosure tables instead.
         """
-        tag_query_filters = {
-            "object_id": OuterRef(OuterRef("pk")),
-            "content_type__app_label": self.model._meta.app_label,
-            "content_type__model": self.model._meta.model_name,
-        }
+        from .models.trees import LocationClosure, SiteRoleClosure
+
+        # CdnSite.tags is a plain ManyToManyField, so its tags are stored in the auto-created through table
+        # rather than in TaggedItem
+        tags_field = self.model._meta.get_field("tags")
+        tag_query_filters = {f"{tags_field.m2m_field_name()}_id": OuterRef(OuterRef("pk"))}
+        tag_subquery = tags_field.remote_field.through.objects.filter(**tag_query_filters).values_list(
+            f"{tags_field.m2m_reverse_field_name()}_id", flat=True
+        )
         base_query = Q(
-            Q(tags__pk__in=Subquery(TaggedItem.objects.filter(**tag_query_filters).values_list("tag_id", flat=True)))
-            | Q(tags=None),
+            Q(tags__pk__in=Subquery(tag_subquery)) | Q(tags=None),
             is_active=True,
         )
-        base_query.add((Q(cdn_site_roles=OuterRef("cdn_site_role")) | Q(cdn_site_roles=None)), Q.AND)
-        if self.model._meta.model_name == "cdnsite":
-            # base_query.add((Q(device_types=OuterRef("device_type")) | Q(device_types=None)), Q.AND)
-            # # This is necessary to prevent location related config context to be applied now.
-            # # The location hierarchy cannot be processed by the database and must be added by `ConfigContextModel.get_config_context`
-            base_query.add((Q(locations=None)), Q.AND)
+        base_query.add((Q(cdnsites=OuterRef("pk")) | Q(cdnsites=None)), Q.AND)
+        role_subquery = SiteRoleClosure.objects.filter(descendant=OuterRef(OuterRef("cdn_site_role"))).values("ancestor")
+        base_query.add((Q(cdn_site_roles__in=Subquery(role_subquery)) | Q(cdn_site_roles=None)), Q.AND)
+        location_subquery = LocationClosure.objects.filter(descendant=OuterRef(OuterRef("location"))).values("ancestor")
+        base_query.add((Q(locations__in=Subquery(location_subquery)) | Q(locations=None)), Q.AND)
 
         return base_query
\ No newline at end of file
@@ -0,0 +1,215 @@
+"""Materialized rendering of CdnSite redirect map contexts."""
+from collections import defaultdict
+import logging
+
+from django.db import transaction
+
+from .changefeed import get_latest_render_change, record_rendered_changes
+from .models import CdnSite, LocationClosure, RedirectMapContext, RenderedRedirectMapContext
+from .trees import get_site_role_tree
+from .utils import hash_redirectmap_context, merge_redirectmap_contexts
+
+logger = logging.getLogger(__name__)
+
+
+def render_redirectmap_context(cdnsite):
+    """
+    Merge every RedirectMapContext applicable to the given CdnSite, followed by its local context data.
+    """
+    contexts = RedirectMapContext.objects.get_for_object(cdnsite)
+    return merge_redirectmap_contexts(
+        (context.data for context in contexts),
+        cdnsite.local_redirectmap_context_data,
+    )
+
+
+def _store_rendered_redirectmap_contexts(records, render_cursor):
+    """
+    Store the given freshly rendered RenderedRedirectMapContexts once the current transaction (if any) commits, unless
+    rendered contexts were invalidated since `render_cursor` (the latest render change, read before rendering) was
+    read.
+
+    A reader may render from data that a concurrent transaction is replacing. Once that transaction commits, the
+    invalidation deletes the stored records, records a render change and deletes them again (see
+    `invalidate_rendered_redirectmap_contexts()`). So records rendered from outdated data are either not stored
+    (the render change was recorded before the first check), deleted by the invalidation (stored before its second
+    delete), or deleted here (the render change was recorded while they were being stored).
+
+    This only holds if the records are committed as soon as they are inserted, for the second delete of the
+    invalidation to see them: a reader within a transaction (a job, a test, ATOMIC_REQUESTS...) could otherwise commit
+    them after that delete. Hence the records are only stored once the reader's transaction is committed, and not at
+    all if it is rolled back.
+    """
+    transaction.on_commit(lambda: _store_rendered_redirectmap_contexts_now(records, render_cursor))
+
+
+def _store_rendered_redirectmap_contexts_now(records, render_cursor):
+    if get_latest_render_change()[0] != render_cursor:
+        return
+    RenderedRedirectMapContext.objects.bulk_create(records, batch_size=1000, ignore_conflicts=True)
+    if get_latest_render_change()[0] != render_cursor:
+        RenderedRedirectMapContext.objects.filter(pk__in=[record.pk for record in records]).delete()
+
+
+def refresh_rendered_redirectmap_context(cdnsite):
+    """
+    Render the redirect map context of the given CdnSite and store the result.
+    """
+    render_cursor = get_latest_render_change()[0]
+    data = render_redirectmap_context(cdnsite)
+    rendered = RenderedRedirectMapContext(cdnsite=cdnsite, data=data, data_hash=hash_redirectmap_context(data))
+    RenderedRedirectMapContext.objects.filter(cdnsite=cdnsite).delete()
+    _store_rendered_redirectmap_contexts([rendered], render_cursor)
+    return rendered
+
+
+def get_rendered_redirectmap_context(cdnsite):
+    """
+    Return the stored RenderedRedirectMapContext of the given CdnSite, rendering it first if it is missing.
+    """
+    render_cursor = get_latest_render_change()[0]
+    try:
+        return RenderedRedirectMapContext.objects.get(cdnsite=cdnsite)
+    except RenderedRedirectMapContext.DoesNotExist:
+        data = render_redirectmap_context(cdnsite)
+        rendered = RenderedRedirectMapContext(cdnsite=cdnsite, data=data, data_hash=hash_redirectmap_context(data))
+        _store_rendered_redirectmap_contexts([rendered], render_cursor)
+        return rendered
+
+
+def _get_redirectmap_context_assignments(field_name):
+    """
+    Return a dict mapping the ID of every active RedirectMapContext to the set of object IDs assigned via `field_name`.
+    """
+    field = RedirectMapContext._meta.get_field(field_name)
+    context_field = f"{field.m2m_field_name()}_id"
+    object_field = f"{field.m2m_reverse_field_name()}_id"
+    assignments = defaultdict(set)
+    for context_id, object_id in (
+        field.remote_field.through.objects.filter(**{f"{field.m2m_field_name()}__is_active": True})
+        .values_list(context_field, object_field)
+        .iterator()
+    ):
+        assignments[context_id].add(object_id)
+    return assignments
+
+
+def _get_location_ancestors(location_ids):
+    """
+    Return a dict mapping each of the given Location IDs to the set of its own and all of its ancestors' IDs.
+    """
+    ancestors = defaultdict(set)
+    for location_id, ancestor_id in (
+        LocationClosure.objects.filter(descendant_id__in=location_ids)
+        .values_list("descendant_id", "ancestor_id")
+        .iterator()
+    ):
+        ancestors[location_id].add(ancestor_id)
+    return ancestors
+
+
+def render_redirectmap_contexts(cdnsites):
+    """
+    Render the redirect map context of every CdnSite in the given queryset.
+
+    Unlike calling `render_redirectmap_context()` per site, this loads the sites, their tags, their location ancestry,
+    the cached SiteRole tree and all active RedirectMapContexts with their assignments once and matches them in memory, so the number of queries does
+    not depend on the number of sites. Matching follows `RedirectMapContextQuerySet.get_for_object()`.
+
+    Returns a dict mapping CdnSite IDs to their rendered context data.
+    """
+    cdnsite_values = list(cdnsites.values("pk", "cdn_site_role_id", "location_id", "local_redirectmap_context_data"))
+    if not cdnsite_values:
+        return {}
+
+    cdnsite_tags = defaultdict(set)
+    tags_field = CdnSite._meta.get_field("tags")
+    for cdnsite_id, tag_id in (
+        tags_field.remote_field.through.objects.filter(
+            **{f"{tags_field.m2m_field_name()}__in": cdnsites.values("pk")}
+        )
+        .values_list(f"{tags_field.m2m_field_name()}_id", f"{tags_field.m2m_reverse_field_name()}_id")
+        .iterator()
+    ):
+        cdnsite_tags[cdnsite_id].add(tag_id)
+
+    location_ancestors = _get_location_ancestors(cdnsites.exclude(location=None).values("location_id"))
+
+    site_role_tree = get_site_role_tree()
+    contexts = list(RedirectMapContext.objects.filter(is_active=True).order_by("weight", "name").values("pk", "data"))
+    assignments = {
+        field_name: _get_redirectmap_context_assignments(field_name)
+        for field_name in ("cdnsites", "locations", "cdn_site_roles", "tags")
+    }
+
+    rendered = {}
+    for values in cdnsite_values:
+        cdnsite_facts = {
+            "cdnsites": {values["pk"]},
+            "locations": location_ancestors.get(values["location_id"], set()),
+            "cdn_site_roles": site_role_tree.ancestors(values["cdn_site_role_id"]),
+            "tags": cdnsite_tags[values["pk"]],
+        }
+        rendered[values["pk"]] = merge_redirectmap_contexts(
+            (
+                context["data"]
+                for context in contexts
+                if all(
+                    not assignments[field_name][context["pk"]]
+                    or not assignments[field_name][context["pk"]].isdisjoint(facts)
+                    for field_name, facts in cdnsite_facts.items()
+                )
+            ),
+            values["local_redirectmap_context_data"],
+        )
+    return rendered
+
+
+def get_rendered_redirectmap_contexts(cdnsites):
+    """
+    Return a dict mapping the ID of every CdnSite in the given queryset to its stored RenderedRedirectMapContext.
+
+    Missing records are rendered in bulk with `render_redirectmap_contexts()` and stored.
+    """
+    render_cursor = get_latest_render_change()[0]
+    rendered = {
+        record.cdnsite_id: record
+        for record in RenderedRedirectMapContext.objects.filter(cdnsite__in=cdnsites.values("pk"))
+    }
+    missing = cdnsites.exclude(pk__in=list(rendered))
+    new_records = [
+        RenderedRedirectMapContext(cdnsite_id=cdnsite_id, data=data, data_hash=hash_redirectmap_context(data))
+        for cdnsite_id, data in render_redirectmap_contexts(missing).items()
+    ]
+    if new_records:
+        _store_rendered_redirectmap_contexts(new_records, render_cursor)
+        rendered.update((record.cdnsite_id, record) for record in new_records)
+    return rendered
+
+
+def invalidate_rendered_redirectmap_contexts(cdnsite_ids=None):
+    """
+    Discard the stored rendered redirect map contexts of the given CdnSite IDs (or of every CdnSite if None).
+
+    Invalidated contexts are re-rendered on their next read. The affected sites are recorded in the change feed.
+
+    Nothing happens until the current transaction (if any) commits: until then, readers would only re-render the
+    contexts from the data being replaced.
+    """
+    if cdnsite_ids is not None:
+        cdnsite_ids = list(cdnsite_ids)
+        if not cdnsite_ids:
+            return
+    transaction.on_commit(lambda: _discard_rendered_redirectmap_contexts(cdnsite_ids))
+
+
+def _discard_rendered_redirectmap_contexts(cdnsite_ids):
+    queryset = RenderedRedirectMapContext.objects.all()
+    if cdnsite_ids is not None:
+        queryset = queryset.filter(cdnsite_id__in=cdnsite_ids)
+    deleted, _ = queryset.delete()
+    record_rendered_changes(cdnsite_ids)
+    # Records stored by readers that checked the render cursor before the change was recorded, but rendered from the
+    # data replaced by the committed transaction, see _store_rendered_redirectmap_contexts()
+    deleted_after, _ = queryset.delete()
+    logger.debug("Invalidated %d rendered redirect map contexts", deleted + deleted_after)
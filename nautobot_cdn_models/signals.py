@@ -4,14 +4,35 @@ import shutil
 
 from django.apps import apps as global_apps
 from django.conf import settings
-from django.db.models.signals import pre_delete
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
 
 from nautobot.extras.choices import RelationshipTypeChoices
 from nautobot.core.celery import app
 
 from nautobot.extras.choices import JobResultStatusChoices
-from nautobot.extras.models import JobResult
+from nautobot.dcim.models import Location
+from nautobot.extras.models import JobResult, Tag
+
+from .changefeed import record_changes
+from .choices import ChangeFeedActionChoices
+from .dependencies import (
+    get_dependent_cdnsite_ids,
+    rebuild_redirectmap_context_dependencies,
+    update_cdnsite_dependencies,
+    update_redirectmap_context_dependencies,
+)
+from .models import (
+    CdnSite,
+    HyperCacheMemoryProfile,
+    LocationClosure,
+    RedirectMapContext,
+    SiteRole,
+    SiteRoleClosure,
+)
+from .rendering import invalidate_rendered_redirectmap_contexts
+from .topology import cdnsite_topology_cache
+from .trees import rebuild_tree_closure, site_role_tree_cache, update_tree_closure
 
 
 PLUGIN_SETTINGS = settings.PLUGINS_CONFIG["nautobot_cdn_models"]
@@ -81,3 +102,207 @@ def create_cdnsite_to_vm_relationship(sender, apps, **kwargs):
             "destination_label": "CdnSite to associated VMs",
         },
     )
+
+
+#
+# Rendered redirect map contexts and their dependency index
+#
+
+
+@receiver(post_save, sender=RedirectMapContext)
+def update_dependencies_on_context_save(sender, instance, raw=False, **kwargs):
+    """A RedirectMapContext was created or changed, re-index it and discard the rendered contexts it affects."""
+    if raw:
+        return
+    invalidate_rendered_redirectmap_contexts(update_redirectmap_context_dependencies(instance))
+
+
+@receiver(pre_delete, sender=RedirectMapContext)
+def collect_dependencies_on_context_delete(sender, instance, **kwargs):
+    """Remember the CdnSites depending on a RedirectMapContext before its index entries are cascade-deleted."""
+    instance._dependent_cdnsite_ids = get_dependent_cdnsite_ids(instance)
+
+
+@receiver(post_delete, sender=RedirectMapContext)
+def invalidate_rendered_redirectmap_contexts_on_context_delete(sender, instance, **kwargs):
+    """A RedirectMapContext was deleted, discard the rendered contexts it contributed to."""
+    invalidate_rendered_redirectmap_contexts(getattr(instance, "_dependent_cdnsite_ids", None))
+
+
+@receiver(m2m_changed, sender=RedirectMapContext.locations.through)
+@receiver(m2m_changed, sender=RedirectMapContext.cdn_site_roles.through)
+@receiver(m2m_changed, sender=RedirectMapContext.cdnsites.through)
+@receiver(m2m_changed, sender=RedirectMapContext.tags.through)
+def update_dependencies_on_context_assignment(sender, instance, action, **kwargs):
+    """The objects a RedirectMapContext is assigned to changed, only the sites gaining or losing it are affected."""
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_rendered_redirectmap_contexts(update_redirectmap_context_dependencies(instance, data_changed=False))
+
+
+# The RedirectMapContext assignment field of each model whose deletion cascade-deletes assignments, which doesn't send
+# any m2m_changed signal. A context losing its only assignment of a kind then applies much more widely.
+REDIRECTMAP_CONTEXT_ASSIGNMENT_FIELDS = {
+    CdnSite: "cdnsites",
+    Location: "locations",
+    SiteRole: "cdn_site_roles",
+    Tag: "tags",
+}
+
+
+@receiver(pre_delete, sender=CdnSite)
+@receiver(pre_delete, sender=Location)
+@receiver(pre_delete, sender=SiteRole)
+@receiver(pre_delete, sender=Tag)
+def collect_contexts_on_assigned_object_delete(sender, instance, **kwargs):
+    """Remember the RedirectMapContexts assigned to an object, their assignment is about to be cascade-deleted."""
+    field_name = REDIRECTMAP_CONTEXT_ASSIGNMENT_FIELDS[sender]
+    instance._assigned_redirectmap_context_ids = list(
+        RedirectMapContext.objects.filter(**{field_name: instance}).values_list("pk", flat=True)
+    )
+
+
+@receiver(post_delete, sender=CdnSite)
+@receiver(post_delete, sender=Location)
+@receiver(post_delete, sender=SiteRole)
+@receiver(post_delete, sender=Tag)
+def update_dependencies_on_assigned_object_delete(sender, instance, **kwargs):
+    """An object RedirectMapContexts were assigned to was deleted, re-index them."""
+    context_ids = getattr(instance, "_assigned_redirectmap_context_ids", None)
+    if not context_ids:
+        return
+    affected_cdnsite_ids = set()
+    for redirect_map_context in RedirectMapContext.objects.filter(pk__in=context_ids):
+        affected_cdnsite_ids |= update_redirectmap_context_dependencies(redirect_map_context, data_changed=False)
+    invalidate_rendered_redirectmap_contexts(affected_cdnsite_ids)
+
+
+@receiver(post_save, sender=CdnSite)
+def update_dependencies_on_cdnsite_change(sender, instance, created, raw=False, **kwargs):
+    """A CdnSite was created, or its role, location or local context data changed."""
+    if raw:
+        return
+    if created:
+        update_cdnsite_dependencies(instance)
+    elif instance.has_redirectmap_context_changes():
+        update_cdnsite_dependencies(instance)
+        invalidate_rendered_redirectmap_contexts([instance.pk])
+    instance.snapshot_redirectmap_context_fields()
+
+
+@receiver(m2m_changed, sender=CdnSite.tags.through)
+def update_dependencies_on_cdnsite_tags(sender, instance, action, **kwargs):
+    """A CdnSite's tags changed."""
+    if action in ("post_add", "post_remove", "post_clear"):
+        update_cdnsite_dependencies(instance)
+        invalidate_rendered_redirectmap_contexts([instance.pk])
+
+
+def _update_cdnsite_dependencies(cdnsites):
+    for cdnsite in cdnsites:
+        update_cdnsite_dependencies(cdnsite)
+    invalidate_rendered_redirectmap_contexts(cdnsite.pk for cdnsite in cdnsites)
+
+
+@receiver(post_save, sender=SiteRole)
+def update_siterole_closure(sender, instance, created, raw=False, **kwargs):
+    """A SiteRole was created or moved in the tree, a move changes which contexts apply to the sites beneath it."""
+    if raw:
+        return
+    site_role_tree_cache.invalidate()
+    if not update_tree_closure(SiteRoleClosure, instance) or created:
+        return
+    _update_cdnsite_dependencies(
+        CdnSite.objects.filter(
+            cdn_site_role__in=SiteRoleClosure.objects.filter(ancestor=instance).values("descendant")
+        )
+    )
+
+
+@receiver(pre_delete, sender=SiteRole)
+def collect_cdnsites_on_siterole_delete(sender, instance, **kwargs):
+    """Remember the CdnSites of a SiteRole subtree, their role is about to be nulled without any signal."""
+    instance._cdnsite_ids = list(
+        CdnSite.objects.filter(
+            cdn_site_role__in=SiteRoleClosure.objects.filter(ancestor=instance).values("descendant")
+        ).values_list("pk", flat=True)
+    )
+
+
+@receiver(post_delete, sender=SiteRole)
+def update_dependencies_on_siterole_delete(sender, instance, **kwargs):
+    """A SiteRole was deleted."""
+    site_role_tree_cache.invalidate()
+    _update_cdnsite_dependencies(CdnSite.objects.filter(pk__in=getattr(instance, "_cdnsite_ids", [])))
+
+
+@receiver(post_save, sender=Location)
+def update_location_closure(sender, instance, created, raw=False, **kwargs):
+    """A Location was created or moved in the tree, a move changes which contexts apply to the sites beneath it."""
+    if raw:
+        return
+    if not update_tree_closure(LocationClosure, instance) or created:
+        return
+    _update_cdnsite_dependencies(
+        CdnSite.objects.filter(location__in=LocationClosure.objects.filter(ancestor=instance).values("descendant"))
+    )
+
+
+#
+# CdnSite topology
+#
+
+
+@receiver(post_save, sender=CdnSite)
+@receiver(post_delete, sender=CdnSite)
+def invalidate_cdnsite_topology(sender, instance, **kwargs):
+    """A CdnSite was saved or deleted, its neighbor and failover relations may have changed."""
+    cdnsite_topology_cache.invalidate()
+
+
+#
+# Change feed
+#
+
+
+@receiver(post_save, sender=CdnSite)
+@receiver(post_save, sender=SiteRole)
+@receiver(post_save, sender=HyperCacheMemoryProfile)
+@receiver(post_save, sender=RedirectMapContext)
+def record_change_on_save(sender, instance, created, raw=False, **kwargs):
+    """An object exposed by the change feed was created or updated."""
+    if raw:
+        return
+    record_changes(
+        [instance], ChangeFeedActionChoices.ACTION_CREATE if created else ChangeFeedActionChoices.ACTION_UPDATE
+    )
+
+
+@receiver(post_delete, sender=CdnSite)
+@receiver(post_delete, sender=SiteRole)
+@receiver(post_delete, sender=HyperCacheMemoryProfile)
+@receiver(post_delete, sender=RedirectMapContext)
+def record_change_on_delete(sender, instance, **kwargs):
+    """An object exposed by the change feed was deleted."""
+    record_changes([instance], ChangeFeedActionChoices.ACTION_DELETE)
+
+
+@receiver(m2m_changed, sender=CdnSite.tags.through)
+@receiver(m2m_changed, sender=RedirectMapContext.locations.through)
+@receiver(m2m_changed, sender=RedirectMapContext.cdn_site_roles.through)
+@receiver(m2m_changed, sender=RedirectMapContext.cdnsites.through)
+@receiver(m2m_changed, sender=RedirectMapContext.tags.through)
+def record_change_on_assignment(sender, instance, action, **kwargs):
+    """The tags or assignments of an object exposed by the change feed changed."""
+    if action in ("post_add", "post_remove", "post_clear"):
+        record_changes([instance], ChangeFeedActionChoices.ACTION_UPDATE)
+
+
+def post_migrate_rebuild_tree_closures(sender, **kwargs):
+    """Callback function for post_migrate() -- (re)build the Location and SiteRole closure tables."""
+    rebuild_tree_closure(LocationClosure, Location)
+    rebuild_tree_closure(SiteRoleClosure, SiteRole)
+
+
+def post_migrate_rebuild_redirectmap_context_dependencies(sender, **kwargs):
+    """Callback function for post_migrate() -- (re)build the RedirectMapContext dependency index."""
+    rebuild_redirectmap_context_dependencies()
@@ -103,12 +103,22 @@ class SiteRoleTable(BaseTable):
         url_params={"cdn_site_role": "name"},
         verbose_name="CdnSites",
     )
+    subtree_bandwidth_mbps = tables.Column(verbose_name="Total Bandwidth (Mbps)")
+    subtree_diskless_cdnsite_count = tables.Column(verbose_name="Diskless CdnSites")
     actions = ButtonsColumn(SiteRole)
 
     class Meta(BaseTable.Meta):
         model = SiteRole
-        fields = ("pk", "name", "cdnsite_count", "description", "actions")
-        default_columns = ("pk", "name", "cdnsite_count", "description", "actions")
+        fields = (
+            "pk",
+            "name",
+            "cdnsite_count",
+            "subtree_bandwidth_mbps",
+            "subtree_diskless_cdnsite_count",
+            "description",
+            "actions",
+        )
+        default_columns = ("pk", "name", "cdnsite_count", "subtree_bandwidth_mbps", "description", "actions")
 
 
 #
@@ -129,6 +139,9 @@ class CdnSiteTable(StatusTableMixin, BaseTable):
     neighbor2_preference = tables.Column(verbose_name="Secondary Site Neighbor Preference")
     siteId = tables.Column(verbose_name="Akamai Site ID")
     cacheMemoryProfileId = tables.LinkColumn(verbose_name="Cache Memory Profile")
+    available_bandwidth_mbps = tables.Column(
+        verbose_name="Available Bandwidth (Mbps)", orderable=False, empty_values=()
+    )
 
     class Meta(BaseTable.Meta):
         model = CdnSite
@@ -147,6 +160,7 @@ class CdnSiteTable(StatusTableMixin, BaseTable):
             'neighbor2_preference',
             'cacheMemoryProfileId',
             'siteId',
+            'available_bandwidth_mbps',
         )
         default_columns = (
             'pk',
@@ -165,6 +179,11 @@ class CdnSiteTable(StatusTableMixin, BaseTable):
             return related_cacheMemoryProfileId.name
         return 'No associated Profile'
 
+    def render_available_bandwidth_mbps(self, record):
+        # Only computed for querysets annotated with annotate_cdnsite_capacity()
+        available_bandwidth_mbps = getattr(record, "available_bandwidth_mbps", None)
+        return "—" if available_bandwidth_mbps is None else available_bandwidth_mbps
+
 CDNSITE_LINK = """
 <a href="{% url '"plugins:nautobot_cdn_models:cdnsite' pk=record.pk %}">
     {{ record.name|default:'<span class="label label-info">Unnamed site</span>' }}
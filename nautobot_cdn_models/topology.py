@@ -0,0 +1,211 @@
+"""In-memory graph of the neighbor and failover relations between CdnSites, and validation of changes to it."""
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.core.exceptions import ValidationError
+
+from .utils import GenerationCache
+
+
+class CdnSiteTopology:
+    """
+    Snapshot of the neighbor (`neighbor1`, `neighbor2` and their preferences) and failover (`failover_site`) edges
+    between CdnSites, built from a single query.
+
+    Neighbors are ordered by preference, lower values first, `neighbor1` winning ties.
+    """
+
+    def __init__(self, sites):
+        self.site_ids = set()
+        self.names = {}
+        self.neighbors = {}
+        self.failover = {}
+        self.referrers = defaultdict(set)
+        for site in sites:
+            self.set_site(*site)
+
+    @classmethod
+    def build(cls):
+        from .models import CdnSite  # pylint: disable=import-outside-toplevel
+
+        return cls(
+            CdnSite.objects.values_list(
+                "pk",
+                "name",
+                "neighbor1_id",
+                "neighbor1_preference",
+                "neighbor2_id",
+                "neighbor2_preference",
+                "failover_site_id",
+            ).iterator()
+        )
+
+    def set_site(  # pylint: disable=too-many-arguments
+        self, site_id, name, neighbor1_id, neighbor1_preference, neighbor2_id, neighbor2_preference, failover_id
+    ):
+        """Add a CdnSite to the topology, or replace its edges."""
+        for target_id in self.neighbors.get(site_id, []) + [self.failover.get(site_id)]:
+            self.referrers.get(target_id, set()).discard(site_id)
+
+        self.site_ids.add(site_id)
+        self.names[site_id] = name
+        neighbors = [
+            (preference if preference is not None else float("inf"), rank, neighbor_id)
+            for rank, (neighbor_id, preference) in enumerate(
+                ((neighbor1_id, neighbor1_preference), (neighbor2_id, neighbor2_preference))
+            )
+            if neighbor_id is not None
+        ]
+        self.neighbors[site_id] = [neighbor_id for _, _, neighbor_id in sorted(neighbors)]
+        self.failover[site_id] = failover_id
+        for target_id in self.neighbors[site_id] + [failover_id]:
+            if target_id is not None:
+                self.referrers[target_id].add(site_id)
+
+    def get_neighbors(self, site_id):
+        """Return the IDs of the neighbors of the given CdnSite, most preferred first."""
+        return list(self.neighbors.get(site_id, ()))
+
+    def get_failover_chain(self, site_id):
+        """
+        Return the IDs of the CdnSites traffic fails over to from the given CdnSite, in order.
+
+        The chain stops at the first site without a failover site, or before a site already in the chain (including
+        the given site itself) if the chain loops.
+        """
+        chain = []
+        seen = {site_id}
+        next_id = self.failover.get(site_id)
+        while next_id is not None and next_id not in seen:
+            chain.append(next_id)
+            seen.add(next_id)
+            next_id = self.failover.get(next_id)
+        return chain
+
+    def find_failover_cycles(self):
+        """
+        Return every failover loop, as lists of CdnSite IDs in failover order, each starting from its smallest ID.
+        """
+        cycles = []
+        visited = set()
+        for start_id in self.site_ids:
+            path = []
+            position = {}
+            site_id = start_id
+            while site_id is not None and site_id not in visited:
+                visited.add(site_id)
+                position[site_id] = len(path)
+                path.append(site_id)
+                site_id = self.failover.get(site_id)
+            if site_id is not None and site_id in position:
+                cycle = path[position[site_id]:]
+                smallest = cycle.index(min(cycle, key=str))
+                cycles.append(cycle[smallest:] + cycle[:smallest])
+        return cycles
+
+    def get_failover_loop(self, site_id, failover_id):
+        """
+        Return the loop (starting and ending with `site_id`) that failing over from the given CdnSite to `failover_id`
+        would create, or None.
+        """
+        loop = [site_id]
+        next_id = failover_id
+        while next_id is not None and next_id not in loop:
+            loop.append(next_id)
+            next_id = self.failover.get(next_id)
+        return loop + [site_id] if next_id == site_id else None
+
+    def is_in_failover_cycle(self, site_id):
+        """Return True if the failover chain of the given CdnSite leads back to it."""
+        chain = self.get_failover_chain(site_id)
+        last_id = chain[-1] if chain else site_id
+        return self.failover.get(last_id) == site_id
+
+    def get_unreachable_sites(self, root_ids=None):
+        """
+        Return the IDs of the CdnSites that can't be reached through neighbor or failover edges.
+
+        With `root_ids`, these are the sites not reachable from any of the given sites (which are reachable
+        themselves). Otherwise, these are the sites no other site points to as a neighbor or failover site.
+        """
+        if root_ids is None:
+            return {site_id for site_id in self.site_ids if not self.referrers.get(site_id, set()) - {site_id}}
+
+        reachable = set()
+        pending = [root_id for root_id in root_ids if root_id in self.site_ids]
+        while pending:
+            site_id = pending.pop()
+            if site_id in reachable:
+                continue
+            reachable.add(site_id)
+            pending.extend(self.neighbors.get(site_id, ()))
+            if self.failover.get(site_id) is not None:
+                pending.append(self.failover[site_id])
+        return self.site_ids - reachable
+
+
+cdnsite_topology_cache = GenerationCache("nautobot_cdn_models:cdnsite_topology", CdnSiteTopology.build)
+
+
+def get_cdnsite_topology():
+    """
+    Return the cached CdnSiteTopology, invalidated whenever a CdnSite is saved or deleted.
+    """
+    return cdnsite_topology_cache.get()
+
+
+# Topology snapshot shared by the validation of a batch of CdnSites, see batch_topology_validation()
+_batch_topology = ContextVar("nautobot_cdn_models_batch_topology", default=None)
+
+
+@contextmanager
+def batch_topology_validation():
+    """
+    Validate the topology of every CdnSite cleaned within the block against one snapshot of the topology.
+
+    Each validated site's edges are applied to the snapshot, so the sites of the batch are validated against each
+    other's changes, and the topology isn't rebuilt after each save (which invalidates the cached topology).
+    """
+    token = _batch_topology.set(CdnSiteTopology.build())
+    try:
+        yield
+    finally:
+        _batch_topology.reset(token)
+
+
+def validate_cdnsite_topology(cdnsite):
+    """
+    Raise a ValidationError if the given CdnSite is its own neighbor or failover site, or if its failover site would
+    lead back to it.
+
+    The failover chain is resolved in memory, from the batch snapshot if any, else from the cached topology.
+    """
+    errors = {}
+    for field_name, label in (("neighbor1", "neighbor"), ("neighbor2", "neighbor"), ("failover_site", "failover site")):
+        if getattr(cdnsite, f"{field_name}_id") is not None and getattr(cdnsite, f"{field_name}_id") == cdnsite.pk:
+            errors[field_name] = f"A site cannot be its own {label}."
+
+    batch_topology = _batch_topology.get()
+    topology = batch_topology or get_cdnsite_topology()
+    if "failover_site" not in errors and cdnsite.failover_site_id is not None:
+        loop = topology.get_failover_loop(cdnsite.pk, cdnsite.failover_site_id)
+        if loop:
+            names = [
+                str(cdnsite.name if site_id == cdnsite.pk else topology.names.get(site_id, site_id)) for site_id in loop
+            ]
+            errors["failover_site"] = f"This would create a failover loop: {' -> '.join(names)}"
+
+    if errors:
+        raise ValidationError(errors)
+
+    if batch_topology is not None:
+        batch_topology.set_site(
+            cdnsite.pk,
+            cdnsite.name,
+            cdnsite.neighbor1_id,
+            cdnsite.neighbor1_preference,
+            cdnsite.neighbor2_id,
+            cdnsite.neighbor2_preference,
+            cdnsite.failover_site_id,
+        )
@@ -0,0 +1,122 @@
+"""Maintenance of the closure tables of the Location and SiteRole trees, and the cached SiteRole tree."""
+from collections import defaultdict
+import logging
+
+from django.db import transaction
+
+from .utils import GenerationCache
+
+logger = logging.getLogger(__name__)
+
+
+def update_tree_closure(closure_model, node):
+    """
+    Bring the closure rows of a tree node and its subtree up to date after the node was created or moved.
+
+    Returns True if the closure table was changed, False if the node was already recorded under its current parent.
+    """
+    subtree = list(closure_model.objects.filter(ancestor_id=node.pk).values_list("descendant_id", "depth"))
+    if subtree:
+        current_parent_id = (
+            closure_model.objects.filter(descendant_id=node.pk, depth=1).values_list("ancestor_id", flat=True).first()
+        )
+        if current_parent_id == node.parent_id:
+            return False
+    else:
+        subtree = [(node.pk, 0)]
+
+    # The new path from the root down to (and including) the node
+    path = [(node.pk, 0)]
+    if node.parent_id is not None:
+        path += [
+            (ancestor_id, depth + 1)
+            for ancestor_id, depth in closure_model.objects.filter(descendant_id=node.parent_id).values_list(
+                "ancestor_id", "depth"
+            )
+        ]
+    subtree_ids = [descendant_id for descendant_id, _ in subtree]
+
+    with transaction.atomic():
+        # Detach the subtree from its former ancestors, then attach it to the new ones
+        closure_model.objects.filter(descendant_id__in=subtree_ids).exclude(ancestor_id__in=subtree_ids).delete()
+        closure_model.objects.bulk_create(
+            [
+                closure_model(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=ancestor_depth + depth)
+                for ancestor_id, ancestor_depth in path
+                for descendant_id, depth in subtree
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+    return True
+
+
+def rebuild_tree_closure(closure_model, tree_model):
+    """
+    Rebuild the closure table of `tree_model` from scratch.
+    """
+    parents = dict(tree_model.objects.values_list("pk", "parent_id").iterator())
+    rows = []
+    for node_id in parents:
+        ancestor_id, depth = node_id, 0
+        while ancestor_id is not None and depth <= len(parents):
+            rows.append(closure_model(ancestor_id=ancestor_id, descendant_id=node_id, depth=depth))
+            ancestor_id, depth = parents.get(ancestor_id), depth + 1
+
+    with transaction.atomic():
+        closure_model.objects.all().delete()
+        closure_model.objects.bulk_create(rows, batch_size=1000)
+    logger.info("Rebuilt %s with %d entries", closure_model._meta.verbose_name, len(rows))
+
+
+class SiteRoleTree:
+    """
+    In-memory snapshot of the SiteRole hierarchy, built from a single query.
+    """
+
+    def __init__(self, parents):
+        self.parents = parents
+        self.children = defaultdict(set)
+        for role_id, parent_id in parents.items():
+            if parent_id is not None:
+                self.children[parent_id].add(role_id)
+
+    @classmethod
+    def build(cls):
+        from .models import SiteRole  # pylint: disable=import-outside-toplevel
+
+        return cls(dict(SiteRole.objects.values_list("pk", "parent_id").iterator()))
+
+    def ancestors(self, role_id, include_self=True):
+        """Return the set of IDs of the ancestors of the given SiteRole."""
+        ancestors = set()
+        if role_id is None:
+            return ancestors
+        if include_self:
+            ancestors.add(role_id)
+        parent_id = self.parents.get(role_id)
+        while parent_id is not None and parent_id not in ancestors:
+            ancestors.add(parent_id)
+            parent_id = self.parents.get(parent_id)
+        return ancestors
+
+    def descendants(self, role_id, include_self=True):
+        """Return the set of IDs of the descendants of the given SiteRole."""
+        descendants = {role_id} if include_self else set()
+        pending = list(self.children.get(role_id, ()))
+        while pending:
+            child_id = pending.pop()
+            if child_id not in descendants:
+                descendants.add(child_id)
+                pending.extend(self.children.get(child_id, ()))
+        return descendants
+
+
+site_role_tree_cache = GenerationCache("nautobot_cdn_models:siterole_tree", SiteRoleTree.build)
+
+
+def get_site_role_tree():
+    """
+    Return the cached SiteRoleTree, invalidated whenever a SiteRole is saved or deleted.
+    """
+    return site_role_tree_cache.get()
@@ -1,8 +1,18 @@
 import collections
+import hashlib
+import json
+import threading
+import uuid
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db import transaction
+from django.core.serializers.json import DjangoJSONEncoder
 
 from nautobot.extras.constants import (
     EXTRAS_FEATURES
 )
+from nautobot.core.utils.data import deepmerge
 from nautobot.extras.registry import registry
 
 
@@ -23,4 +33,129 @@ def cdn_extras_features(*features):
                 raise ValueError(f"{feature} is not a valid extras feature!")
         return model_class
 
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+def merge_redirectmap_contexts(contexts_data, local_data=None):
+    """
+    Merge the given redirect map context data, in order, followed by the local context data (if any).
+
+    Like Nautobot's config contexts, dicts are merged recursively and any other value (including lists) of a later
+    context overrides the earlier one. The inputs are left untouched, but nested values are not copied.
+    """
+    data = OrderedDict()
+    for context_data in contexts_data:
+        data = deepmerge(data, context_data)
+
+    # If the object has local config context data defined, merge it last
+    if local_data:
+        data = deepmerge(data, local_data)
+
+    return data
+
+
+def hash_redirectmap_context(data):
+    """
+    Return a stable SHA-256 hex digest of rendered redirect map context data.
+    """
+    serialized = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+class GenerationCache:
+    """
+    An in-process cache of a value that is expensive to build, invalidated across all processes.
+
+    The value itself is kept in process memory; only a generation token is stored in Django's cache. Invalidating the
+    cache replaces the token, which makes every process rebuild its copy on next access.
+
+    Invalidations within a transaction only replace the token once it commits, so that no process rebuilds from (and
+    then keeps) the data the transaction is replacing. Until then, the invalidating thread builds a value from the
+    transaction's own data, and keeps it until the next invalidation, the commit, or a rollback discarding one of the
+    pending invalidations.
+    """
+
+    def __init__(self, key, builder):
+        self.key = key
+        self.builder = builder
+        self._value = None
+        self._generation = None
+        self._local = threading.local()
+
+    def get(self):
+        """Return the cached value, rebuilding it if it was invalidated since it was built."""
+        pending = self._count_pending_invalidations()
+        if pending:
+            if getattr(self._local, "value", None) is None or self._local.pending != pending:
+                self._local.value = self.builder()
+                self._local.pending = pending
+            return self._local.value
+        self._local.value = None
+
+        generation = cache.get(self.key)
+        if generation is None:
+            generation = uuid.uuid4().hex
+            cache.set(self.key, generation, None)
+        if self._value is None or generation != self._generation:
+            # Read the generation before building, so an invalidation during the build triggers another rebuild
+            self._value = self.builder()
+            self._generation = generation
+        return self._value
+
+    def invalidate(self):
+        """Discard the value in every process, once the current transaction (if any) commits."""
+        self._local.value = None
+        transaction.on_commit(self._invalidate)
+
+    def _invalidate(self):
+        cache.set(self.key, uuid.uuid4().hex, None)
+        self._value = None
+
+    def _count_pending_invalidations(self):
+        """
+        Return the number of invalidations of the current transaction waiting for it to commit.
+
+        Django discards the commit callbacks of rolled back transactions and savepoints, so the count drops if an
+        invalidation is rolled back.
+        """
+        connection = transaction.get_connection()
+        if not connection.in_atomic_block:
+            return 0
+        return sum(1 for callback in connection.run_on_commit if callback[1] == self._invalidate)
+
+
+def log_object_changes(instances, action):
+    """
+    Record the ObjectChanges Nautobot's change logging signal handlers would have recorded for the given instances.
+
+    Bulk operations (bulk_create, bulk_update, QuerySet.update...) bypass model signals, so callers that use them must
+    log the changes of the records they actually modified themselves. Nothing is recorded outside of a change logging
+    context, just like for regular saves.
+    """
+    from nautobot.extras.constants import CHANGELOG_MAX_CHANGE_CONTEXT_DETAIL  # pylint: disable=import-outside-toplevel
+    from nautobot.extras.models import ObjectChange  # pylint: disable=import-outside-toplevel
+    from nautobot.extras.signals import change_context_state  # pylint: disable=import-outside-toplevel
+
+    change_context = change_context_state.get()
+    if change_context is None:
+        return
+
+    user = change_context.get_user()
+    if user is not None and not user.is_authenticated:
+        user = None
+
+    object_changes = []
+    for instance in instances:
+        # Like the signal handlers, skip models that aren't change logged
+        if not hasattr(instance, "to_objectchange"):
+            continue
+        objectchange = instance.to_objectchange(action)
+        if objectchange is None:
+            continue
+        objectchange.user = user
+        objectchange.user_name = user.get_username() if user is not None else "Undefined"
+        objectchange.object_repr = objectchange.object_repr or str(instance)[:200]
+        objectchange.request_id = change_context.change_id
+        objectchange.change_context = change_context.context
+        objectchange.change_context_detail = (change_context.context_detail or "")[:CHANGELOG_MAX_CHANGE_CONTEXT_DETAIL]
+        object_changes.append(objectchange)
+    ObjectChange.objects.bulk_create(object_changes, batch_size=1000)
@@ -1,5 +1,4 @@
 from django_tables2 import RequestConfig
-from deepmerge import Merger
 from jsonschema.validators import Draft7Validator
 from django.urls import reverse
 
@@ -10,7 +9,6 @@ from django.views.generic import View
 
 from nautobot.extras.utils import get_worker_count
 from nautobot.core.views import generic, mixins as view_mixins
-from nautobot.core.models.querysets import count_related
 from nautobot.core.views.paginator import EnhancedPaginator, get_paginate_count
 from nautobot.core.tables import ButtonsColumn
 from nautobot.dcim.models import Device
@@ -26,7 +24,12 @@ from nautobot.extras.datasources import (
 )
 
 from . import filters, tables, forms
+from .associations import get_cdnsite_association_counts, get_cdnsite_associations
+from .capacity import annotate_cdnsite_capacity, annotate_site_role_capacity, annotate_site_role_cdnsite_count
 from .models import CdnSite, SiteRole, HyperCacheMemoryProfile, RedirectMapContext
+from .rendering import get_rendered_redirectmap_context
+from .topology import batch_topology_validation
+from .utils import merge_redirectmap_contexts
 
 
 ## HyperCache Memory Profiles
@@ -68,19 +71,21 @@ class HyperCacheMemoryProfileBulkDeleteView(generic.BulkDeleteView):
 
 ## CDN Site Roles ##
 class SiteRoleListView(generic.ObjectListView):
-    queryset = SiteRole.objects.annotate(cdnsite_count=count_related(CdnSite, "cdn_site_role"))
+    queryset = annotate_site_role_capacity(annotate_site_role_cdnsite_count(SiteRole.objects.all()))
     filterset = filters.SiteRoleFilterSet
     table = tables.SiteRoleTable
     use_new_ui = True
 
 
 class SiteRoleView(generic.ObjectView):
-    queryset = SiteRole.objects.all()
+    queryset = annotate_site_role_capacity(annotate_site_role_cdnsite_count(SiteRole.objects.all()))
 
     def get_extra_context(self, request, instance):
-        # CdnSite
-        cdnsites = CdnSite.objects.restrict(request.user, "view").filter(
-            cdn_site_role__in=instance.descendants(include_self=True)
+        # CdnSites of the whole subtree, along with everything CdnSiteTable renders
+        cdnsites = annotate_cdnsite_capacity(
+            CdnSite.objects.restrict(request.user, "view")
+            .filter(cdn_site_role__ancestor_closures__ancestor=instance)
+            .select_related("status", "cdn_site_role", "location", "neighbor1", "neighbor2", "cacheMemoryProfileId")
         )
 
         cdnsite_table = tables.CdnSiteTable(cdnsites)
@@ -112,13 +117,13 @@ class SiteRoleBulkImportView(generic.BulkImportView):
 
 
 class SiteRoleBulkDeleteView(generic.BulkDeleteView):
-    queryset = SiteRole.objects.annotate(cdnsite_count=count_related(CdnSite, "cdn_site_role"))
+    queryset = annotate_site_role_capacity(annotate_site_role_cdnsite_count(SiteRole.objects.all()))
     table = tables.SiteRoleTable
     filterset = filters.SiteRoleFilterSet
 
 ## CDN SITES ##
 class CdnSiteListView(generic.ObjectListView):
-    queryset = CdnSite.objects.select_related("cdn_site_role")
+    queryset = annotate_cdnsite_capacity(CdnSite.objects.select_related("cdn_site_role"))
     filterset = filters.CdnSiteFilterSet
     filterset_form = forms.CdnSiteFilterForm
     table = tables.CdnSiteTable
@@ -126,39 +131,17 @@ class CdnSiteListView(generic.ObjectListView):
 
 
 class CdnSiteView(generic.ObjectView):
-    queryset = CdnSite.objects.select_related("cdn_site_role")
+    queryset = CdnSite.objects.select_related(
+        "status", "cdn_site_role", "location", "neighbor1", "neighbor2", "cacheMemoryProfileId"
+    )
 
-    # def get_extra_context(self, request, instance):
-    #     stats = {
-    #         # TODO: Should we include child locations of the filtered locations in the location_count below?
-    #         "location_count": Location.objects.restrict(request.user, "view").filter(cdnsites=instance).count(),
-    #         "rack_count": Rack.objects.restrict(request.user, "view").filter(cdnsites=instance).count(),
-    #         "rackreservation_count": RackReservation.objects.restrict(request.user, "view")
-    #         .filter(cdnsites=instance)
-    #         .count(),
-    #         "device_count": Device.objects.restrict(request.user, "view").filter(cdnsites=instance).count(),
-    #         "prefix_count": Prefix.objects.restrict(request.user, "view").filter(cdnsites=instance).count(),
-    #         "ipaddress_count": IPAddress.objects.restrict(request.user, "view").filter(cdnsites=instance).count(),
-    #         "virtualmachine_count": VirtualMachine.objects.restrict(request.user, "view")
-    #         .filter(cdnsites=instance)
-    #         .count(),
-    #     }
-
-    #     return {
-    #         "stats": stats,
-    #     }
-    def get_extra_context(self, request, instance):
-        stats = {
-            "device_count": RelationshipAssociation.objects.all().filter(destination_id=instance.id).count()
-        }
-        return{
-            "stats": stats
-        }
-    
     def get_extra_context(self, request, instance):
-        relations = RelationshipAssociation.objects.all().filter(destination_id=instance.id)
+        # Devices and VMs associated with the site, along with their counts
+        associations = get_cdnsite_associations(
+            [instance.pk], queryset=RelationshipAssociation.objects.restrict(request.user, "view")
+        )
 
-        relation_table = RelationshipAssociationTable(relations)
+        relation_table = RelationshipAssociationTable(associations)
         relation_table.columns.hide("destination")
 
         paginate = {
@@ -168,7 +151,8 @@ class CdnSiteView(generic.ObjectView):
         RequestConfig(request, paginate).configure(relation_table)
 
         return {
-            "relation_table": relation_table
+            "relation_table": relation_table,
+            "stats": get_cdnsite_association_counts(associations),
         }
 
 
@@ -186,6 +170,11 @@ class CdnSiteBulkImportView(generic.BulkImportView):
     queryset = CdnSite.objects.all()
     table = tables.CdnSiteTable
 
+    def post(self, request, *args, **kwargs):
+        # Validate the topology of the imported sites against each other in a single snapshot
+        with batch_topology_validation():
+            return super().post(request, *args, **kwargs)
+
 
 class CdnSiteBulkEditView(generic.BulkEditView):
     queryset = CdnSite.objects.select_related("cdn_site_role")
@@ -193,6 +182,11 @@ class CdnSiteBulkEditView(generic.BulkEditView):
     table = tables.CdnSiteTable
     form = forms.CdnSiteBulkEditForm
 
+    def post(self, request, *args, **kwargs):
+        # Validate the topology of the edited sites against each other in a single snapshot
+        with batch_topology_validation():
+            return super().post(request, *args, **kwargs)
+
 
 class CdnSiteBulkDeleteView(generic.BulkDeleteView):
     queryset = CdnSite.objects.select_related("cdn_site_role")
@@ -251,27 +245,20 @@ class RedirectMapContextBulkDeleteView(generic.BulkDeleteView):
     table = tables.RedirectMapContextTable
 
 
-# define a merger with a custom list merge strategy
-list_merger = Merger(
-    # pass in a list of tuple, with the "strategy" as the first element and the "type" as the second element
-    [
-        (list, ["append"]),
-        (dict, ["merge"])
-    ],
-    ["override"],
-    ["override"]
-)
-
 class ObjectRedirectMapContextView(generic.ObjectView):
     base_template = None
     template_name = "nautobot_cdn_models/object_redirectmapcontext.html"
 
+    def get_rendered_context(self, request, instance, source_contexts):
+        """
+        Return the rendered context of the instance, by default the merged data of its source contexts.
+        """
+        return {"data": merge_redirectmap_contexts(context.data for context in source_contexts)}
+
     def get_extra_context(self, request, instance):
         source_contexts = RedirectMapContext.objects.restrict(request.user, "view").get_for_object(instance)
         # Merge the context data
-        merged_data = {}
-        for context in source_contexts:
-            merged_data = list_merger.merge(merged_data, context.data)
+        rendered_context = self.get_rendered_context(request, instance, source_contexts)
 
         # Determine user's preferred output format
         if request.GET.get("format") in ["json", "yaml"]:
@@ -284,7 +271,8 @@ class ObjectRedirectMapContextView(generic.ObjectView):
             format_ = "json"
 
         return {
-            "rendered_context": merged_data,  # return the merged data instead
+            "rendered_context": rendered_context["data"],  # return the merged data instead
+            "rendered_context_hash": rendered_context.get("data_hash"),
             "source_contexts": source_contexts,
             "format": format_,
             "base_template": self.base_template,
@@ -292,6 +280,13 @@ class ObjectRedirectMapContextView(generic.ObjectView):
         }
 
 class CdnSiteRedirectMapContextView(ObjectRedirectMapContextView):
-    queryset = CdnSite.objects.annotate_config_context_data()
-    base_template = "nautobot_akamai_models/cdnsite.html"
+    queryset = CdnSite.objects.all()
+    base_template = "nautobot_cdn_models/cdnsite.html"
+
+    def get_rendered_context(self, request, instance, source_contexts):
+        """
+        Serve the materialized rendered context (including the local context data) of the CdnSite.
+        """
+        rendered = get_rendered_redirectmap_context(instance)
+        return {"data": rendered.data, "data_hash": rendered.data_hash}
        
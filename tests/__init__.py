@@ -0,0 +1 @@
+"""Unit tests for nautobot_cdn_models."""
@@ -0,0 +1,531 @@
+"""Unit tests for the nautobot_cdn_models REST API."""
+import json
+from unittest import mock
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.db.models.signals import pre_delete
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from nautobot.core.testing import APITestCase
+from nautobot.dcim.models import Location, LocationType
+from nautobot.extras.models import ConfigContextSchema, GitRepository, RelationshipAssociation, Status, Tag
+from nautobot.virtualization.models import Cluster, ClusterType, VirtualMachine
+
+from nautobot_cdn_models.api.views import CdnSiteViewSet
+from nautobot_cdn_models.associations import CDNSITE_VMS_RELATIONSHIP, sync_cdnsite_associations
+from nautobot_cdn_models.models import CdnSite, RedirectMapContext, SiteRole
+from nautobot_cdn_models.rendering import render_redirectmap_context
+
+
+class RedirectMapContextListTest(APITestCase):
+    """Tests of the RedirectMapContext list endpoint."""
+
+    url = reverse("plugins-api:nautobot_cdn_models-api:redirectmapcontext-list")
+
+    @classmethod
+    def setUpTestData(cls):
+        status = Status.objects.create(name="CDN Test Status")
+        status.content_types.add(
+            ContentType.objects.get_for_model(Location), ContentType.objects.get_for_model(CdnSite)
+        )
+        location_type = LocationType.objects.create(name="CDN Test Location Type")
+        repository = GitRepository.objects.create(
+            name="CDN Test Repository",
+            slug="cdn_test_repository",
+            remote_url="http://localhost/cdn-test-repository.git",
+            branch="main",
+            provided_contents=["nautobot_cdn_models.redirectmapcontext"],
+        )
+
+        # Every context has its own assignments, and every other one is owned by the Git repository; the first one,
+        # alone on the first page, has every kind of assignment and owner prefetched by the list
+        for i in range(10):
+            location = Location.objects.create(
+                name=f"CDN Test Location {i}", location_type=location_type, status=status
+            )
+            cdn_site_role = SiteRole.objects.create(name=f"CDN Test Role {i}")
+            cdnsite = CdnSite.objects.create(
+                name=f"CDN Test Site {i}", status=status, cdn_site_role=cdn_site_role, location=location
+            )
+            tag = Tag.objects.create(name=f"CDN Test Tag {i}")
+            tag.content_types.add(ContentType.objects.get_for_model(CdnSite))
+            cdnsite.tags.add(tag)
+            context = RedirectMapContext.objects.create(
+                name=f"CDN Test Context {i}",
+                weight=100,
+                data={"index": i},
+                owner=repository if i % 2 == 0 else None,
+            )
+            context.locations.add(location)
+            context.cdn_site_roles.add(cdn_site_role)
+            context.cdnsites.add(cdnsite)
+            context.tags.add(tag)
+
+    def get_list(self, limit):
+        response = self.client.get(f"{self.url}?limit={limit}", **self.header)
+        self.assertHttpStatus(response, 200)
+        return response
+
+    def test_list_query_count_is_constant(self):
+        """The number of queries to list RedirectMapContexts doesn't depend on the number of contexts listed."""
+        self.add_permissions("nautobot_cdn_models.view_redirectmapcontext")
+        # Let one-off lookups (permissions, content types...) be cached before counting
+        self.get_list(1)
+
+        with CaptureQueriesContext(connection) as single_page:
+            response = self.get_list(1)
+        self.assertEqual(len(response.data["results"]), 1)
+        result = response.data["results"][0]
+        self.assertEqual(result["owner_content_type"], "extras.gitrepository")
+        self.assertEqual(len(result["locations"]), 1)
+        self.assertEqual(len(result["cdnsites"]), 1)
+        self.assertEqual(len(result["cdn_site_roles"]), 1)
+        self.assertEqual(len(result["tags"]), 1)
+
+        with self.assertNumQueries(len(single_page)):
+            response = self.get_list(10)
+        self.assertEqual(len(response.data["results"]), 10)
+        self.assertEqual(
+            {result["owner_content_type"] for result in response.data["results"]}, {"extras.gitrepository", None}
+        )
+
+    def test_list_without_permission(self):
+        """RedirectMapContexts aren't listed to users lacking the view permission."""
+        response = self.client.get(self.url, **self.header)
+        self.assertHttpStatus(response, 403)
+
+
+class CdnSiteAssociationsTest(APITestCase):
+    """Tests of the bulk association of devices and VMs with CdnSites."""
+
+    url = reverse("plugins-api:nautobot_cdn_models-api:cdnsite-associations")
+
+    @classmethod
+    def setUpTestData(cls):
+        status = Status.objects.create(name="CDN Test Status")
+        status.content_types.add(
+            ContentType.objects.get_for_model(CdnSite), ContentType.objects.get_for_model(VirtualMachine)
+        )
+        cluster = Cluster.objects.create(
+            name="CDN Test Cluster", cluster_type=ClusterType.objects.create(name="CDN Test Cluster Type")
+        )
+        cls.cdnsite = CdnSite.objects.create(name="CDN Test Site", status=status)
+        cls.vms = [
+            VirtualMachine.objects.create(name=f"CDN Test VM {i}", cluster=cluster, status=status) for i in range(3)
+        ]
+
+    def get_associated_vm_ids(self):
+        return set(
+            RelationshipAssociation.objects.filter(
+                relationship__key=CDNSITE_VMS_RELATIONSHIP, destination_id=self.cdnsite.pk
+            ).values_list("source_id", flat=True)
+        )
+
+    def test_sync_associations(self):
+        associations = [(CDNSITE_VMS_RELATIONSHIP, vm.pk, self.cdnsite.pk) for vm in self.vms[:2]]
+        self.assertEqual(sync_cdnsite_associations(associations), {"created": 2, "deleted": 0, "unchanged": 0})
+        self.assertEqual(sync_cdnsite_associations(associations), {"created": 0, "deleted": 0, "unchanged": 2})
+        self.assertEqual(self.get_associated_vm_ids(), {self.vms[0].pk, self.vms[1].pk})
+
+    def test_sync_associations_replace_sends_delete_signals(self):
+        sync_cdnsite_associations([(CDNSITE_VMS_RELATIONSHIP, vm.pk, self.cdnsite.pk) for vm in self.vms[:2]])
+
+        deleted = []
+
+        def receiver(sender, instance, **kwargs):
+            deleted.append(instance.source_id)
+
+        pre_delete.connect(receiver, sender=RelationshipAssociation)
+        self.addCleanup(pre_delete.disconnect, receiver, sender=RelationshipAssociation)
+        result = sync_cdnsite_associations([(CDNSITE_VMS_RELATIONSHIP, self.vms[2].pk, self.cdnsite.pk)], replace=True)
+        self.assertEqual(result, {"created": 1, "deleted": 2, "unchanged": 0})
+        self.assertEqual(set(deleted), {self.vms[0].pk, self.vms[1].pk})
+        self.assertEqual(self.get_associated_vm_ids(), {self.vms[2].pk})
+
+    def test_associate_via_api(self):
+        self.add_permissions(
+            "nautobot_cdn_models.add_cdnsite",
+            "nautobot_cdn_models.change_cdnsite",
+            "virtualization.view_virtualmachine",
+            "extras.add_relationshipassociation",
+        )
+        data = {"associations": [{"cdnsite": self.cdnsite.name, "virtual_machine": vm.name} for vm in self.vms]}
+        response = self.client.post(self.url, data, format="json", **self.header)
+        self.assertHttpStatus(response, 200)
+        self.assertEqual(response.data, {"created": 3, "deleted": 0, "unchanged": 0})
+        self.assertEqual(self.get_associated_vm_ids(), {vm.pk for vm in self.vms})
+
+    def test_associate_with_read_only_token(self):
+        self.add_permissions(
+            "nautobot_cdn_models.add_cdnsite",
+            "nautobot_cdn_models.change_cdnsite",
+            "virtualization.view_virtualmachine",
+            "extras.add_relationshipassociation",
+        )
+        self.token.write_enabled = False
+        self.token.save()
+        data = {"associations": [{"cdnsite": self.cdnsite.name, "virtual_machine": self.vms[0].name}]}
+        response = self.client.post(self.url, data, format="json", **self.header)
+        self.assertHttpStatus(response, 403)
+        self.assertEqual(self.get_associated_vm_ids(), set())
+
+
+class ConditionalGetTest(APITestCase):
+    """Tests of the ETags of CdnSites and RedirectMapContexts, which must change along with their nested objects."""
+
+    @classmethod
+    def setUpTestData(cls):
+        status = Status.objects.create(name="CDN Test Status")
+        status.content_types.add(
+            ContentType.objects.get_for_model(Location), ContentType.objects.get_for_model(CdnSite)
+        )
+        cls.location = Location.objects.create(
+            name="CDN Test Location",
+            location_type=LocationType.objects.create(name="CDN Test Location Type"),
+            status=status,
+        )
+        cls.cdnsite = CdnSite.objects.create(name="CDN Test Site", status=status, location=cls.location)
+        cls.tag = Tag.objects.create(name="CDN Test Tag")
+        cls.context = RedirectMapContext.objects.create(name="CDN Test Context", data={})
+        cls.context.tags.add(cls.tag)
+
+    def assertModified(self, url, etag, modified=True):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag, **self.header)
+        self.assertHttpStatus(response, 200 if modified else 304)
+        return response["ETag"]
+
+    def test_nested_location_change(self):
+        self.add_permissions("nautobot_cdn_models.view_cdnsite")
+        for url in (
+            reverse("plugins-api:nautobot_cdn_models-api:cdnsite-list"),
+            reverse("plugins-api:nautobot_cdn_models-api:cdnsite-detail", kwargs={"pk": self.cdnsite.pk}),
+        ):
+            etag = self.assertModified(url, "")
+            self.assertModified(url, etag, modified=False)
+
+            self.location.name = f"{self.location.name} (renamed)"
+            self.location.save()
+            self.assertModified(url, etag)
+
+    def test_assignment_change(self):
+        self.add_permissions("nautobot_cdn_models.view_redirectmapcontext")
+        url = reverse("plugins-api:nautobot_cdn_models-api:redirectmapcontext-detail", kwargs={"pk": self.context.pk})
+        etag = self.assertModified(url, "")
+        self.assertModified(url, etag, modified=False)
+
+        # Removing the assignment doesn't update the context itself, the change feed records it on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            self.context.tags.remove(self.tag)
+        etag = self.assertModified(url, etag)
+
+        # Deleting an assigned object cascade-removes its assignments
+        with self.captureOnCommitCallbacks(execute=True):
+            self.context.tags.add(self.tag)
+        etag = self.assertModified(url, etag)
+        self.tag.delete()
+        self.assertModified(url, etag)
+
+
+class RedirectMapContextTagsTest(APITestCase):
+    """Tests of the `tags` of RedirectMapContexts, which are read and written by name."""
+
+    url = reverse("plugins-api:nautobot_cdn_models-api:redirectmapcontext-list")
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tags = [Tag.objects.create(name=f"CDN Test Tag {i}") for i in range(2)]
+
+    def test_tags_by_name(self):
+        self.add_permissions(
+            "nautobot_cdn_models.add_redirectmapcontext", "nautobot_cdn_models.view_redirectmapcontext"
+        )
+        data = {"name": "CDN Test Context", "data": {"a": 1}, "tags": [tag.name for tag in self.tags]}
+        response = self.client.post(self.url, data, format="json", **self.header)
+        self.assertHttpStatus(response, 201)
+        self.assertEqual(sorted(response.data["tags"]), [tag.name for tag in self.tags])
+        self.assertEqual(set(RedirectMapContext.objects.get(name="CDN Test Context").tags.all()), set(self.tags))
+
+    def test_unknown_tag(self):
+        self.add_permissions("nautobot_cdn_models.add_redirectmapcontext")
+        data = {"name": "CDN Test Context", "data": {}, "tags": ["CDN Unknown Tag"]}
+        response = self.client.post(self.url, data, format="json", **self.header)
+        self.assertHttpStatus(response, 400)
+        self.assertIn("tags", response.data)
+
+
+class CdnSiteRepresentationTest(APITestCase):
+    """Tests of the CdnSite representation and of its sparse fieldsets."""
+
+    @classmethod
+    def setUpTestData(cls):
+        status = Status.objects.create(name="CDN Test Status")
+        status.content_types.add(ContentType.objects.get_for_model(CdnSite))
+        cls.schema = ConfigContextSchema.objects.create(name="CDN Test Schema", data_schema={"type": "object"})
+        cls.cdnsite = CdnSite.objects.create(
+            name="CDN Test Site",
+            status=status,
+            bandwidthLimitMbps=1000,
+            local_redirectmap_context_data={"a": 1},
+            local_redirectmap_context_schema=cls.schema,
+        )
+        cls.url = reverse("plugins-api:nautobot_cdn_models-api:cdnsite-detail", kwargs={"pk": cls.cdnsite.pk})
+
+    def test_local_context_schema(self):
+        self.add_permissions("nautobot_cdn_models.view_cdnsite")
+        response = self.client.get(self.url, **self.header)
+        self.assertHttpStatus(response, 200)
+        self.assertEqual(response.data["local_context_schema"]["id"], str(self.schema.pk))
+        self.assertEqual(response.data["local_context_schema"]["name"], self.schema.name)
+
+        self.cdnsite.local_redirectmap_context_schema = None
+        self.cdnsite.save()
+        response = self.client.get(self.url, **self.header)
+        self.assertIsNone(response.data["local_context_schema"])
+
+    def test_sparse_fieldset(self):
+        self.add_permissions("nautobot_cdn_models.view_cdnsite")
+        response = self.client.get(f"{self.url}?fields=id,name, local_context_schema", **self.header)
+        self.assertHttpStatus(response, 200)
+        self.assertEqual(set(response.data), {"id", "name", "local_context_schema"})
+
+        list_url = reverse("plugins-api:nautobot_cdn_models-api:cdnsite-list")
+        response = self.client.get(f"{list_url}?fields=name,bandwidthLimitMbps", **self.header)
+        self.assertHttpStatus(response, 200)
+        self.assertEqual(response.data["results"], [{"name": "CDN Test Site", "bandwidthLimitMbps": 1000}])
+
+    def test_sparse_fieldset_ignored_by_writes(self):
+        self.add_permissions("nautobot_cdn_models.view_cdnsite", "nautobot_cdn_models.change_cdnsite")
+        response = self.client.patch(
+            f"{self.url}?fields=name", {"bandwidthLimitMbps": 2000}, format="json", **self.header
+        )
+        self.assertHttpStatus(response, 200)
+        self.assertEqual(response.data["bandwidthLimitMbps"], 2000)
+        self.assertIn("local_context_schema", response.data)
+        self.cdnsite.refresh_from_db()
+        self.assertEqual(self.cdnsite.bandwidthLimitMbps, 2000)
+
+
+class CdnSiteRedirectMapContextTest(APITestCase):
+    """Tests of the rendered redirect map context included in CdnSites with `include=redirect_map_context`."""
+
+    list_url = reverse("plugins-api:nautobot_cdn_models-api:cdnsite-list")
+
+    @classmethod
+    def setUpTestData(cls):
+        status = Status.objects.create(name="CDN Test Status")
+        status.content_types.add(
+            ContentType.objects.get_for_model(Location), ContentType.objects.get_for_model(CdnSite)
+        )
+        location_type = LocationType.objects.create(name="CDN Test Location Type", nestable=True)
+        region = Location.objects.create(name="CDN Test Region", location_type=location_type, status=status)
+        city = Location.objects.create(name="CDN Test City", location_type=location_type, parent=region, status=status)
+        parent_role = SiteRole.objects.create(name="CDN Test Parent Role")
+        role = SiteRole.objects.create(name="CDN Test Role", parent=parent_role)
+        tag = Tag.objects.create(name="CDN Test Tag")
+
+        cls.cdnsite = CdnSite.objects.create(
+            name="CDN Test Site",
+            status=status,
+            location=city,
+            cdn_site_role=role,
+            local_redirectmap_context_data={"local": True},
+        )
+        cls.cdnsite.tags.add(tag)
+        CdnSite.objects.create(name="CDN Test Region Site", status=status, location=region, cdn_site_role=parent_role)
+        CdnSite.objects.create(name="CDN Test Bare Site", status=status)
+
+        RedirectMapContext.objects.create(name="CDN Test Global Context", data={"shared": "global"})
+        context = RedirectMapContext.objects.create(name="CDN Test Tag Context", data={"shared": "tag"}, weight=500)
+        context.tags.add(tag)
+        # Assigned to two ancestors of the same location, the annotation aggregates the context twice
+        context = RedirectMapContext.objects.create(
+            name="CDN Test Location Context", data={"regions": [1]}, weight=1500
+        )
+        context.locations.add(region, city)
+        context = RedirectMapContext.objects.create(name="CDN Test Role Context", data={"shared": "role"}, weight=2000)
+        context.cdn_site_roles.add(parent_role)
+        RedirectMapContext.objects.create(
+            name="CDN Test Inactive Context", data={"shared": "inactive"}, weight=3000, is_active=False
+        )
+
+    def get_expected_context(self, cdnsite):
+        """The context of the site rendered from `RedirectMapContext.objects.get_for_object()`."""
+        return CdnSite.objects.get(pk=cdnsite.pk).get_redirectmap_context()
+
+    def test_annotation_matches_get_for_object(self):
+        cdnsites = CdnSite.objects.annotate_config_context_data()
+        self.assertEqual(len(cdnsites), 3)
+        for cdnsite in cdnsites:
+            self.assertEqual(cdnsite.get_redirectmap_context(), self.get_expected_context(cdnsite), cdnsite.name)
+        self.assertEqual(
+            cdnsites.get(pk=self.cdnsite.pk).get_redirectmap_context(),
+            {"shared": "role", "regions": [1], "local": True},
+        )
+
+    def test_list(self):
+        self.add_permissions("nautobot_cdn_models.view_cdnsite")
+        response = self.client.get(f"{self.list_url}?include=redirect_map_context", **self.header)
+        self.assertHttpStatus(response, 200)
+        self.assertEqual(len(response.data["results"]), 3)
+        for result in response.data["results"]:
+            cdnsite = CdnSite.objects.get(pk=result["id"])
+            self.assertEqual(result["redirect_map_context"], self.get_expected_context(cdnsite), cdnsite.name)
+
+        response = self.client.get(self.list_url, **self.header)
+        self.assertNotIn("redirect_map_context", response.data["results"][0])
+
+    def test_detail(self):
+        self.add_permissions("nautobot_cdn_models.view_cdnsite")
+        url = reverse("plugins-api:nautobot_cdn_models-api:cdnsite-detail", kwargs={"pk": self.cdnsite.pk})
+        response = self.client.get(f"{url}?include=redirect_map_context", **self.header)
+        self.assertHttpStatus(response, 200)
+        self.assertEqual(response.data["redirect_map_context"], self.get_expected_context(self.cdnsite))
+
+
+class CdnSiteLookupTest(APITestCase):
+    """Tests of the lookup of the CdnSites that devices and VMs are associated with."""
+
+    url = reverse("plugins-api:nautobot_cdn_models-api:cdnsite-lookup")
+
+    @classmethod
+    def setUpTestData(cls):
+        status = Status.objects.create(name="CDN Test Status")
+        status.content_types.add(
+            ContentType.objects.get_for_model(CdnSite), ContentType.objects.get_for_model(VirtualMachine)
+        )
+        cluster = Cluster.objects.create(
+            name="CDN Test Cluster", cluster_type=ClusterType.objects.create(name="CDN Test Cluster Type")
+        )
+        cls.vms = [
+            VirtualMachine.objects.create(name=f"CDN Test VM {i}", cluster=cluster, status=status) for i in range(3)
+        ]
+        cls.cdnsite = CdnSite.objects.create(
+            name="CDN Test Site", status=status, local_redirectmap_context_data={"local": 1}
+        )
+        cls.other_cdnsite = CdnSite.objects.create(name="CDN Test Other Site", status=status)
+        RedirectMapContext.objects.create(name="CDN Test Context", data={"global": 1})
+        # The first VM is associated with both sites, the last one with none
+        sync_cdnsite_associations(
+            [
+                (CDNSITE_VMS_RELATIONSHIP, cls.vms[0].pk, cls.cdnsite.pk),
+                (CDNSITE_VMS_RELATIONSHIP, cls.vms[0].pk, cls.other_cdnsite.pk),
+                (CDNSITE_VMS_RELATIONSHIP, cls.vms[1].pk, cls.other_cdnsite.pk),
+            ]
+        )
+
+    def lookup(self, *vms):
+        response = self.client.get(f"{self.url}?virtual_machine_id={','.join(str(vm.pk) for vm in vms)}", **self.header)
+        self.assertHttpStatus(response, 200)
+        return response
+
+    def test_lookup(self):
+        self.add_permissions("nautobot_cdn_models.view_cdnsite", "extras.view_relationshipassociation")
+        response = self.lookup(*self.vms)
+        self.assertEqual(
+            sorted((result["object_id"], result["cdnsite"]["id"]) for result in response.data),
+            sorted(
+                [
+                    (str(self.vms[0].pk), str(self.cdnsite.pk)),
+                    (str(self.vms[0].pk), str(self.other_cdnsite.pk)),
+                    (str(self.vms[1].pk), str(self.other_cdnsite.pk)),
+                ]
+            ),
+        )
+        contexts = {
+            str(self.cdnsite.pk): {"global": 1, "local": 1},
+            str(self.other_cdnsite.pk): {"global": 1},
+        }
+        for result in response.data:
+            self.assertEqual(result["object_type"], "virtualization.virtualmachine")
+            self.assertEqual(result["data"], contexts[result["cdnsite"]["id"]])
+
+    def test_lookup_query_count_is_constant(self):
+        self.add_permissions("nautobot_cdn_models.view_cdnsite", "extras.view_relationshipassociation")
+        # Let one-off lookups (permissions, content types...) be cached before counting
+        self.lookup(self.vms[1])
+
+        with CaptureQueriesContext(connection) as single_vm:
+            response = self.lookup(self.vms[1])
+        self.assertEqual(len(response.data), 1)
+        with self.assertNumQueries(len(single_vm)):
+            response = self.lookup(*self.vms)
+        self.assertEqual(len(response.data), 3)
+
+    def test_lookup_without_associations_permission(self):
+        self.add_permissions("nautobot_cdn_models.view_cdnsite")
+        self.assertEqual(self.lookup(*self.vms).data, [])
+
+    def test_lookup_invalid_ids(self):
+        self.add_permissions("nautobot_cdn_models.view_cdnsite")
+        response = self.client.get(f"{self.url}?device_id=invalid", **self.header)
+        self.assertHttpStatus(response, 400)
+        self.assertIn("device_id", response.data)
+
+        response = self.client.get(self.url, **self.header)
+        self.assertHttpStatus(response, 400)
+
+
+class CdnSiteExportTest(APITestCase):
+    """Tests of the streaming export of CdnSites along with their rendered redirect map contexts."""
+
+    url = reverse("plugins-api:nautobot_cdn_models-api:cdnsite-export")
+
+    @classmethod
+    def setUpTestData(cls):
+        status = Status.objects.create(name="CDN Test Status")
+        status.content_types.add(ContentType.objects.get_for_model(CdnSite))
+        cls.cdnsites = [
+            CdnSite.objects.create(
+                name=f"CDN Test Site {i}", status=status, local_redirectmap_context_data={"index": i}
+            )
+            for i in range(5)
+        ]
+        context = RedirectMapContext.objects.create(name="CDN Test Context", data={"shared": 1})
+        context.cdnsites.add(*cls.cdnsites[:2])
+
+    def export(self, query=""):
+        response = self.client.get(f"{self.url}{query}", **self.header)
+        self.assertHttpStatus(response, 200)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def assertExported(self, items, cdnsites):
+        self.assertEqual(
+            {item["id"]: item["redirect_map_context"] for item in items},
+            {str(cdnsite.pk): render_redirectmap_context(cdnsite) for cdnsite in cdnsites},
+        )
+
+    def test_export_ndjson(self):
+        self.add_permissions("nautobot_cdn_models.view_cdnsite")
+        # Sites are serialized in several batches
+        with mock.patch.object(CdnSiteViewSet, "export_batch_size", 2):
+            response, content = self.export()
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertExported([json.loads(line) for line in content.splitlines()], self.cdnsites)
+
+    def test_export_json(self):
+        self.add_permissions("nautobot_cdn_models.view_cdnsite")
+        with mock.patch.object(CdnSiteViewSet, "export_batch_size", 2):
+            response, content = self.export("?output=json")
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertExported(json.loads(content), self.cdnsites)
+
+    def test_export_filtered(self):
+        self.add_permissions("nautobot_cdn_models.view_cdnsite")
+        _, content = self.export(f"?output=json&id={self.cdnsites[0].pk}&id={self.cdnsites[4].pk}")
+        self.assertExported(json.loads(content), [self.cdnsites[0], self.cdnsites[4]])
+
+        _, content = self.export("?output=json&id=00000000-0000-0000-0000-000000000000")
+        self.assertEqual(json.loads(content), [])
+
+    def test_export_invalid_output(self):
+        self.add_permissions("nautobot_cdn_models.view_cdnsite")
+        response = self.client.get(f"{self.url}?output=csv", **self.header)
+        self.assertHttpStatus(response, 400)
+        self.assertIn("output", response.data)
+
+    def test_export_without_permission(self):
+        response = self.client.get(self.url, **self.header)
+        self.assertHttpStatus(response, 403)
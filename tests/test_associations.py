@@ -0,0 +1,92 @@
+"""Unit tests for the devices and VMs associated with CdnSites."""
+from django.contrib.contenttypes.models import ContentType
+
+from nautobot.core.testing import TestCase
+from nautobot.dcim.models import Device, DeviceType, Location, LocationType, Manufacturer
+from nautobot.extras.models import Role, Status
+from nautobot.virtualization.models import Cluster, ClusterType, VirtualMachine
+
+from nautobot_cdn_models.associations import (
+    CDNSITE_DEVICES_RELATIONSHIP,
+    CDNSITE_VMS_RELATIONSHIP,
+    get_cdnsite_association_counts,
+    get_cdnsite_associations,
+    sync_cdnsite_associations,
+)
+from nautobot_cdn_models.models import CdnSite
+
+
+class CdnSiteAssociationsTest(TestCase):
+    """Tests of the loading of the devices and VMs associated with CdnSites, as on the CdnSite detail page."""
+
+    @classmethod
+    def setUpTestData(cls):
+        status = Status.objects.create(name="CDN Test Status")
+        status.content_types.add(
+            ContentType.objects.get_for_model(CdnSite),
+            ContentType.objects.get_for_model(Device),
+            ContentType.objects.get_for_model(Location),
+            ContentType.objects.get_for_model(VirtualMachine),
+        )
+        location_type = LocationType.objects.create(name="CDN Test Location Type")
+        location_type.content_types.add(ContentType.objects.get_for_model(Device))
+        location = Location.objects.create(name="CDN Test Location", location_type=location_type, status=status)
+        device_type = DeviceType.objects.create(
+            manufacturer=Manufacturer.objects.create(name="CDN Test Manufacturer"), model="CDN Test Model"
+        )
+        role = Role.objects.create(name="CDN Test Device Role")
+        role.content_types.add(ContentType.objects.get_for_model(Device))
+        cls.device = Device.objects.create(
+            name="CDN Test Device", device_type=device_type, role=role, status=status, location=location
+        )
+        cluster = Cluster.objects.create(
+            name="CDN Test Cluster", cluster_type=ClusterType.objects.create(name="CDN Test Cluster Type")
+        )
+        cls.vms = [
+            VirtualMachine.objects.create(name=f"CDN Test VM {i}", cluster=cluster, status=status) for i in range(3)
+        ]
+
+        cls.cdnsite = CdnSite.objects.create(name="CDN Test Site", status=status)
+        cls.other_cdnsite = CdnSite.objects.create(name="CDN Test Other Site", status=status)
+        sync_cdnsite_associations(
+            [
+                (CDNSITE_DEVICES_RELATIONSHIP, cls.device.pk, cls.cdnsite.pk),
+                (CDNSITE_VMS_RELATIONSHIP, cls.vms[0].pk, cls.cdnsite.pk),
+                (CDNSITE_VMS_RELATIONSHIP, cls.vms[1].pk, cls.cdnsite.pk),
+                (CDNSITE_VMS_RELATIONSHIP, cls.vms[2].pk, cls.other_cdnsite.pk),
+            ]
+        )
+
+    def test_get_cdnsite_associations(self):
+        associations = list(get_cdnsite_associations([self.cdnsite.pk]))
+        # The relationships and associated objects are loaded along with the associations
+        with self.assertNumQueries(0):
+            sources = {(association.relationship.key, association.source) for association in associations}
+        self.assertEqual(
+            sources,
+            {
+                (CDNSITE_DEVICES_RELATIONSHIP, self.device),
+                (CDNSITE_VMS_RELATIONSHIP, self.vms[0]),
+                (CDNSITE_VMS_RELATIONSHIP, self.vms[1]),
+            },
+        )
+
+        associations = get_cdnsite_associations([self.cdnsite.pk, self.other_cdnsite.pk])
+        self.assertEqual(associations.count(), 4)
+
+    def test_get_cdnsite_association_counts(self):
+        self.assertEqual(
+            get_cdnsite_association_counts(get_cdnsite_associations([self.cdnsite.pk])),
+            {"device_count": 1, "virtualmachine_count": 2},
+        )
+        self.assertEqual(
+            get_cdnsite_association_counts(get_cdnsite_associations([self.other_cdnsite.pk])),
+            {"device_count": 0, "virtualmachine_count": 1},
+        )
+
+    def test_cdnsite_detail_page(self):
+        self.add_permissions("nautobot_cdn_models.view_cdnsite", "extras.view_relationshipassociation")
+        response = self.client.get(self.cdnsite.get_absolute_url())
+        self.assertHttpStatus(response, 200)
+        self.assertEqual(response.context["stats"], {"device_count": 1, "virtualmachine_count": 2})
+        self.assertEqual(len(response.context["relation_table"].rows), 3)
@@ -0,0 +1,126 @@
+"""Unit tests for the capacity aggregates of CdnSites and SiteRole subtrees."""
+from django.contrib.contenttypes.models import ContentType
+from django.urls import reverse
+
+from nautobot.core.testing import APITestCase
+from nautobot.extras.models import Status
+
+from nautobot_cdn_models.capacity import (
+    annotate_cdnsite_capacity,
+    annotate_site_role_capacity,
+    annotate_site_role_cdnsite_count,
+)
+from nautobot_cdn_models.filters import CdnSiteFilterSet
+from nautobot_cdn_models.models import CdnSite, SiteRole
+
+
+class CapacityTest(APITestCase):
+    """Tests of the bandwidth and diskless aggregates of SiteRole subtrees and of the bandwidth available to sites."""
+
+    @classmethod
+    def setUpTestData(cls):
+        status = Status.objects.create(name="CDN Test Status")
+        status.content_types.add(ContentType.objects.get_for_model(CdnSite))
+        cls.root_role = SiteRole.objects.create(name="CDN Test Root Role")
+        cls.role = SiteRole.objects.create(name="CDN Test Role", parent=cls.root_role)
+        cls.leaf_role = SiteRole.objects.create(name="CDN Test Leaf Role", parent=cls.role)
+        cls.other_role = SiteRole.objects.create(name="CDN Test Other Role")
+
+        cls.leaf_cdnsite = CdnSite.objects.create(
+            name="CDN Test Leaf Site",
+            status=status,
+            cdn_site_role=cls.leaf_role,
+            bandwidthLimitMbps=1000,
+            enableDisklessMode=True,
+        )
+        cls.cdnsite = CdnSite.objects.create(
+            name="CDN Test Site", status=status, cdn_site_role=cls.role, bandwidthLimitMbps=2000
+        )
+        # The failover site is also the first neighbor, it is only counted once
+        cls.root_cdnsite = CdnSite.objects.create(
+            name="CDN Test Root Site",
+            status=status,
+            cdn_site_role=cls.root_role,
+            bandwidthLimitMbps=4000,
+            enableDisklessMode=True,
+            neighbor1=cls.leaf_cdnsite,
+            neighbor2=cls.cdnsite,
+            failover_site=cls.leaf_cdnsite,
+        )
+        cls.other_cdnsite = CdnSite.objects.create(
+            name="CDN Test Other Site", status=status, cdn_site_role=cls.other_role
+        )
+
+    def get_site_role_capacity(self):
+        return {
+            site_role.pk: (site_role.subtree_bandwidth_mbps, site_role.subtree_diskless_cdnsite_count)
+            for site_role in annotate_site_role_capacity(SiteRole.objects.filter(name__startswith="CDN Test"))
+        }
+
+    def test_annotate_site_role_capacity(self):
+        self.assertEqual(
+            self.get_site_role_capacity(),
+            {
+                self.root_role.pk: (7000, 2),
+                self.role.pk: (3000, 1),
+                self.leaf_role.pk: (1000, 1),
+                # A site without a bandwidth limit adds nothing
+                self.other_role.pk: (0, 0),
+            },
+        )
+
+    def test_site_role_capacity_follows_moves(self):
+        self.leaf_role.parent = self.other_role
+        self.leaf_role.save()
+        capacity = self.get_site_role_capacity()
+        self.assertEqual(capacity[self.root_role.pk], (6000, 1))
+        self.assertEqual(capacity[self.other_role.pk], (1000, 1))
+
+    def test_annotate_site_role_cdnsite_count(self):
+        """Each SiteRole counts the sites of its whole subtree, as listed by the `cdn_site_role` filter of CdnSites."""
+        site_roles = annotate_site_role_cdnsite_count(SiteRole.objects.filter(name__startswith="CDN Test"))
+        self.assertEqual(
+            {site_role.pk: site_role.cdnsite_count for site_role in site_roles},
+            {self.root_role.pk: 3, self.role.pk: 2, self.leaf_role.pk: 1, self.other_role.pk: 1},
+        )
+        for site_role in site_roles:
+            filterset = CdnSiteFilterSet({"cdn_site_role": [site_role.name]}, queryset=CdnSite.objects.all())
+            self.assertEqual(site_role.cdnsite_count, filterset.qs.count(), site_role.name)
+
+        self.leaf_role.parent = self.other_role
+        self.leaf_role.save()
+        site_roles = annotate_site_role_cdnsite_count(SiteRole.objects.filter(name__startswith="CDN Test"))
+        self.assertEqual(site_roles.get(pk=self.root_role.pk).cdnsite_count, 2)
+        self.assertEqual(site_roles.get(pk=self.other_role.pk).cdnsite_count, 2)
+
+    def test_annotate_cdnsite_capacity(self):
+        self.assertEqual(
+            dict(
+                annotate_cdnsite_capacity(CdnSite.objects.filter(name__startswith="CDN Test")).values_list(
+                    "pk", "available_bandwidth_mbps"
+                )
+            ),
+            {
+                self.root_cdnsite.pk: 7000,
+                self.cdnsite.pk: 2000,
+                self.leaf_cdnsite.pk: 1000,
+                self.other_cdnsite.pk: 0,
+            },
+        )
+
+    def test_capacity_endpoint(self):
+        self.add_permissions("nautobot_cdn_models.view_cdnsite")
+        url = reverse("plugins-api:nautobot_cdn_models-api:cdnsite-capacity")
+        response = self.client.get(f"{url}?id={self.root_cdnsite.pk}", **self.header)
+        self.assertHttpStatus(response, 200)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["available_bandwidth_mbps"], 7000)
+
+    def test_site_role_endpoint(self):
+        self.add_permissions("nautobot_cdn_models.view_siterole")
+        url = reverse("plugins-api:nautobot_cdn_models-api:siterole-detail", kwargs={"pk": self.root_role.pk})
+        response = self.client.get(url, **self.header)
+        self.assertHttpStatus(response, 200)
+        self.assertEqual(response.data["subtree_bandwidth_mbps"], 7000)
+        self.assertEqual(response.data["subtree_diskless_cdnsite_count"], 2)
+        self.assertEqual(response.data["cdnsite_count"], 3)
@@ -0,0 +1,101 @@
+"""Unit tests for the change feed."""
+from datetime import timedelta
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+
+from nautobot.core.testing import TestCase
+from nautobot.extras.models import Status
+
+from nautobot_cdn_models.changefeed import get_changes, prune_change_feed, record_changes
+from nautobot_cdn_models.choices import ChangeFeedActionChoices
+from nautobot_cdn_models.models import CdnSite, ChangeFeedEntry
+
+
+class ChangeFeedTest(TestCase):
+    """Tests of the recording, pruning and reading of the change feed."""
+
+    @classmethod
+    def setUpTestData(cls):
+        status = Status.objects.create(name="CDN Test Status")
+        status.content_types.add(ContentType.objects.get_for_model(CdnSite))
+        cls.cdnsite = CdnSite.objects.create(name="CDN Test Site", status=status)
+
+    def create_entries(self, count, age=timedelta(0)):
+        """Create `count` entries recorded `age` ago, returning their cursors."""
+        entries = [
+            ChangeFeedEntry.objects.create(
+                action=ChangeFeedActionChoices.ACTION_UPDATE,
+                object_type=ContentType.objects.get_for_model(CdnSite),
+                object_id=self.cdnsite.pk,
+                object_repr=str(self.cdnsite),
+            )
+            for _ in range(count)
+        ]
+        ChangeFeedEntry.objects.filter(pk__in=[entry.pk for entry in entries]).update(time=timezone.now() - age)
+        return [entry.pk for entry in entries]
+
+    def test_changes_are_recorded_on_commit(self):
+        ChangeFeedEntry.objects.all().delete()
+        with self.captureOnCommitCallbacks() as callbacks:
+            record_changes([self.cdnsite], ChangeFeedActionChoices.ACTION_UPDATE)
+            self.assertFalse(ChangeFeedEntry.objects.exists())
+        for callback in callbacks:
+            callback()
+        self.assertEqual(
+            list(ChangeFeedEntry.objects.values_list("action", "object_id")),
+            [(ChangeFeedActionChoices.ACTION_UPDATE, self.cdnsite.pk)],
+        )
+
+    def test_rolled_back_changes_are_not_recorded(self):
+        ChangeFeedEntry.objects.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    record_changes([self.cdnsite], ChangeFeedActionChoices.ACTION_UPDATE)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertFalse(ChangeFeedEntry.objects.exists())
+
+    def test_get_changes_waits_for_entries_to_settle(self):
+        ChangeFeedEntry.objects.all().delete()
+        settled = self.create_entries(2, age=timedelta(minutes=1))
+        self.create_entries(1)
+
+        entries, complete = get_changes(ChangeFeedEntry.objects.all(), 0, 10)
+        self.assertEqual([entry.pk for entry in entries], settled)
+        self.assertTrue(complete)
+
+        entries, _ = get_changes(ChangeFeedEntry.objects.all(), settled[0], 1)
+        self.assertEqual([entry.pk for entry in entries], settled[1:])
+
+    def test_get_changes_completeness_after_pruning(self):
+        ChangeFeedEntry.objects.all().delete()
+        pruned = self.create_entries(2, age=timedelta(days=30))
+        retained = self.create_entries(2, age=timedelta(minutes=1))
+        prune_change_feed(force=True)
+        self.assertEqual(list(ChangeFeedEntry.objects.values_list("pk", flat=True)), retained)
+
+        # The cursor's own entry was pruned, but not the ones after it
+        entries, complete = get_changes(ChangeFeedEntry.objects.all(), pruned[1], 10)
+        self.assertEqual([entry.pk for entry in entries], retained)
+        self.assertTrue(complete)
+        # The entry after the cursor was pruned
+        _, complete = get_changes(ChangeFeedEntry.objects.all(), pruned[0], 10)
+        self.assertFalse(complete)
+        # A filtered queryset doesn't hide what was pruned
+        _, complete = get_changes(ChangeFeedEntry.objects.filter(pk__gt=retained[0]), pruned[1], 10)
+        self.assertTrue(complete)
+
+    def test_prune_change_feed_keeps_latest_entry(self):
+        ChangeFeedEntry.objects.all().delete()
+        cursors = self.create_entries(3, age=timedelta(days=30))
+        prune_change_feed(force=True)
+        self.assertEqual(list(ChangeFeedEntry.objects.values_list("pk", flat=True)), cursors[-1:])
+
+        # A client that saw every entry before the feed went idle didn't miss anything
+        entries, complete = get_changes(ChangeFeedEntry.objects.all(), cursors[-1], 10)
+        self.assertEqual(entries, [])
+        self.assertTrue(complete)
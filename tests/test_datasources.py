@@ -0,0 +1,163 @@
+"""Unit tests for the import of redirect map contexts from Git repositories."""
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.db.models.signals import post_delete
+from django.test import override_settings
+from git import Actor, Repo
+
+from nautobot.core.testing import TestCase
+from nautobot.extras.models import GitRepository, JobResult
+
+from nautobot_cdn_models import datasources
+from nautobot_cdn_models.models import GitRedirectMapContextFile, GitRedirectMapContextSync, RedirectMapContext
+
+
+class GitRedirectMapContextSyncTest(TestCase):
+    """Tests of `update_git_redirectmap_config_contexts()` against a local Git repository."""
+
+    def setUp(self):
+        super().setUp()
+        git_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, git_root)
+        settings_override = override_settings(GIT_ROOT=git_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.repository = GitRepository.objects.create(
+            name="CDN Test Repository",
+            slug="cdn_test_repository",
+            remote_url="http://localhost/cdn-test-repository.git",
+            branch="main",
+            provided_contents=["nautobot_cdn_models.redirectmapcontext"],
+        )
+        self.repo = Repo.init(self.repository.filesystem_path)
+        self.job_result = JobResult.objects.create(name=self.repository.name)
+
+    def commit(self, files):
+        """
+        Commit the given changes under `redirectmap_contexts/`, a dict mapping paths to the content of a context file,
+        None to remove the file, and make the result the current head of the repository.
+        """
+        for path, content in files.items():
+            file_path = os.path.join(self.repository.filesystem_path, "redirectmap_contexts", path)
+            if content is None:
+                os.remove(file_path)
+                continue
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, "w") as fd:
+                fd.write(content if isinstance(content, str) else json.dumps(content))
+        self.repo.git.add(A=True)
+        actor = Actor("Nautobot", "nautobot@example.com")
+        commit = self.repo.index.commit(f"Update {', '.join(sorted(files))}", author=actor, committer=actor)
+        self.repository.current_head = commit.hexsha
+        return commit.hexsha
+
+    def sync(self):
+        """Sync the repository, returning the paths of the files that were parsed."""
+        with mock.patch.object(
+            datasources, "parse_redirectmap_context_files", wraps=datasources.parse_redirectmap_context_files
+        ) as parse:
+            datasources.update_git_redirectmap_config_contexts(self.repository, self.job_result)
+        return set(parse.call_args[0][1]) if parse.called else set()
+
+    @staticmethod
+    def context_file(name, **data):
+        return {"_metadata": {"name": name}, **data}
+
+    def get_contexts(self):
+        return {
+            context.name: context.data
+            for context in RedirectMapContext.objects.filter(owner_object_id=self.repository.pk)
+        }
+
+    def test_first_sync_loads_every_file(self):
+        head = self.commit({"a.json": self.context_file("a", value=1), "b.json": self.context_file("b", value=2)})
+
+        self.assertEqual(self.sync(), {"a.json", "b.json"})
+        self.assertEqual(self.get_contexts(), {"a": {"value": 1}, "b": {"value": 2}})
+        sync_state = GitRedirectMapContextSync.objects.get(repository=self.repository)
+        self.assertEqual(sync_state.commit_hash, head)
+        self.assertEqual(
+            dict(sync_state.files.values_list("path", "context_names")), {"a.json": ["a"], "b.json": ["b"]}
+        )
+
+    def test_incremental_sync_loads_changed_files_only(self):
+        self.commit(
+            {
+                "a.json": self.context_file("a", value=1),
+                "b.json": self.context_file("b", value=2),
+                "c.json": self.context_file("c", value=3),
+            }
+        )
+        self.sync()
+
+        self.commit({"a.json": self.context_file("a", value=10), "b.json": None, "d.json": self.context_file("d")})
+        self.assertEqual(self.sync(), {"a.json", "d.json"})
+        self.assertEqual(self.get_contexts(), {"a": {"value": 10}, "c": {"value": 3}, "d": {}})
+        self.assertEqual(
+            set(GitRedirectMapContextFile.objects.values_list("path", flat=True)), {"a.json", "c.json", "d.json"}
+        )
+
+    def test_incremental_sync_retries_failed_files(self):
+        self.commit({"a.json": "{", "b.json": self.context_file("b")})
+        self.assertEqual(self.sync(), {"a.json", "b.json"})
+        self.assertEqual(set(self.get_contexts()), {"b"})
+        self.assertFalse(GitRedirectMapContextFile.objects.filter(path="a.json").exists())
+
+        # a.json didn't change, but as it failed to import it is loaded again
+        self.commit({"c.json": self.context_file("c")})
+        self.assertEqual(self.sync(), {"a.json", "c.json"})
+        self.assertEqual(set(self.get_contexts()), {"b", "c"})
+
+    def test_removed_contexts_are_deleted_with_signals(self):
+        self.commit({"a.json": self.context_file("a"), "b.json": self.context_file("b")})
+        self.sync()
+
+        deleted = []
+
+        def receiver(sender, instance, **kwargs):
+            deleted.append(instance.name)
+
+        post_delete.connect(receiver, sender=RedirectMapContext)
+        self.addCleanup(post_delete.disconnect, receiver, sender=RedirectMapContext)
+        self.commit({"b.json": None})
+        self.sync()
+        self.assertEqual(deleted, ["b"])
+        self.assertEqual(set(self.get_contexts()), {"a"})
+
+    def test_get_changed_redirectmap_context_files(self):
+        first = self.commit({"a.json": self.context_file("a"), "b.json": self.context_file("b")})
+        second = self.commit({"b.json": None, "locations/c.json": self.context_file("c")})
+
+        self.assertEqual(
+            datasources.get_changed_redirectmap_context_files(self.repository, first, second),
+            {"b.json", "locations/c.json"},
+        )
+        self.assertEqual(datasources.get_changed_redirectmap_context_files(self.repository, second, second), set())
+        # Without a previous sync, or if its commit is unknown, a full sync is needed
+        self.assertIsNone(datasources.get_changed_redirectmap_context_files(self.repository, "", second))
+        self.assertIsNone(datasources.get_changed_redirectmap_context_files(self.repository, "0" * 40, second))
+
+    def test_get_blob_hash_matches_git(self):
+        self.commit({"a.json": self.context_file("a", value=1), "b.yaml": "---\n_metadata:\n  name: b\n"})
+
+        for path in ("a.json", "b.yaml"):
+            file_path = os.path.join(self.repository.filesystem_path, "redirectmap_contexts", path)
+            self.assertEqual(datasources.get_blob_hash(file_path), self.repo.git.hash_object(file_path))
+
+    def test_full_sync_skips_unchanged_files(self):
+        self.commit({"a.json": self.context_file("a", value=1), "b.json": self.context_file("b", value=2)})
+        self.sync()
+        last_updated = dict(RedirectMapContext.objects.values_list("name", "last_updated"))
+
+        # Forget the commit of the previous sync, as after a force-push, so that every file is considered again
+        GitRedirectMapContextSync.objects.filter(repository=self.repository).update(commit_hash="")
+        self.commit({"b.json": self.context_file("b", value=20)})
+        self.assertEqual(self.sync(), {"b.json"})
+        self.assertEqual(self.get_contexts(), {"a": {"value": 1}, "b": {"value": 20}})
+        self.assertEqual(RedirectMapContext.objects.get(name="a").last_updated, last_updated["a"])
+        self.assertNotEqual(RedirectMapContext.objects.get(name="b").last_updated, last_updated["b"])
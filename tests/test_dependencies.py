@@ -0,0 +1,163 @@
+"""Unit tests for the RedirectMapContext <-> CdnSite dependency index."""
+from django.contrib.contenttypes.models import ContentType
+
+from nautobot.core.testing import TestCase
+from nautobot.dcim.models import Location, LocationType
+from nautobot.extras.models import Status, Tag
+
+from nautobot_cdn_models.dependencies import (
+    get_applicable_cdnsite_ids,
+    get_applicable_cdnsite_ids_in_bulk,
+    get_dependent_cdnsite_ids,
+    rebuild_redirectmap_context_dependencies,
+)
+from nautobot_cdn_models.models import CdnSite, RedirectMapContext, RedirectMapContextDependency, SiteRole
+
+
+class RedirectMapContextDependencyTest(TestCase):
+    """Tests that the dependency index always matches `RedirectMapContext.objects.get_for_object()`."""
+
+    @classmethod
+    def setUpTestData(cls):
+        status = Status.objects.create(name="CDN Test Status")
+        status.content_types.add(
+            ContentType.objects.get_for_model(Location), ContentType.objects.get_for_model(CdnSite)
+        )
+        region_type = LocationType.objects.create(name="CDN Test Region")
+        city_type = LocationType.objects.create(name="CDN Test City", parent=region_type)
+        cls.region_a = Location.objects.create(name="CDN Test Region A", location_type=region_type, status=status)
+        cls.region_b = Location.objects.create(name="CDN Test Region B", location_type=region_type, status=status)
+        cls.city = Location.objects.create(
+            name="CDN Test City", location_type=city_type, parent=cls.region_a, status=status
+        )
+        cls.parent_role = SiteRole.objects.create(name="CDN Test Parent Role")
+        cls.role = SiteRole.objects.create(name="CDN Test Role", parent=cls.parent_role)
+        cls.other_role = SiteRole.objects.create(name="CDN Test Other Role")
+        cls.tag = Tag.objects.create(name="CDN Test Tag")
+
+        cls.cdnsite = CdnSite.objects.create(
+            name="CDN Test Site", status=status, location=cls.city, cdn_site_role=cls.role
+        )
+        cls.other_cdnsite = CdnSite.objects.create(
+            name="CDN Test Other Site", status=status, location=cls.region_b, cdn_site_role=cls.other_role
+        )
+
+        cls.location_context = RedirectMapContext.objects.create(name="CDN Test Location Context", data={})
+        cls.location_context.locations.add(cls.region_a)
+        cls.role_context = RedirectMapContext.objects.create(name="CDN Test Role Context", data={})
+        cls.role_context.cdn_site_roles.add(cls.parent_role)
+        cls.tag_context = RedirectMapContext.objects.create(name="CDN Test Tag Context", data={})
+        cls.tag_context.tags.add(cls.tag)
+        cls.site_context = RedirectMapContext.objects.create(name="CDN Test Site Context", data={})
+        cls.site_context.cdnsites.add(cls.other_cdnsite)
+        cls.global_context = RedirectMapContext.objects.create(name="CDN Test Global Context", data={})
+        cls.inactive_context = RedirectMapContext.objects.create(
+            name="CDN Test Inactive Context", data={}, is_active=False
+        )
+
+    def get_indexed_context_ids(self, cdnsite):
+        return set(
+            RedirectMapContextDependency.objects.filter(cdnsite=cdnsite).values_list(
+                "redirect_map_context_id", flat=True
+            )
+        )
+
+    def assertIndexMatches(self):
+        """The index, and both ways of computing it, agree with `get_for_object()` for every site and context."""
+        for cdnsite in CdnSite.objects.all():
+            self.assertEqual(
+                self.get_indexed_context_ids(cdnsite),
+                set(RedirectMapContext.objects.get_for_object(cdnsite).values_list("pk", flat=True)),
+                cdnsite.name,
+            )
+        contexts = RedirectMapContext.objects.all()
+        applicable = get_applicable_cdnsite_ids_in_bulk(contexts.values_list("pk", flat=True))
+        for context in contexts:
+            self.assertEqual(applicable[context.pk], get_applicable_cdnsite_ids(context), context.name)
+            self.assertEqual(applicable[context.pk], get_dependent_cdnsite_ids(context), context.name)
+
+    def test_index(self):
+        self.assertEqual(
+            self.get_indexed_context_ids(self.cdnsite),
+            {self.location_context.pk, self.role_context.pk, self.global_context.pk},
+        )
+        self.assertEqual(
+            self.get_indexed_context_ids(self.other_cdnsite), {self.site_context.pk, self.global_context.pk}
+        )
+        self.assertIndexMatches()
+
+    def test_context_assignment_change(self):
+        self.location_context.locations.add(self.region_b)
+        self.assertIn(self.location_context.pk, self.get_indexed_context_ids(self.other_cdnsite))
+
+        # A context losing its only assignment of a kind applies to every site again
+        self.role_context.cdn_site_roles.remove(self.parent_role)
+        self.assertIn(self.role_context.pk, self.get_indexed_context_ids(self.other_cdnsite))
+        self.assertIndexMatches()
+
+        self.site_context.cdnsites.clear()
+        self.assertIndexMatches()
+
+    def test_context_activation(self):
+        self.inactive_context.is_active = True
+        self.inactive_context.save()
+        self.assertEqual(get_dependent_cdnsite_ids(self.inactive_context), {self.cdnsite.pk, self.other_cdnsite.pk})
+
+        self.global_context.is_active = False
+        self.global_context.save()
+        self.assertEqual(get_dependent_cdnsite_ids(self.global_context), set())
+        self.assertIndexMatches()
+
+    def test_cdnsite_change(self):
+        self.cdnsite.tags.add(self.tag)
+        self.assertIn(self.tag_context.pk, self.get_indexed_context_ids(self.cdnsite))
+
+        self.other_cdnsite.location = self.city
+        self.other_cdnsite.cdn_site_role = self.parent_role
+        self.other_cdnsite.save()
+        self.assertIn(self.location_context.pk, self.get_indexed_context_ids(self.other_cdnsite))
+        self.assertIn(self.role_context.pk, self.get_indexed_context_ids(self.other_cdnsite))
+        self.assertIndexMatches()
+
+    def test_location_move(self):
+        """Moving a Location re-indexes the sites of its subtree."""
+        self.city.parent = self.region_b
+        self.city.save()
+        self.assertNotIn(self.location_context.pk, self.get_indexed_context_ids(self.cdnsite))
+        self.assertIndexMatches()
+
+        self.city.parent = self.region_a
+        self.city.save()
+        self.assertIn(self.location_context.pk, self.get_indexed_context_ids(self.cdnsite))
+        self.assertIndexMatches()
+
+    def test_siterole_move(self):
+        """Moving a SiteRole re-indexes the sites of its subtree."""
+        self.role.parent = None
+        self.role.save()
+        self.assertNotIn(self.role_context.pk, self.get_indexed_context_ids(self.cdnsite))
+        self.assertIndexMatches()
+
+        self.other_role.parent = self.parent_role
+        self.other_role.save()
+        self.assertIn(self.role_context.pk, self.get_indexed_context_ids(self.other_cdnsite))
+        self.assertIndexMatches()
+
+    def test_assigned_object_delete(self):
+        """Deleting the only object a context is assigned to makes it apply to every site."""
+        self.tag.delete()
+        self.assertEqual(get_dependent_cdnsite_ids(self.tag_context), {self.cdnsite.pk, self.other_cdnsite.pk})
+
+        self.other_role.delete()
+        self.assertIndexMatches()
+
+    def test_rebuild(self):
+        self.location_context.locations.add(self.region_b)
+        self.cdnsite.tags.add(self.tag)
+        index = set(RedirectMapContextDependency.objects.values_list("redirect_map_context_id", "cdnsite_id"))
+
+        rebuild_redirectmap_context_dependencies()
+        self.assertEqual(
+            set(RedirectMapContextDependency.objects.values_list("redirect_map_context_id", "cdnsite_id")), index
+        )
+        self.assertIndexMatches()
@@ -0,0 +1,192 @@
+"""Unit tests for the materialized rendering of CdnSite redirect map contexts."""
+from unittest import mock
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from nautobot.core.testing import TestCase
+from nautobot.dcim.models import Location, LocationType
+from nautobot.extras.models import Status, Tag
+
+from nautobot_cdn_models import rendering
+from nautobot_cdn_models.changefeed import get_latest_render_change
+from nautobot_cdn_models.models import CdnSite, RedirectMapContext, RenderedRedirectMapContext, SiteRole
+from nautobot_cdn_models.utils import hash_redirectmap_context
+
+
+class RenderedRedirectMapContextTest(TestCase):
+    """Tests of the storage and invalidation of rendered redirect map contexts."""
+
+    @classmethod
+    def setUpTestData(cls):
+        status = Status.objects.create(name="CDN Test Status")
+        status.content_types.add(ContentType.objects.get_for_model(CdnSite))
+        cls.cdnsite = CdnSite.objects.create(
+            name="CDN Test Site", status=status, local_redirectmap_context_data={"local": {"a": 1}}
+        )
+        cls.context = RedirectMapContext.objects.create(name="CDN Test Context", data={"global": 1})
+        cls.context.cdnsites.add(cls.cdnsite)
+
+    def render(self):
+        """Render the context of the site, returning the record to store and the render cursor read beforehand."""
+        render_cursor = get_latest_render_change()[0]
+        data = rendering.render_redirectmap_context(self.cdnsite)
+        record = RenderedRedirectMapContext(cdnsite=self.cdnsite, data=data, data_hash=hash_redirectmap_context(data))
+        return record, render_cursor
+
+    def invalidate(self):
+        """Invalidate the rendered context of the site, as once the transaction changing its inputs is committed."""
+        with self.captureOnCommitCallbacks(execute=True):
+            rendering.invalidate_rendered_redirectmap_contexts([self.cdnsite.pk])
+
+    def is_stored(self):
+        return RenderedRedirectMapContext.objects.filter(cdnsite=self.cdnsite).exists()
+
+    def test_get_rendered_redirectmap_context(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            rendered = rendering.get_rendered_redirectmap_context(self.cdnsite)
+        self.assertEqual(rendered.data, {"global": 1, "local": {"a": 1}})
+        self.assertEqual(RenderedRedirectMapContext.objects.get(cdnsite=self.cdnsite).data_hash, rendered.data_hash)
+
+    def test_store_then_invalidate(self):
+        record, render_cursor = self.render()
+        with self.captureOnCommitCallbacks(execute=True):
+            rendering._store_rendered_redirectmap_contexts([record], render_cursor)  # pylint: disable=protected-access
+        self.assertTrue(self.is_stored())
+
+        self.invalidate()
+        self.assertFalse(self.is_stored())
+
+    def test_read_then_invalidate_then_store(self):
+        record, render_cursor = self.render()
+        self.invalidate()
+        with self.captureOnCommitCallbacks(execute=True):
+            rendering._store_rendered_redirectmap_contexts([record], render_cursor)  # pylint: disable=protected-access
+        self.assertFalse(self.is_stored())
+
+    def test_invalidate_while_storing(self):
+        record, render_cursor = self.render()
+        # The render change is recorded between the check preceding the insert and the one following it
+        with mock.patch.object(
+            rendering, "get_latest_render_change", side_effect=[(render_cursor, None), (object(), None)]
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                rendering._store_rendered_redirectmap_contexts(  # pylint: disable=protected-access
+                    [record], render_cursor
+                )
+        self.assertFalse(self.is_stored())
+
+    def test_store_within_transaction_waits_for_commit(self):
+        record, render_cursor = self.render()
+        with self.captureOnCommitCallbacks() as callbacks:
+            rendering._store_rendered_redirectmap_contexts([record], render_cursor)  # pylint: disable=protected-access
+        # Nothing is stored while the reader's transaction is open...
+        self.assertFalse(self.is_stored())
+
+        # ...so an invalidation committed meanwhile can't miss the record, which is discarded on commit
+        self.invalidate()
+        for callback in callbacks:
+            callback()
+        self.assertFalse(self.is_stored())
+
+    def test_in_place_change_of_local_context_data_invalidates(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            rendering.get_rendered_redirectmap_context(self.cdnsite)
+        self.assertTrue(self.is_stored())
+
+        cdnsite = CdnSite.objects.get(pk=self.cdnsite.pk)
+        cdnsite.local_redirectmap_context_data["local"]["a"] = 2
+        with self.captureOnCommitCallbacks(execute=True):
+            cdnsite.save()
+        self.assertFalse(self.is_stored())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(
+                rendering.get_rendered_redirectmap_context(cdnsite).data, {"global": 1, "local": {"a": 2}}
+            )
+
+
+class RenderRedirectMapContextsTest(TestCase):
+    """Tests that rendering in bulk gives the same result as rendering each site on its own."""
+
+    @classmethod
+    def setUpTestData(cls):
+        status = Status.objects.create(name="CDN Test Status")
+        status.content_types.add(
+            ContentType.objects.get_for_model(Location), ContentType.objects.get_for_model(CdnSite)
+        )
+        location_type = LocationType.objects.create(name="CDN Test Location Type", nestable=True)
+        region = Location.objects.create(name="CDN Test Region", location_type=location_type, status=status)
+        city = Location.objects.create(name="CDN Test City", location_type=location_type, parent=region, status=status)
+        parent_role = SiteRole.objects.create(name="CDN Test Parent Role")
+        role = SiteRole.objects.create(name="CDN Test Role", parent=parent_role)
+        tag = Tag.objects.create(name="CDN Test Tag")
+
+        cls.cdnsite = CdnSite.objects.create(
+            name="CDN Test Site",
+            status=status,
+            location=city,
+            cdn_site_role=role,
+            local_redirectmap_context_data={"local": True},
+        )
+        cls.cdnsite.tags.add(tag)
+        CdnSite.objects.create(name="CDN Test Region Site", status=status, location=region, cdn_site_role=parent_role)
+        bare_cdnsite = CdnSite.objects.create(name="CDN Test Bare Site", status=status)
+
+        def create_context(name, data, weight=1000, is_active=True, **assignments):
+            context = RedirectMapContext.objects.create(name=name, data=data, weight=weight, is_active=is_active)
+            for field_name, objects in assignments.items():
+                getattr(context, field_name).add(*objects)
+
+        create_context("CDN Test Global Context", {"shared": "global", "global": 1})
+        create_context("CDN Test Tag Context", {"shared": "tag", "tag": True}, weight=500, tags=[tag])
+        # Assigned to two ancestors of the same location, the context must still be merged once
+        create_context("CDN Test Multi Context", {"multi": [1]}, weight=1500, locations=[region, city])
+        # Same weight, merged by name: the city context first
+        create_context("CDN Test City Context", {"region": {"b": 2}}, weight=2000, locations=[city])
+        create_context(
+            "CDN Test Region Context", {"shared": "region", "region": {"a": 1}}, weight=2000, locations=[region]
+        )
+        create_context("CDN Test Role Context", {"shared": "role"}, weight=3000, cdn_site_roles=[parent_role])
+        create_context("CDN Test Site Context", {"site": 1}, cdnsites=[bare_cdnsite])
+        create_context("CDN Test Inactive Context", {"shared": "inactive"}, weight=5000, is_active=False)
+
+    def test_render_redirectmap_contexts(self):
+        cdnsites = CdnSite.objects.all()
+        rendered = rendering.render_redirectmap_contexts(cdnsites)
+        self.assertEqual(rendered, {cdnsite.pk: rendering.render_redirectmap_context(cdnsite) for cdnsite in cdnsites})
+        self.assertEqual(
+            rendered[self.cdnsite.pk],
+            {
+                "shared": "role",
+                "global": 1,
+                "tag": True,
+                "multi": [1],
+                "region": {"a": 1, "b": 2},
+                "local": True,
+            },
+        )
+
+    def test_render_subset(self):
+        cdnsites = CdnSite.objects.filter(pk=self.cdnsite.pk)
+        self.assertEqual(
+            cdnsites.render_redirectmap_contexts(),
+            {self.cdnsite.pk: rendering.render_redirectmap_context(self.cdnsite)},
+        )
+        self.assertEqual(CdnSite.objects.none().render_redirectmap_contexts(), {})
+
+    def test_query_count_is_constant(self):
+        with CaptureQueriesContext(connection) as single_site:
+            rendering.render_redirectmap_contexts(CdnSite.objects.filter(pk=self.cdnsite.pk))
+        with self.assertNumQueries(len(single_site)):
+            rendering.render_redirectmap_contexts(CdnSite.objects.all())
+
+    def test_get_rendered_redirectmap_contexts(self):
+        cdnsites = CdnSite.objects.all()
+        with self.captureOnCommitCallbacks(execute=True):
+            rendered = rendering.get_rendered_redirectmap_contexts(cdnsites)
+        self.assertEqual(
+            {cdnsite_id: record.data for cdnsite_id, record in rendered.items()},
+            rendering.render_redirectmap_contexts(cdnsites),
+        )
+        self.assertEqual(RenderedRedirectMapContext.objects.count(), cdnsites.count())
@@ -0,0 +1,123 @@
+"""Unit tests for the CdnSite neighbor and failover topology."""
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase
+
+from nautobot.core.testing import TestCase
+from nautobot.extras.models import Status
+
+from nautobot_cdn_models.models import CdnSite
+from nautobot_cdn_models.topology import CdnSiteTopology, batch_topology_validation, validate_cdnsite_topology
+
+
+class CdnSiteTopologyTest(SimpleTestCase):
+    """Tests of CdnSiteTopology, built from `(pk, name, neighbor1, preference, neighbor2, preference, failover)`."""
+
+    def setUp(self):
+        super().setUp()
+        self.topology = CdnSiteTopology(
+            [
+                ("a", "Site A", "b", 1000, "c", 750, "b"),
+                ("b", "Site B", "a", None, "c", 500, "c"),
+                ("c", "Site C", "a", 100, "b", 100, None),
+                ("d", "Site D", None, None, None, None, "e"),
+                ("e", "Site E", None, None, None, None, "f"),
+                ("f", "Site F", None, None, None, None, "d"),
+                ("g", "Site G", "a", None, None, None, None),
+            ]
+        )
+
+    def test_get_neighbors(self):
+        # Lower preferences first, neighbor1 winning ties and unset preferences last
+        self.assertEqual(self.topology.get_neighbors("a"), ["c", "b"])
+        self.assertEqual(self.topology.get_neighbors("b"), ["c", "a"])
+        self.assertEqual(self.topology.get_neighbors("c"), ["a", "b"])
+        self.assertEqual(self.topology.get_neighbors("d"), [])
+        self.assertEqual(self.topology.get_neighbors("unknown"), [])
+
+    def test_get_failover_chain(self):
+        self.assertEqual(self.topology.get_failover_chain("a"), ["b", "c"])
+        self.assertEqual(self.topology.get_failover_chain("c"), [])
+        # A chain stops before looping
+        self.assertEqual(self.topology.get_failover_chain("d"), ["e", "f"])
+
+    def test_find_failover_cycles(self):
+        self.assertEqual(self.topology.find_failover_cycles(), [["d", "e", "f"]])
+        self.assertTrue(self.topology.is_in_failover_cycle("e"))
+        self.assertFalse(self.topology.is_in_failover_cycle("a"))
+
+    def test_get_failover_loop(self):
+        self.assertEqual(self.topology.get_failover_loop("c", "a"), ["c", "a", "b", "c"])
+        self.assertEqual(self.topology.get_failover_loop("c", "c"), ["c", "c"])
+        self.assertIsNone(self.topology.get_failover_loop("c", "g"))
+        self.assertIsNone(self.topology.get_failover_loop("c", None))
+        # Failing over into an existing cycle that doesn't include the site doesn't loop back to it
+        self.assertIsNone(self.topology.get_failover_loop("a", "d"))
+
+    def test_set_site_replaces_edges(self):
+        self.topology.set_site("c", "Site C", None, None, None, None, "a")
+        self.assertEqual(self.topology.get_neighbors("c"), [])
+        self.assertEqual(sorted(self.topology.find_failover_cycles()), [["a", "b", "c"], ["d", "e", "f"]])
+        self.assertNotIn("c", self.topology.referrers["b"])
+
+    def test_get_unreachable_sites(self):
+        self.assertEqual(self.topology.get_unreachable_sites(), {"g"})
+        self.assertEqual(self.topology.get_unreachable_sites(root_ids=["a"]), {"d", "e", "f", "g"})
+        self.assertEqual(self.topology.get_unreachable_sites(root_ids=["g", "d"]), set())
+
+
+class ValidateCdnSiteTopologyTest(TestCase):
+    """Tests of the neighbor and failover validation of CdnSites."""
+
+    @classmethod
+    def setUpTestData(cls):
+        status = Status.objects.create(name="CDN Test Status")
+        status.content_types.add(ContentType.objects.get_for_model(CdnSite))
+        cls.site_a = CdnSite.objects.create(name="Site A", status=status)
+        cls.site_b = CdnSite.objects.create(name="Site B", status=status, failover_site=cls.site_a)
+        cls.site_c = CdnSite.objects.create(name="Site C", status=status, failover_site=cls.site_b)
+
+    def test_clean_rejects_self_references(self):
+        self.site_a.neighbor1 = self.site_a
+        self.site_a.failover_site = self.site_a
+        with self.assertRaises(ValidationError) as context:
+            self.site_a.clean()
+        self.assertEqual(set(context.exception.message_dict), {"neighbor1", "failover_site"})
+
+    def test_clean_rejects_failover_loop(self):
+        self.site_a.failover_site = self.site_c
+        with self.assertRaises(ValidationError) as context:
+            self.site_a.clean()
+        self.assertEqual(
+            context.exception.message_dict["failover_site"],
+            ["This would create a failover loop: Site A -> Site C -> Site B -> Site A"],
+        )
+
+    def test_clean_accepts_failover_chain(self):
+        # Site A has no failover site, so failing over to it doesn't loop
+        self.site_c.failover_site = self.site_a
+        self.site_c.clean()
+
+        # Saved changes are taken into account: site A -> site C -> site B no longer loops back to site A
+        self.site_b.failover_site = None
+        self.site_b.save()
+        self.site_a.failover_site = self.site_c
+        self.site_a.clean()
+
+    def test_batch_validation(self):
+        with batch_topology_validation():
+            with self.assertNumQueries(0):
+                self.site_a.failover_site = self.site_c
+                self.site_b.failover_site = None
+                validate_cdnsite_topology(self.site_b)
+                # Site B no longer fails over to site A within the batch, so this doesn't loop
+                validate_cdnsite_topology(self.site_a)
+
+                # Site A now fails over to site C within the batch, even though it wasn't saved
+                self.site_b.failover_site = self.site_a
+                with self.assertRaises(ValidationError):
+                    validate_cdnsite_topology(self.site_b)
+
+        # Outside of the batch, the unsaved changes are forgotten
+        with self.assertRaises(ValidationError):
+            validate_cdnsite_topology(self.site_a)
@@ -0,0 +1,115 @@
+"""Unit tests for the closure tables of the Location and SiteRole trees."""
+from django.contrib.contenttypes.models import ContentType
+
+from nautobot.core.testing import TestCase
+from nautobot.dcim.models import Location, LocationType
+from nautobot.extras.models import Status
+
+from nautobot_cdn_models.models import LocationClosure, SiteRole, SiteRoleClosure
+from nautobot_cdn_models.trees import get_site_role_tree, rebuild_tree_closure, update_tree_closure
+
+
+class TreeClosureTest(TestCase):
+    """Tests that the closure tables are maintained as nodes are created and moved."""
+
+    @classmethod
+    def setUpTestData(cls):
+        status = Status.objects.create(name="CDN Test Status")
+        status.content_types.add(ContentType.objects.get_for_model(Location))
+        location_type = LocationType.objects.create(name="CDN Test Location Type", nestable=True)
+        cls.region_a = Location.objects.create(name="CDN Test Region A", location_type=location_type, status=status)
+        cls.region_b = Location.objects.create(name="CDN Test Region B", location_type=location_type, status=status)
+        cls.city = Location.objects.create(
+            name="CDN Test City", location_type=location_type, parent=cls.region_a, status=status
+        )
+        cls.district = Location.objects.create(
+            name="CDN Test District", location_type=location_type, parent=cls.city, status=status
+        )
+
+        cls.root_role = SiteRole.objects.create(name="CDN Test Root Role")
+        cls.other_root_role = SiteRole.objects.create(name="CDN Test Other Root Role")
+        cls.role = SiteRole.objects.create(name="CDN Test Role", parent=cls.root_role)
+        cls.child_role = SiteRole.objects.create(name="CDN Test Child Role", parent=cls.role)
+
+    def get_closure(self, closure_model, nodes):
+        node_ids = [node.pk for node in nodes]
+        return set(
+            closure_model.objects.filter(descendant_id__in=node_ids).values_list(
+                "ancestor_id", "descendant_id", "depth"
+            )
+        )
+
+    def assertClosureRebuildsTheSame(self, closure_model, tree_model):
+        closure = set(closure_model.objects.values_list("ancestor_id", "descendant_id", "depth"))
+        rebuild_tree_closure(closure_model, tree_model)
+        self.assertEqual(set(closure_model.objects.values_list("ancestor_id", "descendant_id", "depth")), closure)
+
+    def test_location_closure(self):
+        region_a, city, district = self.region_a.pk, self.city.pk, self.district.pk
+        self.assertEqual(
+            self.get_closure(LocationClosure, [self.city, self.district]),
+            {
+                (city, city, 0),
+                (region_a, city, 1),
+                (district, district, 0),
+                (city, district, 1),
+                (region_a, district, 2),
+            },
+        )
+        self.assertClosureRebuildsTheSame(LocationClosure, Location)
+
+    def test_location_move(self):
+        """Moving a Location moves its whole subtree under the new parent."""
+        self.city.parent = self.region_b
+        self.city.save()
+        region_b, city, district = self.region_b.pk, self.city.pk, self.district.pk
+        self.assertEqual(
+            self.get_closure(LocationClosure, [self.city, self.district]),
+            {
+                (city, city, 0),
+                (region_b, city, 1),
+                (district, district, 0),
+                (city, district, 1),
+                (region_b, district, 2),
+            },
+        )
+        self.assertClosureRebuildsTheSame(LocationClosure, Location)
+
+        # Moving to the root
+        self.city.parent = None
+        self.city.save()
+        self.assertEqual(
+            self.get_closure(LocationClosure, [self.city, self.district]),
+            {(city, city, 0), (district, district, 0), (city, district, 1)},
+        )
+        self.assertClosureRebuildsTheSame(LocationClosure, Location)
+
+    def test_siterole_move(self):
+        """Moving a SiteRole moves its whole subtree under the new parent, in the closure table and cached tree."""
+        self.role.parent = self.other_root_role
+        self.role.save()
+        other_root_role, role, child_role = self.other_root_role.pk, self.role.pk, self.child_role.pk
+        self.assertEqual(
+            self.get_closure(SiteRoleClosure, [self.role, self.child_role]),
+            {
+                (role, role, 0),
+                (other_root_role, role, 1),
+                (child_role, child_role, 0),
+                (role, child_role, 1),
+                (other_root_role, child_role, 2),
+            },
+        )
+        self.assertClosureRebuildsTheSame(SiteRoleClosure, SiteRole)
+
+        site_role_tree = get_site_role_tree()
+        self.assertEqual(site_role_tree.ancestors(child_role), {child_role, role, other_root_role})
+        self.assertEqual(site_role_tree.descendants(self.root_role.pk), {self.root_role.pk})
+        self.assertEqual(site_role_tree.descendants(other_root_role), {other_root_role, role, child_role})
+
+    def test_unchanged_parent(self):
+        """Saving a node without moving it leaves the closure table alone."""
+        self.assertFalse(update_tree_closure(LocationClosure, self.city))
+        self.assertFalse(update_tree_closure(SiteRoleClosure, self.role))
+
+        self.role.parent = self.other_root_role
+        self.assertTrue(update_tree_closure(SiteRoleClosure, self.role))
@@ -0,0 +1,67 @@
+"""Unit tests for nautobot_cdn_models utilities."""
+from django.db import transaction
+from django.test import TransactionTestCase
+
+from nautobot_cdn_models.utils import GenerationCache
+
+
+class GenerationCacheTest(TransactionTestCase):
+    """Tests of GenerationCache invalidation within transactions, which have to actually commit or roll back."""
+
+    def setUp(self):
+        super().setUp()
+        self.builds = 0
+        self.cache = GenerationCache(f"nautobot_cdn_models:test:{self.id()}", self.build)
+
+    def build(self):
+        self.builds += 1
+        return self.builds
+
+    def test_value_is_cached(self):
+        self.assertEqual(self.cache.get(), 1)
+        self.assertEqual(self.cache.get(), 1)
+        self.cache.invalidate()
+        self.assertEqual(self.cache.get(), 2)
+        self.assertEqual(self.cache.get(), 2)
+
+    def test_pending_invalidation_keeps_a_transaction_local_value(self):
+        self.assertEqual(self.cache.get(), 1)
+        with transaction.atomic():
+            self.cache.invalidate()
+            # Rebuilt once from the transaction's own data, however many times it is read
+            self.assertEqual(self.cache.get(), 2)
+            self.assertEqual(self.cache.get(), 2)
+            self.cache.invalidate()
+            self.assertEqual(self.cache.get(), 3)
+            self.assertEqual(self.cache.get(), 3)
+
+        # Once committed, the value is rebuilt and shared again
+        self.assertEqual(self.cache.get(), 4)
+        self.assertEqual(self.cache.get(), 4)
+
+    def test_rolled_back_invalidation_discards_the_transaction_local_value(self):
+        self.assertEqual(self.cache.get(), 1)
+        with transaction.atomic():
+            self.cache.invalidate()
+            self.assertEqual(self.cache.get(), 2)
+            try:
+                with transaction.atomic():
+                    self.cache.invalidate()
+                    self.assertEqual(self.cache.get(), 3)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            # The value built from the data of the rolled back savepoint is not used anymore
+            self.assertEqual(self.cache.get(), 4)
+            self.assertEqual(self.cache.get(), 4)
+
+        try:
+            with transaction.atomic():
+                self.cache.invalidate()
+                self.assertEqual(self.cache.get(), 5)
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        # Neither is the value built within the rolled back transaction: the one committed above is rebuilt
+        self.assertEqual(self.cache.get(), 6)
+        self.assertEqual(self.cache.get(), 6)